@@ -70,7 +70,8 @@ setup_args = dict(
     tests_require=["pytest"],
     entry_points={
         "console_scripts": [
-            "pii-data-raw = pii_data.app.rawdoc:main"
+            "pii-data-raw = pii_data.app.rawdoc:main",
+            "pii-data-synth = pii_data.app.synthdoc:main"
         ]
     },
     include_package_data=False,
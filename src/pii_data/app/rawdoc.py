@@ -2,21 +2,67 @@
 Simple script to convert a YAML Source Document to raw text
 """
 
+import sys
 from argparse import ArgumentParser, Namespace
 
-from ..types.localdoc import LocalSrcDocumentFile
+from typing import Dict, List
+
+from ..types.doc import LocalSrcDocumentFile
+from ..pipeline.bulk import dump_files
 
 
 # --------------------------------------------------------------------------
 
 def parse_args():
     args = ArgumentParser(description='Read a YAML PII Source Doc and write it out (to either YAML or to plain raw text')
-    args.add_argument('inputdoc')
-    args.add_argument('outputdoc', help="output file (the file extension will decide the format)")
+    args.add_argument('inputdoc', nargs="+", metavar="DOC",
+                      help="input & output file (the output file extension will decide the format); with --outdir, any number of input files, directories or glob patterns, or '-' to read a list of input files from stdin")
     args.add_argument('--indent', type=int, default=0, help="for tree documents and plain text output, the indent for each level")
     args.add_argument('--context-fields', nargs="+", metavar="FIELDNAME",
                       help="context fields to add")
-    return args.parse_args()
+
+    g = args.add_argument_group("batch conversion")
+    g.add_argument('--outdir', help="convert all input files, writing them into this directory (mirroring the input layout)")
+    g.add_argument('--format', default="txt", help="output format for --outdir (default: %(default)s)")
+    g.add_argument('--input-root', help="base input directory for output paths (default: the deepest directory common to all inputs)")
+    g.add_argument('--workers', type=int, default=0, help="number of worker processes (default: convert in the main process)")
+
+    args = args.parse_args()
+    if args.outdir is None:
+        if len(args.inputdoc) != 2 or "-" in args.inputdoc:
+            raise SystemExit("error: use one input and one output document, or --outdir")
+        args.inputdoc, args.outputdoc = args.inputdoc
+    return args
+
+
+def read_inputs(inputs: List[str]) -> List[str]:
+    """
+    Replace a "-" input by the list of files read from stdin (one per line)
+    """
+    out = []
+    for name in inputs:
+        if name == "-":
+            out += [line.strip() for line in sys.stdin if line.strip()]
+        else:
+            out.append(name)
+    return out
+
+
+def print_summary(stats: Dict):
+    """
+    Print the results of a batch conversion
+    """
+    elapsed = max(stats["elapsed"], 1e-6)
+    print(f"converted {stats['documents']} documents "
+          f"({stats['bytes']/1e6:.1f} MB) in {elapsed:.2f} s: "
+          f"{stats['documents']/elapsed:.1f} docs/s, "
+          f"{stats['bytes']/1e6/elapsed:.2f} MB/s", file=sys.stderr)
+    if stats.get("peak_rss"):
+        print(f"peak RSS: {stats['peak_rss']/2**20:.1f} MiB", file=sys.stderr)
+    if stats["errors"]:
+        print(f"{stats['errors']} errors:", file=sys.stderr)
+        for name, msg in stats["failed"]:
+            print(f"  {name}: {msg}", file=sys.stderr)
 
 
 def main(args: Namespace = None):
@@ -24,6 +70,16 @@ def main(args: Namespace = None):
     if not args:
         args = parse_args()
 
+    # Batch conversion
+    if getattr(args, "outdir", None):
+        inputs = read_inputs(args.inputdoc)
+        stats = dump_files(inputs, args.outdir, format=args.format,
+                           input_root=args.input_root, workers=args.workers,
+                           context_fields=args.context_fields,
+                           indent=args.indent)
+        print_summary(stats)
+        sys.exit(1 if stats["errors"] else 0)
+
     # Read document
     doc = LocalSrcDocumentFile(args.inputdoc)
 
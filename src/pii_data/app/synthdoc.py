@@ -0,0 +1,84 @@
+"""
+Generate a synthetic Source Document, and optionally its PII collection,
+for load testing
+"""
+
+from argparse import ArgumentParser, Namespace
+
+from typing import Dict, List
+
+from ..helper.exception import InvArgException
+from ..types.doc.synthetic import SyntheticDocGenerator, DOC_TYPES
+
+
+# --------------------------------------------------------------------------
+
+def parse_pii_types(types: List[str]) -> Dict[str, float]:
+    """
+    Parse a list of PII types given as TYPE or TYPE:WEIGHT
+    """
+    out = {}
+    for spec in types:
+        name, _, weight = spec.partition(":")
+        try:
+            out[name.upper()] = float(weight) if weight else 1.0
+        except ValueError:
+            raise InvArgException("invalid PII type weight: {}", spec)
+    return out
+
+
+def parse_args():
+    args = ArgumentParser(description='Generate a synthetic PII Source Doc (and the PII collection for it), for load testing')
+    args.add_argument('outputdoc', help="output file (the extension will decide the format)")
+    args.add_argument('--collection', metavar="FILENAME",
+                      help="write also the PII collection for the document, as an NDJSON file")
+    args.add_argument('--type', dest="doctype", choices=list(DOC_TYPES),
+                      default="sequence", help="document type (default: %(default)s)")
+    args.add_argument('--size', type=int, default=1000,
+                      help="number of chunks (sequence), top-level sections (tree) or rows (table) (default: %(default)s)")
+    args.add_argument('--seed', type=int, default=0, help="random seed")
+    args.add_argument('--lang', default="en", help="document language")
+    args.add_argument('--docid', default="synthetic-doc", help="document id")
+    args.add_argument('--indent', type=int, help="for tree documents and plain text output, the indent for each level; for JSON output, the JSON indent")
+
+    g = args.add_argument_group("document shape")
+    g.add_argument('--chunk-words', type=float, default=60,
+                   help="mean number of words in a text chunk (default: %(default)s)")
+    g.add_argument('--chunk-sigma', type=float, default=0.8,
+                   help="shape of the log-normal distribution of chunk sizes (default: %(default)s)")
+    g.add_argument('--depth', type=int, default=3,
+                   help="tree depth below each top-level section (default: %(default)s)")
+    g.add_argument('--fanout', type=int, default=3,
+                   help="mean number of children of a tree node (default: %(default)s)")
+    g.add_argument('--columns', type=int, default=6,
+                   help="number of table columns (default: %(default)s)")
+
+    g = args.add_argument_group("PII")
+    g.add_argument('--density', type=float, default=0.5,
+                   help="mean number of PII entities per chunk, or per-cell probability for tables (default: %(default)s)")
+    g.add_argument('--pii-types', nargs="+", metavar="TYPE[:WEIGHT]",
+                   help="PII types to generate, with optional relative weights")
+
+    return args.parse_args()
+
+
+def main(args: Namespace = None):
+
+    if not args:
+        args = parse_args()
+
+    gen = SyntheticDocGenerator(
+        doctype=args.doctype, size=args.size, seed=args.seed,
+        chunk_words=args.chunk_words, chunk_sigma=args.chunk_sigma,
+        depth=args.depth, fanout=args.fanout, columns=args.columns,
+        density=args.density,
+        pii_types=parse_pii_types(args.pii_types) if args.pii_types else None,
+        lang=args.lang, docid=args.docid)
+
+    gen.write_document(args.outputdoc, indent=args.indent)
+    if args.collection:
+        gen.write_collection(args.collection)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,11 @@
 # Format indicators for I/O
 FMT_SRCDOCUMENT = "piisa:src-document:v1"
 FMT_PIICOLLECTION = "piisa:pii-collection:v1"
+FMT_SRCINDEX = "piisa:src-document-index:v1"
+FMT_CORPUS = "piisa:src-corpus:v1"
+FMT_CORPUSINDEX = "piisa:src-corpus-index:v1"
+FMT_BLOCKINDEX = "piisa:gzip-block-index:v1"
+FMT_ZINDEX = "piisa:compressed-seek-index:v1"
 
 # Format indicators for configuration files
 FMT_CONFIG_PREFIX = "piisa:config:"
@@ -1,3 +1,14 @@
-from .text import dump_text
-from .yaml import dump_yaml
-from .json import dump_json
+from ..helper.lazy import lazy_exports
+
+# Exported names, and the submodule defining each one. They are loaded
+# on first access
+_EXPORTS = {
+    "dump_text":   ".text",
+    "dump_yaml":   ".yaml",
+    "dump_json":   ".json",
+    "dump_ndjson": ".json"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -3,16 +3,33 @@ Dump documents to JSON
 """
 
 from types import MappingProxyType
+from pathlib import Path
+from io import StringIO
 
 import json
 
-from typing import List, Set, Union
+from typing import List, Set, Union, Dict, Callable
 
 from .utils import ChunkIterWrapper
 from ..defs import FMT_SRCDOCUMENT
 from ..types.doc import SrcDocument
 from ..types.doc.defs import CTX_FIELDS
 from ..helper.io import openfile
+from ..helper.exception import InvArgException
+from ..helper.chunkindex import ChunkIndexWriter, CountingWriter, index_name
+
+
+def _context(chunk, ctx_fields: Set[str], ctx_pos: bool) -> Dict:
+    """
+    Select the context fields of a chunk to be serialized
+    """
+    ctx = chunk.get("context")
+    if not ctx:
+        return None
+    if ctx_pos:
+        return {f: ctx[f] for f in ctx_fields if f in ctx}
+    else:
+        return {f: ctx[f] for f in ctx if f not in ctx_fields}
 
 
 def serialize_chunk(chunk, ctx_fields: Set[str], ctx_pos: bool):
@@ -22,14 +39,9 @@ def serialize_chunk(chunk, ctx_fields: Set[str], ctx_pos: bool):
     # Main fields
     out = {"id": chunk["id"], "data": chunk["data"]}
     # Context
-    ctx = chunk.get("context")
-    if ctx:
-        if ctx_pos:
-            fields = {f: ctx[f] for f in ctx_fields if f in ctx}
-        else:
-            fields = {f: ctx[f] for f in ctx if f not in ctx_fields}
-        if fields:
-            out["context"] = fields
+    fields = _context(chunk, ctx_fields, ctx_pos)
+    if fields:
+        out["context"] = fields
     # Subchunks
     if "chunks" in chunk:
         out["chunks"] = [serialize_chunk(c, ctx_fields, ctx_pos)
@@ -37,6 +49,46 @@ def serialize_chunk(chunk, ctx_fields: Set[str], ctx_pos: bool):
     return out
 
 
+def _write_chunk(chunk: Dict, out: CountingWriter, enc: "CustomJSONEncoder",
+                 indent: str, sep: str, ids: List[str]):
+    """
+    Write a serialized chunk, with all its subchunks, as a JSON object. The
+    subchunks are written as they are produced, so that no serialized copy
+    of the chunk subtree is held in memory.
+    The output is the same as the encoding of serialize_chunk(chunk)
+      :param indent: the indentation unit (an empty string for no indent)
+      :param sep: the line break & indentation preceding the chunk
+      :param ids: list to append the ids of the chunk & all its subchunks to
+    """
+    item, key = enc.item_separator, enc.key_separator
+    inner = sep + indent
+    ids.append(chunk["id"])
+
+    fields = [("id", chunk["id"]), ("data", chunk["data"])]
+    ctx = _context(chunk, enc.ctx, enc.ctx_pos)
+    if ctx:
+        fields.append(("context", ctx))
+    if "chunks" in chunk:
+        fields.append(("chunks", chunk["chunks"]))
+    if enc.sort_keys:
+        fields.sort(key=lambda f: f[0])
+
+    out.write("{")
+    for n, (name, value) in enumerate(fields):
+        out.write((item if n else "") + inner + enc.encode(name) + key)
+        if name != "chunks":
+            data = enc.encode(value)
+            out.write(data.replace("\n", inner) if inner else data)
+            continue
+        out.write("[")
+        num = 0
+        for num, sub in enumerate(value, start=1):
+            out.write((item if num > 1 else "") + inner + indent)
+            _write_chunk(sub, out, enc, indent, inner + indent, ids)
+        out.write((inner if num else "") + "]")
+    out.write(sep + "}")
+
+
 
 class CustomJSONEncoder(json.JSONEncoder):
     '''
@@ -74,9 +126,129 @@ class CustomJSONEncoder(json.JSONEncoder):
             return str(obj)
 
 
+def _encoder(context_fields: List[str], indent: Union[int, bool],
+             kwargs: Dict) -> CustomJSONEncoder:
+    """
+    Create the JSON encoder for a document
+    """
+    dump_args = {"ensure_ascii": False, "indent": indent, **kwargs}
+    return CustomJSONEncoder(context_fields=context_fields, **dump_args)
+
+
+def _write_json(doc: SrcDocument, out: CountingWriter,
+                enc: CustomJSONEncoder, index: ChunkIndexWriter = None):
+    """
+    Write the document as a JSON object, one chunk at a time (including
+    nested chunks in tree documents). The output is the same as would be
+    produced by json.dump() with the same encoder parameters.
+    """
+    if enc.indent is None:
+        indent = nl = ""
+    else:
+        indent = (" " * enc.indent if isinstance(enc.indent, int)
+                  else enc.indent)
+        nl = "\n"
+    sep0 = nl + indent
+
+    item, key = enc.item_separator, enc.key_separator
+
+    def write_format():
+        pos = out.pos
+        out.write(enc.encode(FMT_SRCDOCUMENT))
+        if index:
+            index.docformat(pos, out.pos - pos)
+
+    def write_header():
+        pos = out.pos
+        header = enc.encode(doc.metadata)
+        out.write(header.replace("\n", sep0) if sep0 else header)
+        if index:
+            index.header(pos, out.pos - pos)
+
+    def write_chunks():
+        out.write("[")
+        num = 0
+        sep1 = sep0 + indent
+        for num, chunk in enumerate(doc.iter_struct(), start=1):
+            out.write((item if num > 1 else "") + sep1)
+            pos = out.pos
+            ids = []
+            _write_chunk(chunk, out, enc, indent, sep1, ids)
+            if index:
+                index.add_ids(ids, pos, out.pos - pos)
+        out.write((sep0 if num else "") + "]")
+
+    fields = [("format", write_format), ("header", write_header),
+              ("chunks", write_chunks)]
+    if enc.sort_keys:
+        fields.sort(key=lambda f: f[0])
+
+    out.write("{")
+    for n, (name, writer) in enumerate(fields):
+        out.write((item if n else "") + sep0 + enc.encode(name) + key)
+        writer()
+    out.write(nl + "}")
+
+
+def _write_ndjson(doc: SrcDocument, out: CountingWriter,
+                  enc: CustomJSONEncoder, index: ChunkIndexWriter = None):
+    """
+    Write the document as NDJSON: a first line with format & header, and then
+    one line per top-level chunk
+    """
+    line = enc.encode({"format": FMT_SRCDOCUMENT, "header": doc.metadata})
+    out.write(line + "\n")
+    if index:
+        index.header(0, out.pos)
+    for chunk in doc.iter_struct():
+        pos = out.pos
+        ids = []
+        _write_chunk(chunk, out, enc, "", "", ids)
+        out.write("\n")
+        if index:
+            index.add_ids(ids, pos, out.pos - pos)
+
+
+def _dump(doc: SrcDocument, outputfile: str, writer: Callable,
+          enc: CustomJSONEncoder, index: bool, fmt: str):
+    """
+    Write a document to an output destination, optionally with a chunk index
+    """
+    if index and not isinstance(outputfile, (str, Path)):
+        raise InvArgException("chunk index needs an output filename")
+    idx = ChunkIndexWriter(fmt) if index else None
+
+    # Write it. Ensure we only close it if we opened it
+    f = openfile(outputfile, "wt", encoding="utf-8")
+    try:
+        writer(doc, CountingWriter(f), enc, idx)
+    finally:
+        if f != outputfile:
+            f.close()
+
+    if idx:
+        idx.save(index_name(outputfile))
+
+
+def encode_document(doc: SrcDocument, context_fields: List[str] = None,
+                    **kwargs) -> str:
+    """
+    Serialize a document as a single-line JSON string
+     :param doc: document to serialize
+     :param context_fields: explicit set of context fields to add to the
+        output. If not passed, all existing context fields will be added
+        *except* a set of well-known structure fields.
+     :param kwargs: additional arguments for the JSON encoder
+    """
+    out = StringIO()
+    _write_json(doc, CountingWriter(out), _encoder(context_fields, None, kwargs))
+    return out.getvalue()
+
+
 def dump_json(doc: SrcDocument, outputfile: str,
               context_fields: List[str] = None,
-              indent: Union[int, bool] = None, **kwargs):
+              indent: Union[int, bool] = None, index: bool = False,
+              **kwargs):
     """
     Dump the data for a PII Source Document into a JSON file.
      :param doc: document to dump
@@ -84,22 +256,26 @@ def dump_json(doc: SrcDocument, outputfile: str,
      :param context_fields: ignored, for compatibility with YAML output
      :param indent: JSON indent level. If not given (or `None`) a default
         will automatically be assigned; to indicate `None` use `False`
+     :param index: write also a sidecar chunk index file
      :param kwargs: additional arguments for the JSON dumper
     """
-
-    # Construct a serializable version of the document
-    data = {"format": FMT_SRCDOCUMENT,
-            "header": doc.metadata,
-            "chunks": ChunkIterWrapper(doc.iter_struct())}
-
-    # Prepare JSON encoder parameters
     indent = None if indent is False else 2 if indent is None else indent
-    dump_args = {"ensure_ascii": False, "indent": indent, **kwargs}
+    enc = _encoder(None, indent, kwargs)
+    _dump(doc, outputfile, _write_json, enc, index, "json")
 
-    # Write it. Ensure we only close it if we opened it
-    f = openfile(outputfile, "wt", encoding="utf-8")
-    try:
-        json.dump(data, f, cls=CustomJSONEncoder, **dump_args)
-    finally:
-        if f != outputfile:
-            f.close()
+
+def dump_ndjson(doc: SrcDocument, outputfile: str,
+                context_fields: List[str] = None, index: bool = False,
+                **kwargs):
+    """
+    Dump the data for a PII Source Document into an NDJSON file.
+     :param doc: document to dump
+     :param outputfile: output destination
+     :param context_fields: explicit set of context fields to add to the
+        output. If not passed, all existing context fields will be added
+        *except* a set of well-known structure fields.
+     :param index: write also a sidecar chunk index file
+     :param kwargs: additional arguments for the JSON dumper
+    """
+    enc = _encoder(context_fields, None, kwargs)
+    _dump(doc, outputfile, _write_ndjson, enc, index, "ndjson")
@@ -2,18 +2,22 @@
 Dump documents to YAML
 """
 
+import re
+import threading
 from collections import defaultdict
 from types import MappingProxyType
 
 from yaml import dump
-from yaml import SafeDumper
+from yaml import SafeDumper, ScalarNode
 from yaml.representer import SafeRepresenter
+from yaml.resolver import Resolver
 #from yaml.nodes import MappingNode
 
-from typing import Iterable, List, Dict
+from typing import Iterable, List, Dict, TextIO, Any, Tuple
 
 from ..defs import FMT_SRCDOCUMENT
 from ..helper.io import openfile
+from ..helper.backends import yaml_dumper
 from ..types.doc.defs import CTX_FIELDS
 from ..types.doc import SrcDocument
 from .utils import TextNode, ChunkIterWrapper
@@ -77,29 +81,267 @@ class ChunkWrapperRepresenter:
         return dumper.represent_list(chunklist)
 
 
+# Texts that cannot be written as block literals: those with characters that
+# are not printable, with line breaks other than "\n", or with spaces before
+# a line break or at the end (as decided by the PyYAML emitter)
+_NO_BLOCK = re.compile("[^\n\x20-\x7E\xA0-\u2027\u202A-\uD7FF\uE000-\uFEFE"
+                       "\uFF00-\uFFFD\U00010000-\U0010FFFE]| \n| $")
+
+# Strings that can be written as plain scalars (if they resolve to strings)
+_PLAIN_ID = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_./-]*")
+_PLAIN_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Single-line strings that can be written as plain scalars in block context,
+# or else as single-quoted scalars (if they resolve to something else)
+_NO_PLAIN = re.compile("[^\x20-\x7E\xA0-\u2027\u202A-\uD7FF\uE000-\uFEFE"
+                       "\uFF00-\uFFFD\U00010000-\U0010FFFE]"
+                       "|^[ #,\\[\\]{}&*!|>'\"%@`]|^[-?:]( |$)|^---|^\\.\\.\\."
+                       "|:( |$)| #| $")
+
+# Maximum line width in PyYAML output
+_WIDTH = 80
+
+_RESOLVER = Resolver()
+
+
+class YamlChunkWriter:
+    """
+    A streaming YAML writer for src-documents. It writes the document header
+    and then each chunk as it is produced, with the same layout the PyYAML
+    emitter would use. Document text is written directly as block literals;
+    values with more complex formatting rules (header, context fields, texts
+    that cannot be block literals) are serialized by PyYAML.
+    """
+
+    def __init__(self, out: TextIO, dumper: type,
+                 context_fields: List[str] = None):
+        """
+          :param out: output destination
+          :param dumper: YAML dumper class, for the values serialized by PyYAML
+          :param context_fields: context fields to add to the output (see
+            ChunkWrapperRepresenter)
+        """
+        self.out = out
+        self.dumper = dumper
+        self.ctx_pos = context_fields is not None
+        self.ctx = set(context_fields if self.ctx_pos else CTX_FIELDS)
+        self.open_ended = False
+
+    def _dump(self, data: Any) -> str:
+        """
+        Serialize with PyYAML. Remove a final document end marker (written
+        when the last scalar is a block literal with "keep" chomping), and
+        remember it for the end of the output.
+        """
+        text = dump(data, Dumper=self.dumper, sort_keys=False,
+                    allow_unicode=True, default_flow_style=False)
+        self.open_ended = text.endswith("...\n") and \
+            text[-5:-4] in ("\n", "\x85", "\u2028", "\u2029")
+        return text[:-4] if self.open_ended else text
+
+    def _value(self, key: str, value: Any, depth: int) -> str:
+        """
+        Serialize a key/value pair of a chunk with PyYAML. The pair is wrapped
+        into nested lists so that it is emitted at the right indentation
+        """
+        data = {key: value}
+        for _ in range(depth + 1):
+            data = [data]
+        return self._dump(data)[2*(depth + 1):]
+
+    def _id(self, value: Any, depth: int) -> str:
+        """
+        Serialize a chunk id
+        """
+        self.open_ended = False
+        if isinstance(value, int) and not isinstance(value, bool):
+            return f"id: {value}\n"
+        elif isinstance(value, str) and _PLAIN_ID.fullmatch(value):
+            tag = _RESOLVER.resolve(ScalarNode, value, (True, False))
+            return f"id: {value}\n" if tag.endswith(":str") else \
+                f"id: '{value}'\n"
+        return self._value("id", value, depth)
+
+    def _context(self, fields: Dict, depth: int) -> str:
+        """
+        Serialize the context fields of a chunk. Simple values (short
+        single-line strings, integers, booleans) are written directly;
+        anything else is serialized by PyYAML.
+        """
+        indent = " " * (2*depth + 4)
+        lines = ["context:\n"]
+        for key, value in fields.items():
+            if not isinstance(key, str) or not _PLAIN_KEY.fullmatch(key) or \
+               not _RESOLVER.resolve(ScalarNode, key,
+                                     (True, False)).endswith(":str"):
+                return self._value("context", fields, depth)
+            if value is None:
+                value = "null"
+            elif isinstance(value, bool):
+                value = "true" if value else "false"
+            elif isinstance(value, int):
+                value = str(value)
+            elif not isinstance(value, str) or not value or \
+                    _NO_PLAIN.search(value):
+                return self._value("context", fields, depth)
+            elif not _RESOLVER.resolve(ScalarNode, value,
+                                       (True, False)).endswith(":str"):
+                value = "'" + value.replace("'", "''") + "'"
+            line = f"{indent}{key}: {value}\n"
+            if len(line) > _WIDTH:
+                return self._value("context", fields, depth)
+            lines.append(line)
+        self.open_ended = False
+        return "".join(lines)
+
+    def _data(self, text: str, depth: int) -> str:
+        """
+        Serialize a chunk text, as a block literal
+        """
+        if not isinstance(text, str) or _NO_BLOCK.search(text):
+            if isinstance(text, str):
+                text = TextNode(text)
+            return self._value("data", text, depth)
+
+        hints = "2" if text[0] in " \n" else ""
+        if text[-1] != "\n":
+            hints += "-"
+        elif len(text) == 1 or text[-2] == "\n":
+            hints += "+"
+        self.open_ended = hints.endswith("+")
+
+        if text[-1] == "\n":
+            text = text[:-1]
+        indent = " " * (2*depth + 4)
+        lines = "".join((indent + line if line else "") + "\n"
+                        for line in text.split("\n"))
+        return "data: |" + hints + "\n" + lines
+
+    def write_chunk(self, chunk: Dict, depth: int = 0):
+        """
+        Write a chunk (and its subchunks) as an element in a list of chunks
+          :param chunk: the chunk to write
+          :param depth: nesting level of the chunk
+        """
+        out = self.out
+        prefix = " " * (2*depth) + "- "
+        indent = " " * (2*depth + 2)
+
+        if "id" in chunk:
+            out.write(prefix + self._id(chunk["id"], depth))
+            prefix = indent
+
+        payload = chunk.get("data")
+        if payload:
+            out.write(prefix + self._data(payload, depth))
+            prefix = indent
+
+        if "chunks" in chunk:
+            out.write(prefix + "chunks:")
+            prefix = indent
+            self.write_chunks(chunk["chunks"], depth + 1)
+
+        ctx = chunk.get("context")
+        if ctx:
+            if self.ctx_pos:
+                fields = {f: ctx[f] for f in self.ctx if f in ctx}
+            else:
+                fields = {f: ctx[f] for f in ctx if f not in self.ctx}
+            if fields:
+                out.write(prefix + self._context(fields, depth))
+                prefix = indent
+
+        if prefix != indent:
+            out.write(prefix + "{}\n")
+            self.open_ended = False
+
+    def write_chunks(self, chunks: Iterable[Dict], depth: int = 0):
+        """
+        Write a list of chunks, as the value of a "chunks" key
+        """
+        empty = True
+        for chunk in chunks:
+            if empty:
+                self.out.write("\n")
+                empty = False
+            self.write_chunk(chunk, depth)
+        if empty:
+            self.out.write(" []\n")
+            self.open_ended = False
+
+    def write(self, doc: SrcDocument):
+        """
+        Write a full document
+        """
+        self.out.write(self._dump({"format": FMT_SRCDOCUMENT,
+                                   "header": doc.metadata}))
+        self.out.write("chunks:")
+        self.write_chunks(doc.iter_struct())
+        if self.open_ended:
+            self.out.write("...\n")
+
+
+# Dumper classes already created, per (base dumper, context fields)
+_DUMPERS: Dict[Tuple, type] = {}
+_DUMPERS_LOCK = threading.Lock()
+
+
+def document_dumper(base: type, context_fields: List[str] = None) -> type:
+    """
+    Return a YAML Dumper class for src-documents: a subclass of the base
+    dumper with representers for the document types. Classes are created
+    once per configuration and cached, and the base class is not modified,
+    so that concurrent dumps with different configurations do not interfere.
+      :param base: the base Dumper class
+      :param context_fields: context fields to add to the output (see
+        ChunkWrapperRepresenter)
+    """
+    key = base, None if context_fields is None else tuple(context_fields)
+    try:
+        return _DUMPERS[key]
+    except KeyError:
+        pass
+
+    with _DUMPERS_LOCK:
+        if key in _DUMPERS:
+            return _DUMPERS[key]
+
+        dumper = type("SrcDocument" + base.__name__, (base,), {})
+
+        # Add representers for some Python types
+        dumper.add_representer(MappingProxyType,
+                               SafeRepresenter.represent_dict)
+        dumper.add_representer(defaultdict, SafeRepresenter.represent_dict)
+
+        # Add representers for some Custom types
+        dumper.add_representer(TextNode, text_representer)
+        dumper.add_representer(ChunkIterWrapper,
+                               ChunkWrapperRepresenter(context_fields))
+
+        _DUMPERS[key] = dumper
+        return dumper
+
+
 def dump_yaml(doc: SrcDocument, outputfile: str,
               context_fields: List[str] = None):
     """
     Dump the data for a PII Source Document into a YAML file.
+    With the default (pure-Python) dumper, the document is written as a
+    stream, chunk by chunk.
     """
-    mydumper = SafeDumper
+    mydumper = document_dumper(yaml_dumper(), context_fields)
 
-    # Add representers for some Python types
-    mydumper.add_representer(MappingProxyType, SafeRepresenter.represent_dict)
-    mydumper.add_representer(defaultdict, SafeRepresenter.represent_dict)
-
-    # Add representers for some Custom types
-    mydumper.add_representer(TextNode, text_representer)
-    mydumper.add_representer(ChunkIterWrapper,
-                             ChunkWrapperRepresenter(context_fields))
+    with openfile(outputfile, "wt", encoding="utf-8") as f:
 
-    # Construct a serializable version of the document
-    data = {"format": FMT_SRCDOCUMENT,
-            "header": doc.metadata,
-            "chunks": ChunkIterWrapper(doc.iter_struct())}
+        # Stream the document
+        if issubclass(mydumper, SafeDumper):
+            YamlChunkWriter(f, mydumper, context_fields).write(doc)
+            return
 
-    # Write it
-    with openfile(outputfile, "wt", encoding="utf-8") as f:
+        # Construct a serializable version of the document, and write it
+        data = {"format": FMT_SRCDOCUMENT,
+                "header": doc.metadata,
+                "chunks": ChunkIterWrapper(doc.iter_struct())}
         yaml = dump(data, Dumper=mydumper, sort_keys=False, allow_unicode=True,
                     default_flow_style=False)
         f.write(yaml)
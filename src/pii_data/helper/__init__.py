@@ -1 +1,11 @@
-from .io import load_yaml
+from .lazy import lazy_exports
+
+# Exported names, and the submodule defining each one. They are loaded
+# on first access
+_EXPORTS = {
+    "load_yaml": ".io"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
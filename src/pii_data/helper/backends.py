@@ -0,0 +1,133 @@
+"""
+Selection of the parser & emitter implementations used for YAML and JSON.
+
+There are three backend roles:
+  - `yaml-load`: the YAML Loader class. The libyaml-based `CSafeLoader` is
+    selected if PyYAML was built with libyaml, else the pure-Python
+    `SafeLoader` is used
+  - `yaml-dump`: the YAML Dumper class. `SafeDumper` is the default, since
+    the libyaml emitter (`CSafeDumper`, also available) chooses different
+    scalar styles in some cases (e.g. text with non-BMP characters), and
+    therefore produces a different (though equivalent) YAML text
+  - `json-load`: the function to parse JSON strings. `orjson` is selected if
+    installed, else the standard `json` module is used
+
+JSON output always uses the standard `json` module, since the formatting
+of the faster libraries (e.g. separators) differs from it.
+
+The selection can be changed with set_backend()
+"""
+
+import json
+
+import yaml
+
+from typing import Dict, Tuple, Union
+
+from .exception import InvArgException
+
+
+# Available backends, for each role: name -> implementation
+BACKENDS = {
+    "yaml-load": {"python": yaml.SafeLoader},
+    "yaml-dump": {"python": yaml.SafeDumper},
+    "json-load": {"python": json.loads}
+}
+if getattr(yaml, "__with_libyaml__", False):
+    BACKENDS["yaml-load"]["libyaml"] = yaml.CSafeLoader
+    BACKENDS["yaml-dump"]["libyaml"] = yaml.CSafeDumper
+try:
+    import orjson
+    BACKENDS["json-load"]["orjson"] = orjson.loads
+except ImportError:
+    pass
+
+# Default selection for each role: the first available in these lists
+DEFAULTS = {
+    "yaml-load": ("libyaml", "python"),
+    "yaml-dump": ("python",),
+    "json-load": ("orjson", "python")
+}
+
+_SELECTED = {}
+
+
+def _backends(role: str) -> Dict:
+    try:
+        return BACKENDS[role]
+    except KeyError:
+        raise InvArgException("unknown backend role: {}", role)
+
+
+def available_backends() -> Dict[str, Tuple[str, ...]]:
+    """
+    Return the names of the available backends, for each role
+    """
+    return {role: tuple(b) for role, b in BACKENDS.items()}
+
+
+def get_backend(role: str) -> str:
+    """
+    Return the name of the backend selected for a role
+    """
+    _backends(role)
+    return _SELECTED[role][0]
+
+
+def set_backend(role: str, name: str = None) -> str:
+    """
+    Select the backend to use for a role
+      :param role: one of "yaml-load", "yaml-dump", "json-load"
+      :param name: backend name; if None, select the default one
+      :return: the previously selected backend
+    """
+    backends = _backends(role)
+    if name is None:
+        name = next(n for n in DEFAULTS[role] if n in backends)
+    elif name not in backends:
+        raise InvArgException("unavailable {} backend: {}", role, name)
+    prev = _SELECTED.get(role, (None,))[0]
+    _SELECTED[role] = name, backends[name]
+    return prev
+
+
+for _role in BACKENDS:
+    set_backend(_role)
+
+
+def yaml_loader() -> type:
+    """
+    Return the YAML Loader class of the selected backend
+    """
+    return _SELECTED["yaml-load"][1]
+
+
+def yaml_dumper() -> type:
+    """
+    Return the YAML Dumper class of the selected backend
+    """
+    return _SELECTED["yaml-dump"][1]
+
+
+def json_loads(data: Union[str, bytes]):
+    """
+    Parse a JSON string with the selected backend.
+    Faster parsers are stricter than the standard one in a few corner cases
+    (e.g. integers beyond 64 bits, or NaN values), so on failure the data is
+    parsed again with the `json` module, which will raise the appropriate
+    exception if it's really invalid.
+    """
+    loads = _SELECTED["json-load"][1]
+    try:
+        return loads(data)
+    except ValueError:
+        if loads is json.loads:
+            raise
+        return json.loads(data)
+
+
+def json_load(f):
+    """
+    Parse a JSON file-like object with the selected backend
+    """
+    return json_loads(f.read())
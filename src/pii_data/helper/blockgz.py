@@ -0,0 +1,278 @@
+"""
+Block-compressed gzip files: the output is split into blocks, each one
+compressed as an independent gzip member (so the result is still a valid
+gzip file). Blocks are compressed in parallel in a thread pool, and a sidecar
+index records their positions, which allows random access to uncompressed
+offsets and splitting the file across workers.
+
+Blocks end at line boundaries whenever possible, so that NDJSON records are
+not split across blocks. A line longer than MAX_BLOCK_FACTOR times the block
+size is however cut, so that blocks stay bounded.
+
+The index is a sidecar file with a ".bgzidx" suffix (distinct from the chunk
+and corpus indexes, since those files can also be block compressed). It
+follows the format of the offset indexes: a JSON metadata line (format tag,
+block size, total uncompressed size) and then one line per block, with its
+uncompressed offset, compressed offset & compressed length.
+"""
+
+import os
+import io
+import json
+import zlib
+import bisect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import List, Tuple, Iterator, IO
+
+from ..defs import FMT_BLOCKINDEX
+from .exception import InvArgException, FileException
+from .chunkindex import load_offset_index
+
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+# Maximum size of a block, as a multiple of the block size
+MAX_BLOCK_FACTOR = 4
+
+BLOCK_INDEX_SUFFIX = ".bgzidx"
+
+
+def block_index_name(filename: str) -> str:
+    """
+    Return the name of the sidecar block index for a block-compressed file
+    """
+    return str(filename) + BLOCK_INDEX_SUFFIX
+
+
+def _compress(data: bytes, level: int) -> bytes:
+    """
+    Compress a block as a standalone gzip member (zlib releases the GIL)
+    """
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return comp.compress(data) + comp.flush()
+
+
+class BlockGzipWriter(io.RawIOBase):
+    """
+    A binary output stream producing a block-compressed gzip file
+    """
+
+    def __init__(self, filename: str, block_size: int = DEFAULT_BLOCK_SIZE,
+                 workers: int = None, level: int = 6, index: bool = True):
+        """
+          :param filename: name of the output file
+          :param block_size: (approximate) uncompressed size of each block.
+            Blocks are never larger than MAX_BLOCK_FACTOR times this size
+          :param workers: number of compression threads
+          :param level: compression level
+          :param index: write also the block index file
+        """
+        super().__init__()
+        self._name = str(filename)
+        self._size = block_size
+        self._level = level
+        workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(workers)
+        self._max = 2 * workers
+        self._pending = deque()
+        self._buf = bytearray()
+        self._upos = self._cpos = 0
+        self._index = [] if index else None
+        self._f = open(self._name, "wb")
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def writable(self) -> bool:
+        return True
+
+    def _cut(self) -> int:
+        """
+        Find the end of the next block in the buffer (0 if it's not complete)
+        """
+        if len(self._buf) < self._size:
+            return 0
+        cut = self._buf.rfind(b"\n", 0, self._size) + 1
+        if not cut:
+            limit = MAX_BLOCK_FACTOR * self._size
+            cut = self._buf.find(b"\n", self._size, limit) + 1
+            if not cut and len(self._buf) >= limit:
+                cut = limit         # a very long line: cut it
+        return cut
+
+    def _submit(self, data: bytes):
+        """
+        Send a block to compression
+        """
+        fut = self._pool.submit(_compress, data, self._level)
+        self._pending.append((self._upos, fut))
+        self._upos += len(data)
+        while len(self._pending) > self._max:
+            self._write_block()
+
+    def _write_block(self):
+        """
+        Write the oldest compressed block to the file
+        """
+        upos, fut = self._pending.popleft()
+        data = fut.result()
+        self._f.write(data)
+        if self._index is not None:
+            self._index.append((upos, self._cpos, len(data)))
+        self._cpos += len(data)
+
+    def write(self, b) -> int:
+        self._buf += b
+        while True:
+            cut = self._cut()
+            if not cut:
+                break
+            self._submit(bytes(self._buf[:cut]))
+            del self._buf[:cut]
+        return len(b)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buf:
+                self._submit(bytes(self._buf))
+                self._buf = bytearray()
+            while self._pending:
+                self._write_block()
+        finally:
+            self._pool.shutdown()
+            self._f.close()
+            super().close()
+        if self._index is not None:
+            self._save_index()
+
+    def _save_index(self):
+        """
+        Write the block index file
+        """
+        meta = {"format": FMT_BLOCKINDEX, "block_size": self._size,
+                "size": self._upos}
+        with open(block_index_name(self._name), "wt", encoding="utf-8") as f:
+            print(json.dumps(meta), file=f)
+            for e in self._index:
+                print(*e, sep="\t", file=f)
+
+
+def open_block_gzip(filename: str, mode: str = "wt", encoding: str = None,
+                    **kwargs) -> IO:
+    """
+    Open a block-compressed gzip file for writing
+      :param filename: output filename
+      :param mode: open mode, "wt" or "wb"
+      :param encoding: for text mode, charset encoding
+      :param kwargs: additional arguments for BlockGzipWriter
+    """
+    if mode not in ("w", "wt", "wb"):
+        raise InvArgException("invalid mode for block gzip file: {}", mode)
+    f = io.BufferedWriter(BlockGzipWriter(filename, **kwargs))
+    if mode == "wb":
+        return f
+    return io.TextIOWrapper(f, encoding=encoding or "utf-8")
+
+
+class BlockGzipReader:
+    """
+    Random access to a block-compressed gzip file, through its block index
+    """
+
+    def __init__(self, filename: str):
+        self._name = str(filename)
+        self.meta, index = load_offset_index(block_index_name(filename),
+                                             FMT_BLOCKINDEX)
+        self.blocks = [(int(u), c, n) for u, (c, n) in index.items()]
+        self._starts = [b[0] for b in self.blocks]
+        self.size = self.meta["size"]
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def _iter_blocks(self, first: int, last: int) -> Iterator[bytes]:
+        """
+        Decompress a range of blocks
+        """
+        with open(self._name, "rb") as f:
+            f.seek(self.blocks[first][1])
+            for _, _, clen in self.blocks[first:last]:
+                try:
+                    yield zlib.decompress(f.read(clen), 31)
+                except zlib.error as e:
+                    raise FileException("invalid block in '{}': {}",
+                                        self._name, e) from e
+
+    def _block_range(self, offset: int, length: int) -> Tuple[int, int]:
+        """
+        Find the blocks spanning a range of uncompressed bytes
+        """
+        if offset < 0 or offset > self.size:
+            raise InvArgException("offset out of range: {}", offset)
+        end = self.size if length is None else min(offset + length, self.size)
+        first = max(bisect.bisect_right(self._starts, offset) - 1, 0)
+        last = bisect.bisect_left(self._starts, end)
+        return first, max(last, first + 1)
+
+    def read(self, offset: int, length: int = None) -> bytes:
+        """
+        Read a range of uncompressed data
+          :param offset: uncompressed byte offset
+          :param length: number of bytes to read (default: until the end)
+        """
+        if not self.blocks:
+            return b""
+        first, last = self._block_range(offset, length)
+        data = b"".join(self._iter_blocks(first, last))
+        start = offset - self.blocks[first][0]
+        return data[start:] if length is None else data[start:start+length]
+
+    def iter_lines(self, offset: int = 0,
+                   length: int = None) -> Iterator[bytes]:
+        """
+        Iterate over the lines in a range of uncompressed data. The range
+        should start and end at line boundaries (as given by split())
+        """
+        if not self.blocks:
+            return
+        first, last = self._block_range(offset, length)
+        skip = offset - self.blocks[first][0]
+        remain = (self.size - offset) if length is None else length
+        rest = b""
+        for data in self._iter_blocks(first, last):
+            if skip:
+                data, skip = data[skip:], 0
+            data = data[:remain]
+            remain -= len(data)
+            lines = (rest + data).split(b"\n")
+            rest = lines.pop()
+            for line in lines:
+                yield line + b"\n"
+        if rest:
+            yield rest
+
+    def split(self, num: int) -> List[Tuple[int, int]]:
+        """
+        Split the file into (at most) a number of ranges of consecutive
+        blocks, of similar uncompressed size. Ranges start at line
+        boundaries, unless the file has lines longer than the maximum block
+        size
+          :return: a list of (offset, length) ranges of uncompressed data
+        """
+        if num < 1:
+            raise InvArgException("invalid number of splits: {}", num)
+        out = []
+        target = self.size / num
+        start = 0
+        for upos, _, _ in self.blocks[1:]:
+            if upos >= (len(out) + 1) * target and len(out) < num - 1:
+                out.append((start, upos - start))
+                start = upos
+        if self.size > start or not out:
+            out.append((start, self.size - start))
+        return out
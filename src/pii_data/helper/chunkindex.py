@@ -0,0 +1,140 @@
+"""
+Sidecar index files for stored src-documents, mapping chunk ids to the byte
+positions of their serialized records.
+
+The index is a text file. The first line is a JSON object with the index
+metadata (format tag, document file format, and positions of the document
+header and, for JSON files, of the document format tag), and each following
+line contains a tab-separated chunk id, byte offset and byte length. Nested
+chunks (in tree documents) point to the record of the top-level chunk that
+contains them.
+"""
+
+import json
+from pathlib import Path
+
+from typing import Dict, Tuple, TextIO, Iterable
+
+from ..defs import FMT_SRCINDEX
+from .exception import FileException
+from .io import openfile
+
+
+INDEX_SUFFIX = ".idx"
+
+TYPE_INDEX = Dict[str, Tuple[int, int]]
+
+
+def index_name(filename: str) -> str:
+    """
+    Return the name of the sidecar index file for a document file
+    """
+    return str(filename) + INDEX_SUFFIX
+
+
+class CountingWriter:
+    """
+    A thin wrapper over a text output file that keeps track of the number of
+    bytes (in UTF-8) written to it
+    """
+
+    __slots__ = "f", "pos"
+
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.pos = 0
+
+    def write(self, s: str):
+        self.f.write(s)
+        self.pos += len(s) if s.isascii() else len(s.encode("utf-8"))
+
+
+class ChunkIndexWriter:
+    """
+    Collect chunk positions while a document is being written, and save them
+    as an index file
+    """
+
+    def __init__(self, fmt: str):
+        """
+          :param fmt: format of the indexed document file ("json", "ndjson")
+        """
+        self.meta = {"format": FMT_SRCINDEX, "source": fmt}
+        self.entries = []
+
+    def header(self, offset: int, length: int):
+        """
+        Record the position of the document header
+        """
+        self.meta["header"] = [offset, length]
+
+    def docformat(self, offset: int, length: int):
+        """
+        Record the position of the document format tag (for documents in
+        which it is not contained in the header record)
+        """
+        self.meta["docformat"] = [offset, length]
+
+    def add(self, chunk: Dict, offset: int, length: int):
+        """
+        Record the position of a top-level chunk (and all its subchunks)
+        """
+        self.add_ids([chunk["id"]] + [sub["id"] for sub in _subchunks(chunk)],
+                     offset, length)
+
+    def add_ids(self, ids: Iterable[str], offset: int, length: int):
+        """
+        Record the position of a top-level chunk, given the ids of the chunk
+        and all its subchunks
+        """
+        self.entries.extend((cid, offset, length) for cid in ids)
+
+    def save(self, filename: str):
+        """
+        Write the index file
+        """
+        with openfile(filename, "wt", encoding="utf-8") as f:
+            print(json.dumps(self.meta), file=f)
+            for e in self.entries:
+                print(*e, sep="\t", file=f)
+
+
+def _subchunks(chunk: Dict) -> Iterable[Dict]:
+    for sub in chunk.get("chunks", []):
+        yield sub
+        yield from _subchunks(sub)
+
+
+def load_offset_index(filename: str, fmt: str) -> Tuple[Dict, TYPE_INDEX]:
+    """
+    Read an offset index file (a JSON metadata line plus tab-separated lines
+    with id, offset & length)
+      :param filename: name of the index file
+      :param fmt: expected format tag for the index
+      :return: a tuple (index metadata, index), where the index is a dict
+        mapping ids to (offset, length) tuples, in file order
+    """
+    if not Path(filename).is_file():
+        raise FileException("cannot find index: {}", filename)
+    with openfile(filename, encoding="utf-8") as f:
+        try:
+            meta = json.loads(next(f))
+        except (StopIteration, json.JSONDecodeError) as e:
+            raise FileException("invalid index '{}': {}", filename, e) from e
+        if meta.get("format") != fmt:
+            raise FileException("invalid index format in '{}'", filename)
+        index = {}
+        for line in f:
+            cid, offset, length = line.rstrip("\n").rsplit("\t", 2)
+            index[cid] = int(offset), int(length)
+    return meta, index
+
+
+def load_chunk_index(filename: str) -> Tuple[Dict, TYPE_INDEX]:
+    """
+    Read a chunk index file
+      :return: a tuple (index metadata, chunk index), where the chunk index is
+        a dict mapping chunk ids to (offset, length) tuples. The dict order is
+        the document order
+    """
+    return load_offset_index(filename, FMT_SRCINDEX)
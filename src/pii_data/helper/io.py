@@ -3,29 +3,57 @@ Code to open & read files, either local files or remote files
 """
 
 import sys
+import io
 from pathlib import Path
-from urllib.request import urlopen
 from urllib.parse import urlparse
-try:
-    import ssl
-except ImportError:
-    ssl = None
-
-import gzip
-import bz2
-import lzma
+
 import json
 
-from yaml import (load as _yaml_load, SafeLoader as YamlLoader, YAMLError,
-                  dump as _yaml_dump, SafeDumper as YamlDumper)
+from yaml import load as _yaml_load, dump as _yaml_dump, YAMLError
 
 from typing import Dict, Callable, IO, Union, List
 
 from .exception import InvArgException, FileException
+from .parsecache import ParseCache, DEFAULT_MAX_SIZE
+from .backends import yaml_loader, yaml_dumper, json_load
+from .lazy import lazy_exports
+
+# Names from the compressed file modules (which are loaded on first use)
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "PrefetchReader": __package__ + ".prefetch",
+    "build_seek_index": __package__ + ".zindex",
+    "open_seekable": __package__ + ".zindex",
+    "SeekableReader": __package__ + ".zindex"
+})
 
 
 CHARSET_ENCODING = "utf-8"
 
+# Default number of blocks to read ahead for compressed input files
+_PREFETCH = 0
+
+# Cache for parsed data files
+_PARSE_CACHE = None
+
+
+def set_prefetch(blocks: int):
+    """
+    Set the default read-ahead for compressed input files opened by
+    openfile(): the number of blocks decompressed in a background thread
+    (0 disables read-ahead)
+    """
+    global _PREFETCH
+    _PREFETCH = max(0, int(blocks or 0))
+
+
+def urlopen(url: str, **kwargs) -> IO:
+    """
+    Open a URL. The network modules are slow to import, so they are loaded
+    only when needed
+    """
+    from urllib.request import urlopen as _urlopen
+    return _urlopen(url, **kwargs)
+
 
 def base_extension(name: str) -> str:
     """
@@ -48,16 +76,53 @@ def is_file_like(name: str, mode: str) -> bool:
         mode.startswith(("w", "a")) and hasattr(name, "write")
 
 
-def openfile(name: str, mode: str = 'rt', encoding: str = None) -> IO:
+def _open_prefetch(opener: Callable, name: str, mode: str, encoding: str,
+                   newline: str, blocks: int) -> IO:
+    """
+    Open a compressed file for reading, decompressing in a background thread
+    """
+    from .prefetch import PrefetchReader
+    f = io.BufferedReader(PrefetchReader(opener(name, "rb"), max_blocks=blocks))
+    if mode.endswith("b"):
+        return f
+    return io.TextIOWrapper(f, encoding=encoding, newline=newline)
+
+
+def _compressed_opener(name: str) -> Callable:
+    """
+    Return the open function for a compressed file, given its name (the
+    compression module is imported only when needed), or `None` if the
+    file is not compressed
+    """
+    if name.endswith(".gz"):
+        from gzip import open as opener
+    elif name.endswith(".bz2"):
+        from bz2 import open as opener
+    elif name.endswith(".xz"):
+        from lzma import open as opener
+    else:
+        return None
+    return opener
+
+
+def openfile(name: str, mode: str = 'rt', encoding: str = None,
+             newline: str = None, prefetch: int = None) -> IO:
     """
     Open local files, as raw text or compressed text (gzip, bzip2 or xz)
       :param name: filename to open (if a file-like object is passed, it will
         be returned)
       :param mode: open mode
       :param encoding: for text modes, charset encoding
+      :param newline: for text modes, newline handling (as in `open()`)
+      :param prefetch: when reading compressed files, number of blocks to
+        decompress ahead in a background thread (0 for none). If not given,
+        use the default defined by set_prefetch()
 
     If an encoding is given, the file will be opened in text mode. If not,
     and text mode has been specified, a default encoding will be assigned.
+
+    Compressed gzip/xz files that have a checkpoint index (as created by
+    build_seek_index()) are opened with a seekable reader that uses it.
     """
 
     file_like = is_file_like(name, mode)
@@ -68,7 +133,7 @@ def openfile(name: str, mode: str = 'rt', encoding: str = None) -> IO:
 
     # Decide on an encoding
     if mode.endswith('b'):
-        encoding = None
+        encoding = newline = None
     elif encoding is None:
         encoding = CHARSET_ENCODING
     else:
@@ -77,18 +142,30 @@ def openfile(name: str, mode: str = 'rt', encoding: str = None) -> IO:
     # Open special sources
     if sname == "-":
         return sys.stdout if mode.startswith("w") else sys.stdin
-    elif sname.endswith(".gz"):
-        return gzip.open(name, mode, encoding=encoding)
-    elif sname.endswith(".bz2"):
-        return bz2.open(name, mode, encoding=encoding)
-    elif sname.endswith(".xz"):
-        return lzma.open(name, mode, encoding=encoding)
+
+    # Compressed sources
+    if mode.startswith("r") and not file_like and \
+       sname.endswith((".gz", ".xz")):
+        from .zindex import open_seekable
+        f = open_seekable(sname)
+        if f is not None:
+            if mode.endswith("b"):
+                return f
+            return io.TextIOWrapper(f, encoding=encoding, newline=newline)
+    opener = _compressed_opener(sname)
+    if opener:
+        if prefetch is None:
+            prefetch = _PREFETCH
+        if prefetch and mode.startswith("r"):
+            return _open_prefetch(opener, name, mode, encoding, newline,
+                                  prefetch)
+        return opener(name, mode, encoding=encoding, newline=newline)
 
     # Open plain source
     if file_like:
         return name
     else:
-        return open(name, mode, encoding=encoding)
+        return open(name, mode, encoding=encoding, newline=newline)
 
 
 def openuri(name: str, mode: str = 'rt', encoding: str = None,
@@ -115,6 +192,10 @@ def openuri(name: str, mode: str = 'rt', encoding: str = None,
     if schemes and url.scheme in schemes:
         src = schemes[url.scheme](name)
     elif url.scheme in ('http', 'https', 'ftp'):
+        try:
+            import ssl
+        except ImportError:
+            ssl = None
         if url.scheme == 'https' and ssl and ignore_cert:
             ctx = ssl.create_default_context()
             ctx.check_hostname = False
@@ -136,22 +217,44 @@ def load_yaml(filename: str) -> Union[Dict, List]:
     """
     with openfile(filename) as f:
         try:
-            return _yaml_load(f, Loader=YamlLoader)
+            return _yaml_load(f, Loader=yaml_loader())
         except YAMLError as e:
             raise FileException("read error in YAML file '{}': {}",
                                 filename, e) from e
 
 
+def set_parse_cache(directory: str = None, max_size: int = DEFAULT_MAX_SIZE):
+    """
+    Activate an on-disk cache for the data files loaded by load_datafile()
+      :param directory: the cache directory (if None, deactivate the cache)
+      :param max_size: maximum size of the cache, in bytes
+    """
+    global _PARSE_CACHE
+    _PARSE_CACHE = ParseCache(directory, max_size) if directory else None
+
+
 def load_datafile(filename: str) -> Dict:
     """
     Load a YAML or JSON file
+    If a parse cache is active (see set_parse_cache()) and the file is local,
+    it will be loaded through the cache.
+    """
+    if _PARSE_CACHE is not None and not is_file_like(filename, "r") and \
+       Path(filename).is_file():
+        return _PARSE_CACHE.load(filename, _load_datafile)
+    return _load_datafile(filename)
+
+
+def _load_datafile(filename: str) -> Dict:
+    """
+    Parse a YAML or JSON file
     """
     filepath = Path(filename)
     if '.json' in filepath.suffixes:
 
         with openuri(filename) as f:
             try:
-                return json.load(f)
+                return json_load(f)
             except json.JSONDecodeError as e:
                 raise FileException("read error in JSON file '{}': {}",
                                     f, e) from e
@@ -171,7 +274,7 @@ def dump_yaml(data: Union[Dict, List], filename: str):
     Write a data structure as a YAML file
     """
     try:
-        dump = _yaml_dump(data, Dumper=YamlDumper, sort_keys=False,
+        dump = _yaml_dump(data, Dumper=yaml_dumper(), sort_keys=False,
                           allow_unicode=True)
     except YAMLError as e:
         raise FileException("write error while serializing to YAML '{}': {}",
@@ -0,0 +1,35 @@
+"""
+Lazy loading of the objects exported by a package: the submodule that
+defines an object is imported only when the object is first accessed, so
+that importing the package itself is cheap
+"""
+
+from importlib import import_module
+
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, names: Dict[str, str]) -> Tuple[Callable,
+                                                                Callable]:
+    """
+    Build the module-level __getattr__ and __dir__ functions for a package
+      :param package: the package name (its `__name__`)
+      :param names: a dict mapping each exported name to the (relative) name
+        of the submodule that defines it
+    """
+    module = import_module(package)
+
+    def __getattr__(name: str):
+        try:
+            modname = names[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute "
+                                 f"{name!r}") from None
+        value = getattr(import_module(modname, package), name)
+        setattr(module, name, value)       # next accesses will not come here
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(module)) | set(names))
+
+    return __getattr__, __dir__
@@ -3,6 +3,7 @@ Miscellaneous utilities
 """
 
 import importlib
+import sys
 
 from typing import Union, Callable, Type, Dict
 
@@ -27,3 +28,18 @@ def filter_dict(d: Dict) -> Dict:
     Return a streamlined version of a dict, without the `None` valued fields
     """
     return {k: v for k, v in d.items() if v is not None}
+
+
+def peak_rss() -> int:
+    """
+    Return the peak resident set size, in bytes, of the current process or
+    of any of its terminated child processes (`None` if it is not available
+    in this platform)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return rss if sys.platform == "darwin" else rss * 1024
@@ -0,0 +1,154 @@
+"""
+An on-disk cache for parsed data files, so that repeated loads of the same
+YAML/JSON file skip parsing.
+
+Entries are keyed by the file path, size, modification time and a hash of
+its contents, and store the parsed structure as a pickle. The cache has a
+size cap; when it is exceeded, the least recently used entries are removed.
+
+Security: entries are unpickled when read, and unpickling can execute
+arbitrary code. Anyone able to write into the cache directory can therefore
+run code in the processes that use the cache, so the directory must only be
+writable by the user running them. It is created with mode 0700, and an
+existing directory writable by other users (or owned by a different user) is
+rejected.
+"""
+
+import os
+import pickle
+import hashlib
+from pathlib import Path
+
+from typing import Any, Callable, Union
+
+from .exception import FileException
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+ENTRY_SUFFIX = ".pkl"
+
+# Marker for a cache miss (a cached value can be None)
+MISS = object()
+
+
+class ParseCache:
+    """
+    A directory holding parsed data structures
+    """
+
+    def __init__(self, directory: Union[str, Path],
+                 max_size: int = DEFAULT_MAX_SIZE):
+        """
+          :param directory: cache directory (created if needed)
+          :param max_size: maximum total size of the cache entries, in bytes
+        """
+        self.dir = Path(directory)
+        self.dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._check_dir()
+        self.max_size = max_size
+
+    def _check_dir(self):
+        """
+        Check that the cache directory can only be modified by the current
+        user (entries are unpickled, so they must be trusted)
+        """
+        if not hasattr(os, "getuid"):
+            return
+        st = self.dir.stat()
+        if st.st_uid != os.getuid() or st.st_mode & 0o022:
+            raise FileException("insecure parse cache directory '{}': it must"
+                                " be owned by the current user and not"
+                                " writable by others", self.dir)
+
+    def key(self, filename: Union[str, Path]) -> str:
+        """
+        Compute the cache key for a file
+        """
+        path = Path(filename).resolve()
+        st = path.stat()
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\0".encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.dir / (key + ENTRY_SUFFIX)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Fetch an entry from the cache
+          :param key: the entry key
+          :param default: value to return if the entry is not in the cache
+          :return: the cached data, or `default` if it is not in the cache
+        """
+        entry = self._entry(key)
+        try:
+            with open(entry, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            # An unreadable entry is just a cache miss
+            entry.unlink(missing_ok=True)
+            return default
+        try:
+            os.utime(entry)         # mark it as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: Any):
+        """
+        Store an entry in the cache
+        """
+        entry = self._entry(key)
+        tmpname = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmpname, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpname, entry)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its size
+        """
+        entries = []
+        total = 0
+        for entry in self.dir.glob("*" + ENTRY_SUFFIX):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry))
+            total += st.st_size
+        if total <= self.max_size:
+            return
+        for _, size, entry in sorted(entries):
+            entry.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_size:
+                break
+
+    def load(self, filename: Union[str, Path],
+             loader: Callable[[str], Any]) -> Any:
+        """
+        Load a file through the cache
+          :param filename: the file to load
+          :param loader: the function that parses the file, in case of a
+            cache miss
+        """
+        key = self.key(filename)
+        data = self.get(key, MISS)
+        if data is MISS:
+            data = loader(filename)
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        """
+        Remove all entries in the cache
+        """
+        for entry in self.dir.glob("*" + ENTRY_SUFFIX):
+            entry.unlink(missing_ok=True)
@@ -0,0 +1,150 @@
+"""
+A binary file reader that reads ahead from a source file in a background
+thread, so that (e.g.) decompression can overlap with parsing
+"""
+
+import io
+import threading
+import queue
+
+from typing import IO
+
+
+DEFAULT_BLOCK_SIZE = 256 * 1024
+DEFAULT_MAX_BLOCKS = 8
+
+
+class PrefetchReader(io.RawIOBase):
+    """
+    Wrap a binary file object and read it in a background thread, producing
+    fixed-size blocks into a bounded queue. The object is a raw binary
+    stream, to be wrapped with io.BufferedReader (and possibly with
+    io.TextIOWrapper)
+
+    Forward seeks are done by skipping data; backward seeks rewind the
+    source file and restart the background thread.
+    """
+
+    def __init__(self, src: IO, block_size: int = DEFAULT_BLOCK_SIZE,
+                 max_blocks: int = DEFAULT_MAX_BLOCKS):
+        """
+          :param src: the source file object, opened in binary mode. It will
+            be closed when the reader is closed
+          :param block_size: size of the blocks to read from the source
+          :param max_blocks: maximum number of blocks read ahead
+        """
+        super().__init__()
+        self._src = src
+        self._size = block_size
+        self._max = max(1, max_blocks)
+        self._thread = None
+        self._start()
+
+    @property
+    def name(self) -> str:
+        return getattr(self._src, "name", None)
+
+    def _start(self):
+        """
+        Start the background reading thread
+        """
+        self._queue = queue.Queue(self._max)
+        self._stop = threading.Event()
+        self._buf = memoryview(b"")
+        self._pos = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, daemon=True,
+                                        name="PrefetchReader")
+        self._thread.start()
+
+    def _halt(self):
+        """
+        Stop the background reading thread
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join()
+        self._thread = None
+
+    def _put(self, item) -> bool:
+        """
+        Add an item to the queue, unless we are requested to stop
+        """
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _fill(self):
+        """
+        The background thread: read blocks from the source into the queue.
+        An empty block signals the end of file; an exception is passed over
+        to be raised in the consumer thread
+        """
+        try:
+            while True:
+                block = self._src.read(self._size)
+                if not self._put(block) or not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, b) -> int:
+        if self._eof:
+            return 0
+        if not self._buf:
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._buf = memoryview(item)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("unsupported seek mode")
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        if offset < self._pos:
+            self._halt()
+            self._src.seek(0)
+            self._start()
+        skip = bytearray(min(offset - self._pos, self._size))
+        while self._pos < offset:
+            view = memoryview(skip)[:offset - self._pos]
+            if not self.readinto(view):
+                break
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._halt()
+            self._src.close()
+        super().close()
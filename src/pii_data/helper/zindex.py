@@ -0,0 +1,635 @@
+"""
+Random access to ordinary compressed files (gzip & xz), through a sidecar
+checkpoint index.
+
+For gzip files the index follows the approach of zlib's `zran` example: a
+full decompression pass records checkpoints at deflate block boundaries
+(roughly every `span` uncompressed bytes), each one with its compressed bit
+position and the preceding 32 KiB of uncompressed data, which is all that
+is needed to restart decompression there. This needs the zlib C library
+(loaded through ctypes), since the Python zlib module does not provide
+block-level inflation.
+
+For xz files the checkpoints are the xz blocks, as listed in the stream
+indexes (a file compressed with a single block has a single checkpoint).
+
+Checkpoints also record the line number at their position, so that a reader
+can go to a given line by decompressing only from the nearest checkpoint.
+
+The index file starts with a JSON metadata line, followed by one line per
+checkpoint with tab-separated uncompressed offset, compressed offset, bit
+offset, line number and the position & length of its (compressed) window
+data, which is stored in binary form after the last checkpoint line.
+"""
+
+import io
+import os
+import json
+import zlib
+import lzma
+import bisect
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+from typing import Dict, List, Tuple, Iterator, Optional, BinaryIO
+
+from ..defs import FMT_ZINDEX
+from .exception import InvArgException, FileException, MissingDependency
+
+
+ZINDEX_SUFFIX = ".zidx"
+DEFAULT_SPAN = 4 * 1024 * 1024
+
+WINSIZE = 32768
+CHUNK = 64 * 1024
+
+# zlib constants
+Z_NO_FLUSH = 0
+Z_BLOCK = 5
+Z_OK = 0
+Z_STREAM_END = 1
+Z_NEED_DICT = 2
+Z_BUF_ERROR = -5
+
+TYPE_POINT = Tuple[int, int, int, int, int, int]
+
+
+def zindex_name(filename: str) -> str:
+    """
+    Return the name of the sidecar checkpoint index for a compressed file
+    """
+    return str(filename) + ZINDEX_SUFFIX
+
+
+def _compression(filename: str) -> str:
+    name = str(filename)
+    if name.endswith(".gz"):
+        return "gzip"
+    elif name.endswith(".xz"):
+        return "xz"
+    raise InvArgException("unsupported compressed file for indexing: {}",
+                          filename)
+
+
+# -------------------------------------------------------------------------
+
+class _ZStream(ctypes.Structure):
+    _fields_ = [("next_in", ctypes.c_void_p), ("avail_in", ctypes.c_uint),
+                ("total_in", ctypes.c_ulong),
+                ("next_out", ctypes.c_void_p), ("avail_out", ctypes.c_uint),
+                ("total_out", ctypes.c_ulong),
+                ("msg", ctypes.c_char_p), ("state", ctypes.c_void_p),
+                ("zalloc", ctypes.c_void_p), ("zfree", ctypes.c_void_p),
+                ("opaque", ctypes.c_void_p),
+                ("data_type", ctypes.c_int), ("adler", ctypes.c_ulong),
+                ("reserved", ctypes.c_ulong)]
+
+
+_LIBZ = None
+
+
+def _libz() -> ctypes.CDLL:
+    """
+    Load the zlib C library
+    """
+    global _LIBZ
+    if _LIBZ is None:
+        name = ctypes.util.find_library("z") or "libz.so.1"
+        try:
+            lib = ctypes.CDLL(name)
+        except OSError as e:
+            raise MissingDependency("cannot load the zlib library: {}",
+                                    e) from e
+        stream = ctypes.POINTER(_ZStream)
+        lib.zlibVersion.restype = ctypes.c_char_p
+        lib.inflateInit2_.argtypes = [stream, ctypes.c_int, ctypes.c_char_p,
+                                      ctypes.c_int]
+        lib.inflate.argtypes = [stream, ctypes.c_int]
+        lib.inflateEnd.argtypes = [stream]
+        lib.inflateReset2.argtypes = [stream, ctypes.c_int]
+        lib.inflatePrime.argtypes = [stream, ctypes.c_int, ctypes.c_int]
+        lib.inflateSetDictionary.argtypes = [stream, ctypes.c_char_p,
+                                             ctypes.c_uint]
+        _LIBZ = lib
+    return _LIBZ
+
+
+class _GzInflater:
+    """
+    An inflater over a gzip file, able to start at any deflate block
+    boundary (given the bit offset and the preceding window) or at the
+    beginning of a gzip member
+    """
+
+    def __init__(self, f: BinaryIO, coffset: int = 0, bits: int = -1,
+                 window: bytes = None):
+        """
+          :param f: the compressed file
+          :param coffset: compressed offset to start at
+          :param bits: number of bits of the previous byte that belong to
+            the first block, or -1 to start at a gzip member header
+          :param window: uncompressed data preceding the starting point
+        """
+        self._lib = _libz()
+        self._s = _ZStream()
+        self._raw = bits >= 0
+        ret = self._lib.inflateInit2_(ctypes.byref(self._s),
+                                      -15 if self._raw else 47,
+                                      self._lib.zlibVersion(),
+                                      ctypes.sizeof(_ZStream))
+        if ret != Z_OK:
+            raise FileException("cannot initialize zlib inflater: {}", ret)
+        self._f = f
+        self._in = ctypes.create_string_buffer(CHUNK)
+        self._out = ctypes.create_string_buffer(CHUNK)
+        self.cpos = coffset
+        if bits > 0:
+            f.seek(coffset - 1)
+            c = f.read(1)[0]
+            self._lib.inflatePrime(ctypes.byref(self._s), bits, c >> (8 - bits))
+        else:
+            f.seek(coffset)
+        if window:
+            self._lib.inflateSetDictionary(ctypes.byref(self._s), window,
+                                           len(window))
+
+    def close(self):
+        if self._s is not None:
+            self._lib.inflateEnd(ctypes.byref(self._s))
+            self._s = None
+
+    def __del__(self):
+        self.close()
+
+    def _feed(self) -> bool:
+        """
+        Load more compressed input, if needed
+        """
+        if self._s.avail_in:
+            return True
+        data = self._f.read(CHUNK)
+        if not data:
+            return False
+        ctypes.memmove(self._in, data, len(data))
+        self._s.next_in = ctypes.addressof(self._in)
+        self._s.avail_in = len(data)
+        return True
+
+    def _skip(self, num: int):
+        """
+        Skip compressed input bytes (a gzip trailer)
+        """
+        n = min(num, self._s.avail_in)
+        self._s.next_in += n
+        self._s.avail_in -= n
+        self.cpos += num
+        if num > n:
+            self._f.read(num - n)
+
+    @property
+    def bits(self) -> int:
+        return self._s.data_type & 7
+
+    def step(self, flush: int = Z_NO_FLUSH) -> Tuple[bytes, str]:
+        """
+        Perform one inflate call
+          :return: a tuple (output data, status), where status can be "ok",
+            "block" (at a block boundary), "member" (at the start of a new
+            gzip member) or "eof"
+        """
+        if not self._feed():
+            raise FileException("unexpected end of compressed file: {}",
+                                getattr(self._f, "name", ""))
+        s = self._s
+        s.next_out = ctypes.addressof(self._out)
+        s.avail_out = CHUNK
+        avail = s.avail_in
+        ret = self._lib.inflate(ctypes.byref(s), flush)
+        self.cpos += avail - s.avail_in
+        data = self._out.raw[:CHUNK - s.avail_out]
+
+        if ret == Z_STREAM_END:
+            if self._raw:
+                self._skip(8)       # gzip trailer
+                self._raw = False
+            self._lib.inflateReset2(ctypes.byref(s), 47)
+            return data, "member" if self._feed() else "eof"
+        elif ret not in (Z_OK, Z_BUF_ERROR):
+            msg = s.msg.decode("utf-8", "replace") if s.msg else ret
+            raise FileException("invalid compressed data in {}: {}",
+                                getattr(self._f, "name", ""), msg)
+        elif flush == Z_BLOCK and s.data_type & 128 and not s.data_type & 64:
+            return data, "block"
+        return data, "ok"
+
+
+def _gz_decode(f: BinaryIO, point: TYPE_POINT,
+               window: bytes) -> Iterator[bytes]:
+    """
+    Decompress a gzip file from a checkpoint
+    """
+    inf = _GzInflater(f, point[1], point[2], window)
+    try:
+        while True:
+            data, status = inf.step()
+            if data:
+                yield data
+            if status == "eof":
+                return
+    finally:
+        inf.close()
+
+
+def _gz_points(f: BinaryIO, span: int) -> Iterator[Tuple[TYPE_POINT, bytes]]:
+    """
+    Decompress a full gzip file and produce checkpoints
+    """
+    inf = _GzInflater(f)
+    window = b""
+    upos = lines = 0
+    last = -span
+    yield (0, 0, -1, 0), b""
+    try:
+        while True:
+            data, status = inf.step(Z_BLOCK)
+            if data:
+                upos += len(data)
+                lines += data.count(b"\n")
+                window = (window + data)[-WINSIZE:]
+            if status == "eof":
+                break
+            elif upos - last < span:
+                continue
+            elif status == "member":
+                last = upos
+                yield (upos, inf.cpos, -1, lines), b""
+            elif status == "block":
+                last = upos
+                yield (upos, inf.cpos, inf.bits, lines), window
+    finally:
+        inf.close()
+    yield (upos, None, None, lines), None
+
+
+# -------------------------------------------------------------------------
+
+def _varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Decode an xz variable-length integer
+    """
+    value = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _xz_blocks(f: BinaryIO) -> List[Tuple[int, int]]:
+    """
+    Read the stream indexes in an xz file, and return the list of blocks it
+    contains, as (compressed offset, uncompressed size) tuples
+    """
+    f.seek(0, io.SEEK_END)
+    end = f.tell()
+    streams = []
+    while end > 0:
+        # Stream padding
+        while end >= 4:
+            f.seek(end - 4)
+            if f.read(4) != b"\0\0\0\0":
+                break
+            end -= 4
+        f.seek(end - 12)
+        footer = f.read(12)
+        if len(footer) != 12 or footer[10:12] != b"YZ":
+            raise FileException("invalid xz stream footer in {}", f.name)
+        size = (int.from_bytes(footer[4:8], "little") + 1) * 4
+        start = end - 12 - size
+        f.seek(start)
+        index = f.read(size)
+        if index[0] != 0:
+            raise FileException("invalid xz index in {}", f.name)
+        num, pos = _varint(index, 1)
+        records = []
+        for _ in range(num):
+            unpadded, pos = _varint(index, pos)
+            usize, pos = _varint(index, pos)
+            records.append(((unpadded + 3) & ~3, usize))
+        end = start - sum(r[0] for r in records) - 12
+        offset = end + 12
+        blocks = []
+        for csize, usize in records:
+            blocks.append((offset, usize))
+            offset += csize
+        streams.append(blocks)
+    return [b for blocks in reversed(streams) for b in blocks]
+
+
+def _xz_block_decode(f: BinaryIO, coffset: int) -> Iterator[bytes]:
+    """
+    Decompress a single xz block
+    """
+    f.seek(coffset)
+    header = f.read(1)
+    header += f.read((header[0] + 1) * 4 - 1)
+    flags = header[1]
+    pos = 2
+    if flags & 0x40:
+        _, pos = _varint(header, pos)
+    if flags & 0x80:
+        _, pos = _varint(header, pos)
+    filters = []
+    for _ in range((flags & 3) + 1):
+        fid, pos = _varint(header, pos)
+        psize, pos = _varint(header, pos)
+        # lzma provides no public API to decode a filter properties field
+        filters.append(lzma._decode_filter_properties(fid,
+                                                      header[pos:pos+psize]))
+        pos += psize
+    dec = lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=filters)
+    while not dec.eof:
+        data = f.read(CHUNK)
+        if not data:
+            raise FileException("unexpected end of compressed file: {}",
+                                f.name)
+        data = dec.decompress(data)
+        if data:
+            yield data
+
+
+def _xz_points(f: BinaryIO, span: int) -> Iterator[Tuple[TYPE_POINT, bytes]]:
+    """
+    Decompress a full xz file and produce checkpoints (one per block)
+    """
+    upos = lines = 0
+    for coffset, usize in _xz_blocks(f):
+        yield (upos, coffset, 0, lines), b""
+        for data in _xz_block_decode(f, coffset):
+            upos += len(data)
+            lines += data.count(b"\n")
+    yield (upos, None, None, lines), None
+
+
+# -------------------------------------------------------------------------
+
+def _file_signature(filename: str) -> Dict:
+    st = os.stat(filename)
+    return {"size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def build_seek_index(filename: str, span: int = DEFAULT_SPAN) -> str:
+    """
+    Build the checkpoint index for a compressed file (gzip or xz), and store
+    it as a sidecar file
+      :param filename: the compressed file
+      :param span: minimum distance between checkpoints, in uncompressed
+        bytes (gzip only; xz checkpoints are always at block starts)
+      :return: the name of the index file
+    """
+    comp = _compression(filename)
+    idxname = zindex_name(filename)
+    points, windows = [], []
+    wpos = 0
+    with open(filename, "rb") as f:
+        gen = _gz_points if comp == "gzip" else _xz_points
+        for (upos, coffset, bits, lines), window in gen(f, span):
+            if coffset is None:
+                break
+            wdata = zlib.compress(window) if window else b""
+            points.append((upos, coffset, bits, lines, wpos, len(wdata)))
+            windows.append(wdata)
+            wpos += len(wdata)
+
+    meta = {"format": FMT_ZINDEX, "compression": comp, "span": span,
+            "usize": upos, "lines": lines, "points": len(points),
+            "source": _file_signature(filename)}
+    tmpname = idxname + ".tmp"
+    with open(tmpname, "wb") as f:
+        f.write(json.dumps(meta).encode("utf-8") + b"\n")
+        for p in points:
+            f.write("\t".join(map(str, p)).encode("utf-8") + b"\n")
+        for w in windows:
+            f.write(w)
+    os.replace(tmpname, idxname)
+    return idxname
+
+
+class SeekIndex:
+    """
+    A loaded checkpoint index
+    """
+
+    def __init__(self, filename: str):
+        self.name = str(filename)
+        try:
+            with open(self.name, "rb") as f:
+                self.meta = json.loads(f.readline())
+                if self.meta.get("format") != FMT_ZINDEX:
+                    raise FileException("invalid index format in '{}'",
+                                        self.name)
+                self.points = [tuple(map(int, f.readline().split(b"\t")))
+                               for _ in range(self.meta["points"])]
+                self._wstart = f.tell()
+        except (ValueError, KeyError) as e:
+            raise FileException("invalid index '{}': {}", self.name, e) from e
+        self._offsets = [p[0] for p in self.points]
+        self._lines = [p[3] for p in self.points]
+
+    @property
+    def size(self) -> int:
+        """
+        Total uncompressed size
+        """
+        return self.meta["usize"]
+
+    def is_current(self, filename: str) -> bool:
+        """
+        Check if the index corresponds to the current state of a file
+        """
+        return self.meta.get("source") == _file_signature(filename)
+
+    def find(self, offset: int) -> int:
+        """
+        Find the last checkpoint at or before an uncompressed offset
+        """
+        return max(bisect.bisect_right(self._offsets, offset) - 1, 0)
+
+    def find_line(self, line: int) -> int:
+        """
+        Find the last checkpoint at or before the start of a line
+        """
+        return max(bisect.bisect_right(self._lines, line) - 1, 0)
+
+    def window(self, num: int) -> bytes:
+        """
+        Return the window data for a checkpoint
+        """
+        _, _, _, _, wpos, wlen = self.points[num]
+        if not wlen:
+            return b""
+        with open(self.name, "rb") as f:
+            f.seek(self._wstart + wpos)
+            return zlib.decompress(f.read(wlen))
+
+    def decode(self, f: BinaryIO, num: int) -> Iterator[bytes]:
+        """
+        Decompress a file starting at a checkpoint
+        """
+        if self.meta["compression"] == "gzip":
+            yield from _gz_decode(f, self.points[num], self.window(num))
+        else:
+            for p in self.points[num:]:
+                yield from _xz_block_decode(f, p[1])
+
+
+class SeekableReader(io.BufferedIOBase):
+    """
+    A binary reader over a compressed file, which uses a checkpoint index to
+    seek efficiently to any uncompressed offset or line
+    """
+
+    def __init__(self, filename: str, index: SeekIndex = None):
+        """
+          :param filename: the compressed file
+          :param index: its checkpoint index (if not given, it will be loaded
+            from its sidecar file)
+        """
+        super().__init__()
+        self.name = str(filename)
+        self._index = index or SeekIndex(zindex_name(filename))
+        self._f = open(filename, "rb")
+        self._restart(0)
+
+    def _restart(self, num: int):
+        """
+        Restart decompression at a checkpoint
+        """
+        self._gen = self._index.decode(self._f, num)
+        self._buf = b""
+        self._bpos = 0
+        self._pos = self._index.points[num][0] if self._index.points else 0
+
+    def _fill(self) -> bool:
+        """
+        Decompress the next block of data, if the buffer is exhausted
+        """
+        if self._bpos < len(self._buf):
+            return True
+        self._buf = next(self._gen, b"")
+        self._bpos = 0
+        return bool(self._buf)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def read1(self, size: int = -1) -> bytes:
+        if not self._fill():
+            return b""
+        end = len(self._buf) if size is None or size < 0 else self._bpos + size
+        data = self._buf[self._bpos:end]
+        self._bpos += len(data)
+        self._pos += len(data)
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        remain = -1 if size is None else size
+        while remain:
+            data = self.read1(remain)
+            if not data:
+                break
+            parts.append(data)
+            if remain > 0:
+                remain -= len(data)
+        return b"".join(parts)
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def readline(self, size: int = -1) -> bytes:
+        parts = []
+        remain = -1 if size is None else size
+        while remain and self._fill():
+            end = self._buf.find(b"\n", self._bpos) + 1 or len(self._buf)
+            if remain > 0:
+                end = min(end, self._bpos + remain)
+                remain -= end - self._bpos
+            parts.append(self._buf[self._bpos:end])
+            self._pos += end - self._bpos
+            self._bpos = end
+            if parts[-1].endswith(b"\n"):
+                break
+        return b"".join(parts)
+
+    def _skip(self, num: int):
+        while num > 0:
+            data = self.read1(num)
+            if not data:
+                break
+            num -= len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._index.size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        num = self._index.find(offset)
+        if not self._pos <= offset < self._pos + self._index.meta["span"] \
+           or self._index.points[num][0] > self._pos:
+            self._restart(num)
+        self._skip(offset - self._pos)
+        return self._pos
+
+    def seek_line(self, line: int) -> int:
+        """
+        Position the reader at the start of a line (numbered from 0)
+          :return: the uncompressed offset of the line
+        """
+        if line < 0:
+            raise InvArgException("invalid line number: {}", line)
+        num = self._index.find_line(line)
+        self._restart(num)
+        for _ in range(line - self._index.points[num][3]):
+            if not self.readline():
+                break
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._gen.close()
+            self._f.close()
+        super().close()
+
+
+def open_seekable(filename: str) -> Optional[SeekableReader]:
+    """
+    Open a compressed file with a seekable reader, if it has an up-to-date
+    checkpoint index (and the needed libraries are available). If not,
+    return None
+    """
+    idxname = zindex_name(filename)
+    if not Path(idxname).is_file():
+        return None
+    try:
+        index = SeekIndex(idxname)
+        if not index.is_current(filename):
+            return None
+        if index.meta["compression"] == "gzip":
+            _libz()
+    except (FileException, MissingDependency):
+        return None
+    return SeekableReader(filename, index)
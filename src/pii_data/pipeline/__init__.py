@@ -0,0 +1,16 @@
+from ..helper.lazy import lazy_exports
+
+# Exported names, and the submodule defining each one. They are loaded
+# on first access
+_EXPORTS = {
+    "PipelineRunner":   ".runner",
+    "Checkpoint":       ".checkpoint",
+    "SharedChunkBatch": ".shm",
+    "unpack_chunks":    ".shm",
+    "dispatch_chunks":  ".shm",
+    "dump_files":       ".bulk"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,178 @@
+"""
+Convert many document files to another format, writing them into an output
+directory tree that mirrors the layout of the input files. Conversions are
+done in a pool of worker processes.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import glob
+import os
+import time
+
+from typing import Dict, Iterable, List, Tuple, Union
+
+from ..helper.exception import InvArgException, ProcException
+from ..helper.io import base_extension
+from ..helper.logger import PiiLogger
+from ..helper.misc import peak_rss
+from ..types.doc.localdoc import LocalSrcDocumentFile, dump_file
+
+
+# File extension for each output format
+FORMAT_EXT = {"yml": ".yaml", "yaml": ".yaml", "json": ".json",
+              "ndjson": ".ndjson", "jsonl": ".ndjson", "txt": ".txt",
+              "text": ".txt"}
+
+# File extensions of document files, when searching in directories
+DOC_EXT = (".yaml", ".yml", ".json", ".ndjson", ".jsonl")
+
+TYPE_PATH = Union[str, Path]
+
+
+def expand_inputs(inputs: Iterable[TYPE_PATH]) -> List[Path]:
+    """
+    Expand a list of input specifications into a list of files
+      :param inputs: filenames, directories (all document files in them, at
+        any depth, are used) or glob patterns (which may use "**" to match
+        any number of subdirectories)
+    """
+    files = []
+    for spec in inputs:
+        spec = str(spec)
+        if glob.has_magic(spec):
+            files += sorted(Path(f) for f in glob.iglob(spec, recursive=True)
+                            if os.path.isfile(f))
+        elif os.path.isdir(spec):
+            files += sorted(f for f in Path(spec).rglob("*")
+                            if base_extension(f) in DOC_EXT and f.is_file())
+        elif os.path.isfile(spec):
+            files.append(Path(spec))
+        else:
+            raise InvArgException("cannot find input file: {}", spec)
+    return files
+
+
+def output_name(filename: TYPE_PATH, input_root: TYPE_PATH,
+                outdir: TYPE_PATH, ext: str) -> Path:
+    """
+    Build the output name for an input file: its path relative to the input
+    root (as in set_id_path()), placed in the output directory and with the
+    file extension replaced
+    """
+    try:
+        rel = Path(filename).relative_to(input_root)
+    except ValueError as e:
+        raise InvArgException("cannot place output for {}: {}",
+                              filename, e) from e
+    name = rel.stem if rel.suffix in (".gz", ".bz2", ".xz") else rel.name
+    return Path(outdir) / rel.parent / (Path(name).stem + ext)
+
+
+def _common_root(files: List[Path]) -> Path:
+    """
+    Find the deepest directory containing all the files
+    """
+    return Path(os.path.commonpath([str(f.parent.absolute()) for f in files]))
+
+
+def _convert(src: Path, dst: Path, dump_args: Dict) -> Tuple[Path, int, str]:
+    """
+    Convert one document file. Errors are returned as strings
+    """
+    try:
+        doc = LocalSrcDocumentFile(src)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dump_file(doc, dst, **dump_args)
+        return src, src.stat().st_size, None
+    except Exception as e:
+        return src, 0, f"{type(e).__name__}: {e}"
+
+
+def dump_files(inputs: Iterable[TYPE_PATH], outdir: TYPE_PATH,
+               format: str = "txt", input_root: TYPE_PATH = None,
+               workers: int = None, max_pending: int = None,
+               on_error: str = "skip", debug: bool = None,
+               **dump_args) -> Dict:
+    """
+    Convert a set of document files, writing the results into a directory
+      :param inputs: input filenames, directories or glob patterns
+      :param outdir: output directory. Each output file is placed in it at
+        the same relative path its input has within the input root
+      :param format: output format (any format accepted by dump_file())
+      :param input_root: base directory for input files (default: the
+        deepest directory containing all of them)
+      :param workers: number of worker processes (if `None`, the number
+        of CPUs). If 0, convert documents in the current process
+      :param max_pending: maximum number of conversions in flight at any
+        time (default: four per worker)
+      :param on_error: what to do when a conversion fails: "raise" or "skip"
+      :param debug: logger behaviour (see PiiLogger)
+      :param dump_args: additional arguments for dump_file()
+      :return: a dict with processing statistics; it includes a "failed"
+        list with (filename, error message) tuples, and the peak memory
+        used ("peak_rss", in bytes, including worker processes)
+    """
+    if on_error not in ("raise", "skip"):
+        raise InvArgException("invalid on_error value: {}", on_error)
+    ext = FORMAT_EXT.get(str(format).lower())
+    if ext is None:
+        raise InvArgException("unsupported output format: {}", format)
+    log = PiiLogger(__name__, debug)
+
+    # Find all input files, and their output names
+    files = expand_inputs(inputs)
+    if input_root is None:
+        input_root = _common_root(files) if files else Path()
+    input_root = Path(input_root).absolute()
+    jobs = {}
+    for src in files:
+        dst = output_name(src.absolute(), input_root, outdir, ext)
+        if dst in jobs:
+            raise InvArgException("inputs {} and {} produce the same output",
+                                  jobs[dst], src)
+        jobs[dst] = src
+    dump_args["format"] = format
+
+    stats = {"documents": 0, "errors": 0, "bytes": 0, "failed": []}
+
+    def result(src: Path, size: int, error: str):
+        if error:
+            stats["errors"] += 1
+            stats["failed"].append((str(src), error))
+            log("error in document %s: %s", src, error)
+            if on_error == "raise":
+                raise ProcException("conversion error in {}: {}", src, error)
+        else:
+            stats["documents"] += 1
+            stats["bytes"] += size
+
+    workers = os.cpu_count() if workers is None else workers
+    start = time.time()
+    try:
+        if not workers:
+            for dst, src in jobs.items():
+                result(*_convert(src, dst, dump_args))
+        else:
+            # Process pool, with a bounded window of pending conversions
+            max_pending = max_pending or 4*workers
+            pending = deque()
+            pool = ProcessPoolExecutor(workers)
+            try:
+                for dst, src in jobs.items():
+                    if len(pending) >= max_pending:
+                        result(*pending.popleft().result())
+                    pending.append(pool.submit(_convert, src, dst, dump_args))
+                while pending:
+                    result(*pending.popleft().result())
+            finally:
+                for fut in pending:
+                    fut.cancel()
+                pool.shutdown(wait=True)
+    finally:
+        stats["elapsed"] = time.time() - start
+        stats["peak_rss"] = peak_rss()
+        log("converted: %d documents, %d errors", stats["documents"],
+            stats["errors"])
+    return stats
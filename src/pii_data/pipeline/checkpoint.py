@@ -0,0 +1,68 @@
+"""
+Checkpoints for long-running document processing jobs
+
+A checkpoint records the last document whose output has been fully written
+(committed), the number of documents processed, and the size of the output
+file at that point. Checkpoint files are replaced atomically.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from typing import Dict
+
+from ..helper.exception import FileException
+
+
+class Checkpoint:
+    """
+    Read & write a checkpoint file
+    """
+
+    def __init__(self, filename: str):
+        self.name = Path(filename)
+        self.data = {}
+
+
+    def __repr__(self) -> str:
+        return f"<Checkpoint {self.name}>"
+
+
+    def load(self) -> Dict:
+        """
+        Read the checkpoint file, if it exists
+          :return: the checkpoint data (empty if there is no checkpoint)
+        """
+        if not self.name.is_file():
+            self.data = {}
+            return self.data
+        try:
+            with open(self.name, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise FileException("invalid checkpoint file '{}': {}",
+                                self.name, e) from e
+        return self.data
+
+
+    def save(self, **data):
+        """
+        Write the checkpoint file. The data is written to a temporary file,
+        which then replaces the checkpoint file
+        """
+        self.data = data
+        tmpname = self.name.with_name(self.name.name + ".tmp")
+        with open(tmpname, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpname, self.name)
+
+
+    def remove(self):
+        """
+        Delete the checkpoint file, if it exists
+        """
+        self.data = {}
+        self.name.unlink(missing_ok=True)
@@ -0,0 +1,257 @@
+"""
+Run a PII detector over a stream of documents, using a pool of worker
+processes, and write the resulting PiiCollection objects to an NDJSON file.
+
+The detector is given as a factory: a callable (or the fully qualified name
+of one) that is called once in each worker, with the detector arguments, and
+returns the function that processes a document. That function must accept a
+SrcDocument and return a PiiCollection.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+import os
+import time
+
+from typing import Dict, Iterable, Callable, Union, TextIO, Tuple
+
+from ..helper.exception import InvArgException, ProcException
+from ..helper.io import openfile
+from ..helper.logger import PiiLogger
+from ..helper.misc import import_object
+from ..types.doc import SrcDocument, Corpus
+from ..types.piicollection import PiiCollection
+from .checkpoint import Checkpoint
+
+
+TYPE_FACTORY = Union[str, Callable]
+
+# The detector for the current (worker) process
+_DETECTOR = None
+
+
+def build_detector(factory: TYPE_FACTORY, args: Dict = None) -> Callable:
+    """
+    Create a detector function from its factory
+    """
+    if isinstance(factory, str):
+        factory = import_object(factory)
+    return factory(**(args or {}))
+
+
+def _init_worker(factory: TYPE_FACTORY, args: Dict):
+    """
+    Initialize a worker process, by creating its detector
+    """
+    global _DETECTOR
+    _DETECTOR = build_detector(factory, args)
+
+
+def _detect(doc: SrcDocument) -> Tuple[str, Union[PiiCollection, str]]:
+    """
+    Process a document in a worker. Errors are returned as strings
+    """
+    try:
+        return doc.id, _DETECTOR(doc)
+    except Exception as e:
+        return doc.id, f"{type(e).__name__}: {e}"
+
+
+class PipelineRunner:
+    """
+    Process documents in parallel with a PII detector, writing the
+    resulting collections in document order
+    """
+
+    def __init__(self, detector: TYPE_FACTORY, detector_args: Dict = None,
+                 workers: int = None, max_pending: int = None,
+                 on_error: str = "raise", checkpoint: str = None,
+                 checkpoint_every: int = 100, debug: bool = None):
+        """
+          :param detector: the detector factory (or its fully qualified name)
+          :param detector_args: arguments for the detector factory
+          :param workers: number of worker processes (if `None`, the number
+            of CPUs). If 0, process documents in the current process
+          :param max_pending: maximum number of documents in flight at any
+            time (default: four per worker). Reading stops while this limit
+            is reached
+          :param on_error: what to do when the detector fails on a
+            document: "raise" or "skip"
+          :param checkpoint: name of a checkpoint file, to be able to resume
+            an interrupted run
+          :param checkpoint_every: number of documents between checkpoints
+          :param debug: logger behaviour (see PiiLogger)
+        """
+        if on_error not in ("raise", "skip"):
+            raise InvArgException("invalid on_error value: {}", on_error)
+        self.factory = detector
+        self.args = detector_args or {}
+        self.workers = os.cpu_count() if workers is None else workers
+        self.max_pending = max_pending or 4*max(self.workers, 1)
+        self.on_error = on_error
+        self.ckpt = Checkpoint(checkpoint) if checkpoint else None
+        self.ckpt_every = max(int(checkpoint_every), 1)
+        self.log = PiiLogger(__name__, debug)
+        self.stats = {}
+
+
+    def __repr__(self) -> str:
+        return f"<PipelineRunner #{self.workers}>"
+
+
+    def _write(self, out: TextIO, docid: str,
+               result: Union[PiiCollection, str]):
+        """
+        Write the result for one document
+        """
+        if isinstance(result, str):
+            self.stats["errors"] += 1
+            self.log("error in document %s: %s", docid, result)
+            if self.on_error == "raise":
+                raise ProcException("detector error in document {}: {}",
+                                    docid, result)
+        else:
+            result.dump(out, format="ndjson")
+            self.stats["documents"] += 1
+            self.stats["entities"] += len(result)
+        self._commit(out, docid)
+
+
+    def _commit(self, out: TextIO, docid: str):
+        """
+        Record a document as processed, and write a checkpoint if needed
+        """
+        self._last = docid
+        self._done += 1
+        if self.ckpt and self._done % self.ckpt_every == 0:
+            self._checkpoint(out)
+
+
+    def _checkpoint(self, out: TextIO):
+        """
+        Ensure all output is on disk, and write a checkpoint
+        """
+        out.flush()
+        os.fsync(out.fileno())
+        self.ckpt.save(last_docid=self._last, processed=self._done,
+                       output_offset=out.buffer.tell(), stats=self.stats)
+
+
+    def _resume(self, documents: Iterable[SrcDocument],
+                output: str) -> Iterable[SrcDocument]:
+        """
+        Prepare the resumption of a run from the checkpoint: skip the
+        documents already processed, and truncate the output file to the
+        last committed record. The output file is modified only after
+        checking that both the documents and the output are consistent with
+        the checkpoint
+        """
+        data = self.ckpt.data
+        offset = data["output_offset"]
+        size = Path(output).stat().st_size
+        if offset > size:
+            raise ProcException("resume error: checkpoint offset {} is past"
+                                " the end of the output file ({} bytes)",
+                                offset, size)
+        self._done = data["processed"]
+        self._last = data["last_docid"]
+
+        # Skip processed documents
+        if isinstance(documents, Corpus):
+            documents = documents.iter_docs(start=self._last)
+            try:
+                last = next(documents, None)
+            except InvArgException as e:
+                raise ProcException("resume error: {}", e) from e
+        else:
+            documents = iter(documents)
+            last = None
+            for last in islice(documents, self._done):
+                pass
+        if last is None or last.id != self._last:
+            raise ProcException("resume error: document {} found, expected {}",
+                                last.id if last else None, self._last)
+
+        with open(output, "r+b") as f:
+            f.truncate(offset)
+        self.stats.update(data["stats"])
+        self.log("resuming after document %s (%d processed)", self._last,
+                 self._done)
+        return documents
+
+
+    def _run_local(self, documents: Iterable[SrcDocument], out: TextIO):
+        """
+        Process all documents in the current process
+        """
+        _init_worker(self.factory, self.args)
+        for doc in documents:
+            self._write(out, *_detect(doc))
+
+
+    def _run_pool(self, documents: Iterable[SrcDocument], out: TextIO):
+        """
+        Process all documents in a process pool, keeping a bounded window of
+        pending documents, and writing results in submission order
+        """
+        pending = deque()
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                   initargs=(self.factory, self.args))
+        try:
+            for doc in documents:
+                if len(pending) >= self.max_pending:
+                    self._write(out, *pending.popleft().result())
+                pending.append(pool.submit(_detect, doc))
+            while pending:
+                self._write(out, *pending.popleft().result())
+        finally:
+            # On errors (or interruption) drop all pending work
+            for fut in pending:
+                fut.cancel()
+            pool.shutdown(wait=True)
+
+
+    def run(self, documents: Iterable[SrcDocument],
+            output: Union[str, TextIO], resume: bool = False) -> Dict:
+        """
+        Process a stream of documents
+          :param documents: an iterable of SrcDocument objects
+          :param output: output destination (a filename or a file-like object;
+            when using checkpoints it must be the name of an uncompressed file)
+          :param resume: resume processing from the checkpoint (if there is
+            one). The same documents must be passed as in the original run.
+            Without it, any existing checkpoint is discarded
+          :return: a dict with processing statistics
+        """
+        self.stats = {"documents": 0, "entities": 0, "errors": 0}
+        self._done, self._last = 0, None
+        if self.ckpt and (not isinstance(output, (str, Path)) or
+                          Path(output).suffix in (".gz", ".bz2", ".xz")):
+            raise InvArgException("checkpoints need an uncompressed output file")
+
+        mode = "wt"
+        if resume and self.ckpt and Path(output).is_file() and \
+           self.ckpt.load():
+            documents = self._resume(documents, output)
+            mode = "at"
+        elif self.ckpt:
+            # A checkpoint from a previous run does not apply to this one
+            self.ckpt.remove()
+
+        start = time.time()
+        out = openfile(output, mode, encoding="utf-8")
+        try:
+            if self.workers:
+                self._run_pool(documents, out)
+            else:
+                self._run_local(documents, out)
+            if self.ckpt and self._last is not None:
+                self._checkpoint(out)
+        finally:
+            if out != output:
+                out.close()
+            self.stats["elapsed"] = time.time() - start
+            self.log("processed: %s", self.stats)
+        return self.stats
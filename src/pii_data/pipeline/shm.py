@@ -0,0 +1,201 @@
+"""
+Transfer batches of document chunks to worker processes through shared
+memory.
+
+The chunk texts in a batch are packed (as UTF-8) into a single shared memory
+block; workers receive only the block name and a table of chunk ids &
+offsets, and rebuild lightweight DocumentChunk objects locally. This avoids
+pickling each chunk (and its context) to send it to the worker.
+"""
+
+from collections import deque
+from concurrent.futures import Executor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from itertools import islice
+import threading
+
+from typing import Iterable, Iterator, List, Tuple, Callable, Dict, Any
+
+from ..helper.exception import InvArgException
+from ..types.doc import DocumentChunk
+
+
+# Serializes the patching of the resource tracker in _attach()
+_ATTACH_LOCK = threading.Lock()
+
+
+class ChunkBatchRef:
+    """
+    A small picklable reference to a chunk batch in shared memory: the
+    memory block name, a (chunk id, start, end) table, and an optional
+    context dict shared by all the chunks in the batch
+    """
+
+    __slots__ = "name", "table", "context"
+
+    def __init__(self, name: str, table: Tuple[Tuple[str, int, int], ...],
+                 context: Dict = None):
+        self.name = name
+        self.table = table
+        self.context = context
+
+    def __getstate__(self):
+        return self.name, self.table, self.context
+
+    def __setstate__(self, state):
+        self.name, self.table, self.context = state
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __repr__(self) -> str:
+        return f"<ChunkBatchRef {self.name} #{len(self.table)}>"
+
+
+class SharedChunkBatch:
+    """
+    Pack a batch of chunks into a shared memory block. The object owns the
+    block: it must be closed (which also frees the block) once all workers
+    are done with it; it can be used as a context manager.
+    """
+
+    def __init__(self, chunks: Iterable[DocumentChunk], context: Dict = None):
+        """
+          :param chunks: the chunks to pack (their data must be strings)
+          :param context: a context dict to pass along to all chunks
+        """
+        encoded = []
+        table = []
+        pos = 0
+        for chunk in chunks:
+            if not isinstance(chunk.data, str):
+                raise InvArgException("non-text chunk cannot be packed: {}",
+                                      chunk.id)
+            data = chunk.data.encode("utf-8")
+            encoded.append(data)
+            table.append((chunk.id, pos, pos + len(data)))
+            pos += len(data)
+
+        self._shm = SharedMemory(create=True, size=max(pos, 1))
+        buf = self._shm.buf
+        for (_, start, end), data in zip(table, encoded):
+            buf[start:end] = data
+        self.ref = ChunkBatchRef(self._shm.name, tuple(table), context)
+
+
+    def __repr__(self) -> str:
+        return f"<SharedChunkBatch {self.ref.name} #{len(self.ref)}>"
+
+
+    def close(self):
+        """
+        Release & free the shared memory block
+        """
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+    def __enter__(self) -> "SharedChunkBatch":
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _no_register(name: str, rtype: str):
+    pass
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Attach to an existing shared memory block, without taking ownership
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python < 3.13: attaching registers the block in the resource tracker,
+    # which would unlink it (or warn about a leak) when the tracker's
+    # processes exit. Unregistering afterwards is not an option, since with
+    # the fork start method the tracker is shared with the owner, and that
+    # would drop the owner's registration. So avoid the registration
+    with _ATTACH_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = _no_register
+        try:
+            return SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def unpack_chunks(ref: ChunkBatchRef) -> List[DocumentChunk]:
+    """
+    Rebuild the DocumentChunk objects for a batch in shared memory
+    """
+    shm = _attach(ref.name)
+    try:
+        out = []
+        for cid, start, end in ref.table:
+            with shm.buf[start:end] as piece:
+                out.append(DocumentChunk(cid, str(piece, "utf-8"),
+                                         ref.context))
+        return out
+    finally:
+        shm.close()
+
+
+def _process_batch(func: Callable, ref: ChunkBatchRef) -> List[Any]:
+    """
+    Worker function: rebuild the chunks in a batch and apply a function
+    """
+    return [func(chunk) for chunk in unpack_chunks(ref)]
+
+
+def dispatch_chunks(executor: Executor, func: Callable,
+                    chunks: Iterable[DocumentChunk], batch_size: int = 1000,
+                    max_pending: int = None,
+                    context: Dict = None) -> Iterator[Any]:
+    """
+    Apply a function to a stream of chunks in a pool of worker processes,
+    sending the chunks through shared memory
+      :param executor: the process pool to use
+      :param func: the function to apply; it must be picklable (e.g. a
+        module-level function) and take a DocumentChunk as argument
+      :param chunks: the chunks to process
+      :param batch_size: number of chunks per batch
+      :param max_pending: maximum number of batches in flight
+      :param context: a context dict to add to all rebuilt chunks
+      :return: an iterator over the function results, in chunk order
+    """
+    if max_pending is None:
+        max_pending = 2*getattr(executor, "_max_workers", 2)
+    pending = deque()
+    chunks = iter(chunks)
+    try:
+        while True:
+            batch = list(islice(chunks, batch_size))
+            if not batch:
+                break
+            if len(pending) >= max_pending:
+                shared, fut = pending.popleft()
+                with shared:
+                    yield from fut.result()
+            shared = SharedChunkBatch(batch, context)
+            pending.append((shared, executor.submit(_process_batch, func,
+                                                    shared.ref)))
+        while pending:
+            shared, fut = pending.popleft()
+            with shared:
+                yield from fut.result()
+    finally:
+        for shared, fut in pending:
+            fut.cancel()
+            try:
+                fut.result()
+            except BaseException:
+                pass
+            shared.close()
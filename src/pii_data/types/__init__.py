@@ -1,3 +1,16 @@
-from .piienum import PiiEnum    # noqa: F401
-from .piientity import PiiEntityInfo, PiiEntity    # noqa: F401
-from .piicollection import PiiDetector, PiiCollection, PiiCollectionLoader    # noqa: F401
+from ..helper.lazy import lazy_exports
+
+# Exported names, and the submodule defining each one. They are loaded
+# on first access
+_EXPORTS = {
+    "PiiEnum":             ".piienum",
+    "PiiEntityInfo":       ".piientity",
+    "PiiEntity":           ".piientity",
+    "PiiDetector":         ".piicollection",
+    "PiiCollection":       ".piicollection",
+    "PiiCollectionLoader": ".piicollection"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
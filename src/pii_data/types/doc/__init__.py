@@ -1,4 +1,25 @@
-from .chunker import DocumentChunk    # noqa: F401
-from .document import SrcDocument, \
-    TableSrcDocument, TreeSrcDocument, SequenceSrcDocument    # noqa: F401
-from .localdoc import LocalSrcDocument, LocalSrcDocumentFile  # noqa: F401
+from ...helper.lazy import lazy_exports
+
+# Exported names, and the submodule defining each one. They are loaded
+# on first access
+_EXPORTS = {
+    "DocumentChunk":        ".chunker",
+    "SrcDocument":          ".document",
+    "TableSrcDocument":     ".document",
+    "TreeSrcDocument":      ".document",
+    "SequenceSrcDocument":  ".document",
+    "LocalSrcDocument":     ".localdoc",
+    "LocalSrcDocumentFile": ".localdoc",
+    "CsvSrcDocument":       ".csvdoc",
+    "TextFileSrcDocument":  ".textdoc",
+    "MmapTextSrcDocument":  ".mmapdoc",
+    "IndexedSrcDocument":   ".indexdoc",
+    "load_indexed_file":    ".indexdoc",
+    "Corpus":               ".corpus",
+    "CorpusWriter":         ".corpus",
+    "SyntheticDocGenerator": ".synthetic"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
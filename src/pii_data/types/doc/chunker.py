@@ -2,9 +2,11 @@
 Convert document pieces in DocumentChunk objects, optionally adding context
 """
 
+from collections import deque
+from itertools import islice
 from types import MappingProxyType
 
-from typing import Dict
+from typing import Dict, Iterable, Iterator
 
 from .defs import META_DOC
 
@@ -27,6 +29,9 @@ class DocumentChunk:
     def __repr__(self) -> str:
         return f"<DocumentChunk {self.id} #{len(self.data)}>"
 
+    def __reduce__(self):
+        return DocumentChunk, (self.id, self.data, self.context)
+
     def __eq__(self, other) -> bool:
         return (self.id, self.data, self.context) == \
             (other.id, other.data, other.context)
@@ -71,6 +76,14 @@ class ChunkGenerator:
         return DocumentChunk(chunk_id, elem["data"], context)
 
 
+    def flush(self) -> Iterable[DocumentChunk]:
+        """
+        Return the chunks still pending after the last document element has
+        been processed. The base generator keeps no pending chunks.
+        """
+        return iter(())
+
+
 
 class ContextChunkGenerator(ChunkGenerator):
     """
@@ -126,3 +139,110 @@ class ContextChunkGenerator(ChunkGenerator):
         ret.context["after"] = chunk.data
         self.current = chunk
         return ret
+
+
+    def flush(self) -> Iterable[DocumentChunk]:
+        """
+        Return the pending last chunk (if any)
+        """
+        chunk = self(None)
+        if chunk:
+            yield chunk
+
+
+
+class WindowContextChunkGenerator(ChunkGenerator):
+    """
+    Create DocumentChunk objects from document pieces, adding context values
+    with a configurable window of neighbouring chunks. The "before" & "after"
+    fields contain the text of up to N chunks at each side, optionally
+    limited to a maximum number of characters.
+
+    Neighbouring chunks are kept in ring buffers, so the cost per chunk
+    depends only on the window size, not on the document size.
+    """
+
+    def __init__(self, meta: Dict = None, before: int = 1, after: int = 1,
+                 max_chars: int = None, separator: str = "\n"):
+        """
+          :param meta: document metadata, to add to the chunk context
+          :param before: number of preceding chunks to add as context
+          :param after: number of following chunks to add as context
+          :param max_chars: maximum number of characters in each of the
+            before/after fields (not counting separators). The characters
+            closest to the current chunk are kept.
+          :param separator: string used to join neighbouring chunks
+        """
+        self._ctx = {k: MappingProxyType(v) for k, v in (meta or {}).items()}
+        default_lang = self._ctx.get(META_DOC, {}).get("main_lang")
+        super().__init__(default_lang)
+        self._nbefore = max(int(before or 0), 0)
+        self._nafter = max(int(after or 0), 0)
+        self._maxc = max_chars
+        self._sep = separator
+        # Data for already delivered chunks, and chunks waiting for context
+        self._prev = deque(maxlen=self._nbefore)
+        self._pending = deque()
+
+
+    def _window(self, neighbours: Iterator, tail: bool) -> str:
+        """
+        Build a context string from neighbouring chunk data, given in
+        order of proximity to the current chunk
+          :param neighbours: iterable of chunk payloads
+          :param tail: keep the end of each payload when truncating (for
+            preceding chunks)
+        """
+        parts = []
+        left = self._maxc
+        for data in neighbours:
+            if left is not None and left <= 0:
+                break
+            text = data if isinstance(data, str) else str(data)
+            if left is not None:
+                if len(text) > left:
+                    text = text[-left:] if tail else text[:left]
+                left -= len(text)
+            parts.append(text)
+        if tail:
+            parts.reverse()
+        return self._sep.join(parts)
+
+
+    def _emit(self) -> DocumentChunk:
+        """
+        Complete the context for the oldest pending chunk, and deliver it
+        """
+        chunk = self._pending.popleft()
+        if self._prev:
+            chunk.context["before"] = self._window(reversed(self._prev), True)
+        if self._nafter and self._pending:
+            after = (c.data for c in islice(self._pending, self._nafter))
+            chunk.context["after"] = self._window(after, False)
+        if self._nbefore:
+            self._prev.append(chunk.data)
+        return chunk
+
+
+    def __call__(self, elem: Dict) -> DocumentChunk:
+        """
+        Receive a dict with the current element and create a DocumentChunk from
+        it. Return the chunk that has now its full context available (if any)
+        """
+        context = self._ctx.copy()
+        if "context" in elem:
+            context.update(elem["context"])
+        chunk = super().__call__(elem, context)
+        if chunk.context is None:
+            chunk.context = {}
+        self._pending.append(chunk)
+        if len(self._pending) > self._nafter:
+            return self._emit()
+
+
+    def flush(self) -> Iterable[DocumentChunk]:
+        """
+        Return all pending chunks at the end of the document
+        """
+        while self._pending:
+            yield self._emit()
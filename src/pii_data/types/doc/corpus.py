@@ -0,0 +1,238 @@
+"""
+A corpus: many src-documents stored in a single NDJSON stream (which can
+be compressed).
+
+The first line in the stream is a corpus header; then there is one line per
+document, containing the full serialized document (format, header and
+chunks). An optional sidecar index maps document ids to the byte positions
+of their lines, to allow direct access to documents.
+"""
+
+import json
+from pathlib import Path
+
+from typing import Dict, Iterator, List
+
+from ...defs import FMT_CORPUS, FMT_CORPUSINDEX
+from ...dump.json import encode_document
+from ...helper.chunkindex import load_offset_index, index_name
+from ...helper.exception import InvArgException, FileException
+from ...helper.io import openfile
+from ...helper.backends import json_loads
+from .document import SrcDocument, TYPE_META
+from .localdoc import build_document, BaseLocalSrcDocument
+
+
+class Corpus:
+    """
+    Read a corpus file, producing SrcDocument objects lazily
+    """
+
+    def __init__(self, filename: str, iter_options: Dict = None,
+                 metadata: TYPE_META = None, index: bool = None):
+        """
+          :param filename: name of the corpus file
+          :param iter_options: iteration options for the documents
+          :param metadata: metadata to add to all documents
+          :param index: use the sidecar index file. If `None`, it will be used
+            if it exists
+        """
+        self._name = filename
+        self._opt = iter_options
+        self._meta = metadata
+        self._index = None
+        idxname = index_name(filename)
+        if index or (index is None and Path(idxname).is_file()):
+            self._index = load_offset_index(idxname, FMT_CORPUSINDEX)[1]
+        with openfile(filename, "rb") as f:
+            self.header = self._parse(next(f, b"{}"), "header")
+        if self.header.get("format") != FMT_CORPUS:
+            raise FileException("invalid corpus format in '{}': {}",
+                                filename, self.header.get("format"))
+
+
+    def __repr__(self) -> str:
+        return f"<Corpus {self._name}>"
+
+
+    def _parse(self, line: bytes, what: str) -> Dict:
+        try:
+            return json_loads(line)
+        except json.JSONDecodeError as e:
+            raise FileException("invalid {} in corpus '{}': {}", what,
+                                self._name, e) from e
+
+
+    def _document(self, line: bytes) -> BaseLocalSrcDocument:
+        data = self._parse(line, "document")
+        return build_document(data, self._name, self._opt, self._meta)
+
+
+    def __iter__(self) -> Iterator[BaseLocalSrcDocument]:
+        return self.iter_docs()
+
+
+    def ids(self) -> List[str]:
+        """
+        Return the list of document ids in the corpus (needs the index)
+        """
+        if self._index is None:
+            raise InvArgException("corpus has no index: {}", self._name)
+        return list(self._index)
+
+
+    def iter_docs(self, start: str = None,
+                  skip: int = 0) -> Iterator[BaseLocalSrcDocument]:
+        """
+        Iterate over the documents in the corpus
+          :param start: id of the first document to produce
+          :param skip: number of documents to skip (after the start document,
+            if given)
+        """
+        with openfile(self._name, "rb") as f:
+            next(f, None)       # corpus header
+
+            if start is not None and self._index is not None:
+                try:
+                    f.seek(self._index[str(start)][0])
+                except KeyError:
+                    raise InvArgException("document not in corpus: {}", start)
+                start = None
+
+            for line in f:
+                if not line.strip():
+                    continue
+                doc = None
+                if start is not None:
+                    doc = self._document(line)
+                    if doc.id != str(start):
+                        continue
+                    start = None
+                if skip:
+                    skip -= 1
+                    continue
+                yield doc if doc is not None else self._document(line)
+
+        if start is not None:
+            raise InvArgException("document not in corpus: {}", start)
+
+
+    def get(self, docid: str) -> BaseLocalSrcDocument:
+        """
+        Return a document from the corpus, given its id
+        """
+        if self._index is None:
+            return next(self.iter_docs(start=docid))
+        try:
+            offset, length = self._index[str(docid)]
+        except KeyError:
+            raise InvArgException("document not in corpus: {}", docid)
+        with openfile(self._name, "rb") as f:
+            f.seek(offset)
+            return self._document(f.read(length))
+
+
+def _data_size(filename: str, idxname: str) -> int:
+    """
+    Find out the (uncompressed) size of an existing corpus file
+    """
+    if Path(idxname).is_file():
+        index = load_offset_index(idxname, FMT_CORPUSINDEX)[1]
+        if index:
+            offset, length = next(reversed(index.values()))
+            return offset + length
+    size = 0
+    with openfile(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            size += len(block)
+    return size
+
+
+class CorpusWriter:
+    """
+    Write (or append) documents to a corpus file
+    """
+
+    def __init__(self, filename: str, append: bool = False,
+                 index: bool = True, metadata: Dict = None,
+                 context_fields: List[str] = None):
+        """
+          :param filename: name of the corpus file
+          :param append: append to the corpus file, if it exists
+          :param index: maintain also the sidecar index file. If false, an
+            existing index file is removed
+          :param metadata: metadata to add to the corpus header (for new files)
+          :param context_fields: explicit set of context fields to add to
+            the serialized chunks (see dump_ndjson())
+        """
+        self._name = filename
+        self._ctx = context_fields
+        idxname = index_name(filename)
+        exists = append and Path(filename).is_file()
+        self.pos = _data_size(filename, idxname) if exists else 0
+
+        # Open the index
+        self._idx = None
+        if index:
+            idx_exists = exists and Path(idxname).is_file()
+            if exists and not idx_exists and self.pos:
+                raise FileException("cannot append to corpus '{}': missing index",
+                                    filename)
+            self._idx = openfile(idxname, "at" if idx_exists else "wt",
+                                 encoding="utf-8")
+            if not idx_exists:
+                print(json.dumps({"format": FMT_CORPUSINDEX}), file=self._idx)
+        else:
+            # An existing index would not cover the documents written now
+            Path(idxname).unlink(missing_ok=True)
+
+        # Open the corpus file, and write the header if needed
+        self._f = openfile(filename, "at" if exists else "wt",
+                           encoding="utf-8")
+        if not exists:
+            hdr = {"format": FMT_CORPUS}
+            if metadata:
+                hdr["metadata"] = metadata
+            self._write(json.dumps(hdr, ensure_ascii=False))
+
+
+    def __repr__(self) -> str:
+        return f"<CorpusWriter {self._name}>"
+
+
+    def _write(self, line: str) -> int:
+        """
+        Write a line, returning its length in bytes
+        """
+        line += "\n"
+        self._f.write(line)
+        size = len(line) if line.isascii() else len(line.encode("utf-8"))
+        self.pos += size
+        return size
+
+
+    def add(self, doc: SrcDocument):
+        """
+        Add a document to the corpus
+        """
+        pos = self.pos
+        size = self._write(encode_document(doc, self._ctx))
+        if self._idx:
+            print(doc.id, pos, size, sep="\t", file=self._idx)
+
+
+    def close(self):
+        if self._f:
+            self._f.close()
+            self._f = None
+        if self._idx:
+            self._idx.close()
+            self._idx = None
+
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
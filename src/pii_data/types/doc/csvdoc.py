@@ -0,0 +1,85 @@
+"""
+A table SrcDocument streamed from a CSV/TSV file
+
+The file is read row by row when iterating the document, so that only one
+row is held in memory at any time. Compressed files (gzip, bzip2, xz) are
+also accepted.
+"""
+
+import csv
+
+from typing import Dict, Iterator, List
+
+from ...helper.io import openfile, base_extension
+from ...helper.exception import FileException
+from .document import TableSrcDocument, TYPE_META
+
+
+class CsvSrcDocument(TableSrcDocument):
+    """
+    A table document whose rows are read from a CSV (or TSV) file
+    """
+
+    def __init__(self, filename: str, header: bool = True,
+                 delimiter: str = None, encoding: str = None,
+                 iter_options: Dict = None, metadata: TYPE_META = None,
+                 **fmtparams):
+        """
+          :param filename: name of the CSV file
+          :param header: the first row in the file contains the column names
+            (they will be added as the `column.name` metadata field, unless
+            already defined in `metadata`)
+          :param delimiter: field delimiter. If not passed, a tab is used for
+            files with a ".tsv" or ".tab" extension, and a comma for the rest
+          :param encoding: file charset encoding
+          :param iter_options: set iteration options
+          :param metadata: document general metadata
+          :param fmtparams: additional formatting parameters for the CSV reader
+        """
+        super().__init__(iter_options=iter_options, metadata=metadata)
+        self._name = filename
+        self._header = header
+        self._encoding = encoding
+        if delimiter is None:
+            ext = base_extension(filename)
+            delimiter = "\t" if ext in (".tsv", ".tab") else ","
+        self._fmt = {"delimiter": delimiter, **fmtparams}
+        self.add_metadata(document={"type": "table"})
+        if header and "name" not in self._meta.get("column", {}):
+            names = self._read_header()
+            if names:
+                self.add_metadata(column={"name": names})
+
+
+    def _reader(self, f) -> Iterator[List[str]]:
+        return csv.reader(f, **self._fmt)
+
+
+    def _read_header(self) -> List[str]:
+        """
+        Read the first row in the file, containing the column names
+        """
+        with openfile(self._name, encoding=self._encoding, newline="") as f:
+            try:
+                return next(self._reader(f))
+            except StopIteration:
+                return []
+            except csv.Error as e:
+                raise FileException("cannot read CSV header in '{}': {}",
+                                    self._name, e) from e
+
+
+    def iter_base(self) -> Iterator[Dict]:
+        """
+        Iterate over the file rows, skipping the header row (if present)
+        """
+        with openfile(self._name, encoding=self._encoding, newline="") as f:
+            rows = self._reader(f)
+            try:
+                if self._header:
+                    next(rows, None)
+                for n, row in enumerate(rows, start=1):
+                    yield {"id": n, "data": row}
+            except csv.Error as e:
+                raise FileException("CSV read error in '{}' line {}: {}",
+                                    self._name, rows.line_num, e) from e
@@ -8,14 +8,28 @@ get_chunks() method, producing an iterable of chunks.
 from collections import defaultdict
 from types import MappingProxyType
 import uuid
+import re
+from bisect import bisect_right
 
-from typing import Dict, Iterable, Callable, Iterator
+from typing import Dict, Iterable, Callable, Iterator, Union, List, Any, Tuple
 
-from ...helper.exception import UnimplementedException
+from ...helper.exception import UnimplementedException, InvArgException
 from .defs import META_DOC
-from .chunker import DocumentChunk, ChunkGenerator, ContextChunkGenerator
+from .chunker import DocumentChunk, ChunkGenerator, ContextChunkGenerator, \
+    WindowContextChunkGenerator
 
 TYPE_META = Dict[str, Dict]
+TYPE_CONTEXT = Union[bool, Dict]
+
+def _walk_chunks(chunks: Iterable[Dict]) -> Iterable[Dict]:
+    """
+    Traverse a list of chunks, including nested subchunks
+    """
+    for chunk in chunks:
+        yield chunk
+        if "chunks" in chunk:
+            yield from _walk_chunks(chunk["chunks"])
+
 
 class SrcDocument:
     """
@@ -86,13 +100,15 @@ class SrcDocument:
         return self.iter_full()
 
 
-    def iter_full(self, context: bool = None,
+    def iter_full(self, context: TYPE_CONTEXT = None,
                   chunk_iterator: Callable = None) -> Iterable[Dict]:
         """
         Iterate over the document, producing a sequence of individual
         DocumentChunk objects
          :param context: add additional context information to each chunk (if
-           not None, this modifies the option passed in the object constructor)
+           not None, this modifies the option passed in the object constructor).
+           It can be a boolean or a dict with window options (`before`,
+           `after`, `max_chars`, `separator`)
          :param chunk_iterator: the function providing base chunks. If not
            passed, the iter_flat() method will be used.
         """
@@ -102,8 +118,12 @@ class SrcDocument:
 
         # Create the chunker object
         do_context = context if context is not None else self._iter_options.get("context", False)
-        cls = ContextChunkGenerator if do_context else ChunkGenerator
-        chunker = cls(meta=self._meta)
+        if isinstance(do_context, dict):
+            chunker = WindowContextChunkGenerator(meta=self._meta, **do_context)
+        elif do_context:
+            chunker = ContextChunkGenerator(meta=self._meta)
+        else:
+            chunker = ChunkGenerator(meta=self._meta)
 
         # Iterate over the document elements and build a chunk for each one
         for elem in chunk_iterator():
@@ -111,11 +131,8 @@ class SrcDocument:
             if chunk:
                 yield chunk
 
-        # A pending last chunk?
-        if do_context:
-            chunk = chunker(None)
-            if chunk:
-                yield chunk
+        # Pending last chunks?
+        yield from chunker.flush()
 
 
     def iter_struct(self) -> Iterable[Dict]:
@@ -135,6 +152,37 @@ class SrcDocument:
             yield chunk
 
 
+    def get_chunks(self, ids: Iterable[str]) -> List[Dict]:
+        """
+        Return a list of chunks from the document, given their ids, as
+        produced by iter_struct() (for tree documents, nested chunks can also
+        be requested).
+        The base implementation performs a single scan of the document;
+        subclasses may provide direct access.
+        """
+        ids = [str(i) for i in ids]
+        found = {}
+        pending = set(ids)
+        for chunk in _walk_chunks(self.iter_struct()):
+            cid = str(chunk.get("id"))
+            if cid in pending:
+                found[cid] = chunk
+                pending.discard(cid)
+                if not pending:
+                    break
+        if pending:
+            raise InvArgException("chunk id not found in document: {}",
+                                  ", ".join(sorted(pending)))
+        return [found[i] for i in ids]
+
+
+    def get_chunk(self, id: str) -> Dict:
+        """
+        Return a chunk from the document, given its id
+        """
+        return self.get_chunks([id])[0]
+
+
     def iter_base(self) -> Iterator[Dict]:
         """
         The base iteration method to be implemented by subclasses. When executed
@@ -154,7 +202,8 @@ class SequenceSrcDocument(SrcDocument):
     A sequence document, as an abstract class
     """
 
-    def iter_full(self, context: bool = None, **kwargs) -> Iterable[Dict]:
+    def iter_full(self, context: TYPE_CONTEXT = None,
+                  **kwargs) -> Iterable[Dict]:
         return super().iter_full(context=context)
 
 
@@ -203,7 +252,7 @@ class TreeSrcDocument(SrcDocument):
             yield from self._yield_subtree(chunk, n, level=0, prefix="")
 
 
-    def iter_full(self, context: bool = None) -> Iterable[Dict]:
+    def iter_full(self, context: TYPE_CONTEXT = None) -> Iterable[Dict]:
         """
         Iterate over the document, producing a linear sequence of DocumentChunk
         objects
@@ -212,36 +261,221 @@ class TreeSrcDocument(SrcDocument):
                                  chunk_iterator=self._recurse_tree)
 
 
+_NUMERIC = re.compile(r"\s*[-+]?\d+(?:[.,]\d+)*\s*")
+
+
+def cell_numeric(cell: Any) -> bool:
+    """
+    Cell predicate: a number, or a string containing only a number
+    """
+    if isinstance(cell, (int, float)):
+        return True
+    return isinstance(cell, str) and _NUMERIC.fullmatch(cell) is not None
+
+
+def cell_empty(cell: Any) -> bool:
+    """
+    Cell predicate: an empty cell
+    """
+    return cell is None or (isinstance(cell, str) and not cell.strip())
+
+
+# Named cell predicates, usable in the "skip_cells" iteration option
+CELL_PREDICATES = {
+    "numeric": cell_numeric,
+    "empty": cell_empty
+}
+
+
+def column_chunk_position(chunk: DocumentChunk, pos: int) -> Tuple[str, int]:
+    """
+    Map a position inside a column chunk (as produced by
+    TableSrcDocument.iter_columns()) to the corresponding cell
+     :param chunk: the column chunk
+     :param pos: a character position in the chunk data
+     :return: a tuple (cell id, position inside the cell)
+     :raises InvArgException: if the position is outside the chunk data or
+       falls in a separator between cells
+    """
+    offsets = chunk.context["offsets"]
+    n = bisect_right(offsets, pos) - 1
+    if n < 0 or pos >= len(chunk.data):
+        raise InvArgException("position outside column chunk: {}", pos)
+    if n + 1 < len(offsets):
+        end = offsets[n+1] - len(chunk.context["separator"])
+        if pos >= end:
+            raise InvArgException("position in a cell separator: {}", pos)
+    rowid = chunk.context["rows"][n]
+    return f"{rowid}.{chunk.context['column']['number']}", pos - offsets[n]
+
+
 class TableSrcDocument(SrcDocument):
     """
     A table document, as an abstract class.
+
+    Full iteration accepts two additional iteration options:
+      * `columns`: a list of columns to iterate over, given either as column
+        numbers (starting at 1) or as column names (from the `column.name`
+        metadata)
+      * `skip_cells`: a predicate (a callable, the name of a predefined
+        predicate in CELL_PREDICATES or a list of them); cells for which
+        any predicate returns `True` are not produced
     """
 
+    def _selected_columns(self, colnames: List[str]) -> List[int]:
+        """
+        Get the list of column indexes (0-based) selected in the iteration
+        options, or `None` if all columns are to be used
+        """
+        columns = self._iter_options.get("columns")
+        if columns is None:
+            return None
+        out = []
+        for col in columns:
+            if isinstance(col, int):
+                if col < 1:
+                    raise InvArgException("invalid column number: {}", col)
+                out.append(col-1)
+            elif colnames and col in colnames:
+                out.append(colnames.index(col))
+            else:
+                raise InvArgException("unknown column name: {}", col)
+        return sorted(set(out))
+
+
+    def _skip_predicate(self) -> Callable:
+        """
+        Get the predicate to skip cells defined in the iteration options (if
+        any)
+        """
+        skip = self._iter_options.get("skip_cells")
+        if not skip:
+            return None
+        if isinstance(skip, str) or callable(skip):
+            skip = [skip]
+        preds = []
+        for p in skip:
+            if not callable(p):
+                try:
+                    p = CELL_PREDICATES[p]
+                except KeyError:
+                    raise InvArgException("unknown cell predicate: {}", p)
+            preds.append(p)
+        return preds[0] if len(preds) == 1 else lambda c: any(p(c) for p in preds)
+
+
+    def _iter_rows(self) -> Iterable[Tuple]:
+        """
+        Return all rows in the table, as tuples (row id, row data)
+        """
+        for r, row in enumerate(self.iter_base(), start=1):
+            yield row.get("id", r), row.get("data", [])
+
+
+    def _iter_table(self, columns: List[int],
+                    order: str = "row") -> Iterable[Tuple]:
+        """
+        Return all table cells, as tuples (row id, column number, cell data)
+          :param columns: the list of column indexes to use (all if `None`)
+          :param order: the traversal order, "row" (row-major) or "column"
+            (column-major)
+        """
+        if order == "row":
+            for rowid, rowdata in self._iter_rows():
+                if columns is None:
+                    cells = enumerate(rowdata, start=1)
+                else:
+                    cells = ((c+1, rowdata[c]) for c in columns
+                             if c < len(rowdata))
+                for c, cell in cells:
+                    yield rowid, c, cell
+        elif order == "column":
+            # Column-major order needs the full table
+            rows = list(self._iter_rows())
+            if columns is None:
+                columns = range(max((len(r[1]) for r in rows), default=0))
+            for c in columns:
+                for rowid, rowdata in rows:
+                    if c < len(rowdata):
+                        yield rowid, c+1, rowdata[c]
+        else:
+            raise InvArgException("invalid table iteration order: {}", order)
+
+
     def _iter_cells(self) -> Iterable[Dict]:
         """
         Return all cells from the document tree in a sequence, traversing it
-        in row-major order
+        in row-major order (or column-major, if the `order` iteration option
+        is set to "column")
         """
         header = self.metadata
         colnames = header.get("column", {}).get("name")
-        for r, row in enumerate(self.iter_base(), start=1):
-            rowdata = row.get("data", [])
-            rowid = row.get("id", r)
-            for c, cell in enumerate(rowdata, start=1):
-                data = {
-                    "id": f"{rowid}.{c}",
-                    "data": cell,
-                    "context": {
-                        "column": {"number": c},
-                        "row": rowid
-                    }
+        columns = self._selected_columns(colnames)
+        skip = self._skip_predicate()
+        order = self._iter_options.get("order", "row")
+        for rowid, c, cell in self._iter_table(columns, order):
+            if skip and skip(cell):
+                continue
+            data = {
+                "id": f"{rowid}.{c}",
+                "data": cell,
+                "context": {
+                    "column": {"number": c},
+                    "row": rowid
                 }
-                if colnames:
-                    data["context"]["column"]["name"] = colnames[c-1]
-                yield data
+            }
+            if colnames and c <= len(colnames):
+                data["context"]["column"]["name"] = colnames[c-1]
+            yield data
 
 
-    def iter_full(self, context: bool = None) -> Iterable[Dict]:
+    def iter_columns(self, separator: str = "\n") -> Iterable[DocumentChunk]:
+        """
+        Iterate over the document by columns, producing one DocumentChunk
+        per column, whose data is the concatenation of all the column cells.
+        The chunk context contains the ids of the rows used (in `rows`),
+        the position of each cell in the chunk data (in `offsets`) and the
+        separator, so that positions can be mapped back to cells with
+        column_chunk_position()
+        The `columns` and `skip_cells` iteration options are honored.
+          :param separator: string used to join cells
+        """
+        colnames = self.metadata.get("column", {}).get("name")
+        columns = self._selected_columns(colnames)
+        skip = self._skip_predicate()
+        lang = self.metadata.get(META_DOC, {}).get("main_lang")
+        chunker = ChunkGenerator(default_lang=lang)
+
+        def column_chunk(c: int, cells: List[Tuple]) -> DocumentChunk:
+            ctx = {"column": {"number": c}, "rows": [], "offsets": [],
+                   "separator": separator}
+            if colnames and c <= len(colnames):
+                ctx["column"]["name"] = colnames[c-1]
+            parts, pos = [], 0
+            for rowid, cell in cells:
+                if parts:
+                    parts.append(separator)
+                    pos += len(separator)
+                text = cell if isinstance(cell, str) else str(cell)
+                ctx["rows"].append(rowid)
+                ctx["offsets"].append(pos)
+                parts.append(text)
+                pos += len(text)
+            return chunker({"id": f"*.{c}", "data": "".join(parts)}, ctx)
+
+        current, cells = None, []
+        for rowid, c, cell in self._iter_table(columns, "column"):
+            if c != current:
+                if current is not None:
+                    yield column_chunk(current, cells)
+                current, cells = c, []
+            if not (skip and skip(cell)):
+                cells.append((rowid, cell))
+        if current is not None:
+            yield column_chunk(current, cells)
+
+
+    def iter_full(self, context: TYPE_CONTEXT = None) -> Iterable[Dict]:
         """
         Iterate over the document, producing a sequence of DocumentChunk
         objects
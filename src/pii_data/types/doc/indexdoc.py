@@ -0,0 +1,156 @@
+"""
+SrcDocument subclasses backed by a JSON/NDJSON document file plus its sidecar
+chunk index (as written by dump_file() with `index=True`).
+
+Chunks are read from the file only when needed; the index allows fetching
+any chunk directly without iterating the document from the start.
+"""
+
+import json
+
+from typing import Any, Dict, Iterator, Iterable, List, Tuple
+
+from ...defs import FMT_SRCDOCUMENT
+from ...helper.chunkindex import load_chunk_index, index_name, TYPE_INDEX
+from ...helper.exception import InvArgException, InvalidDocument, \
+    FileException
+from ...helper.io import openfile
+from ...helper.backends import json_loads
+from .document import SrcDocument, SequenceSrcDocument, TreeSrcDocument, \
+    TableSrcDocument, TYPE_META, _walk_chunks
+
+
+def _read_record(f, offset: int, length: int, filename: str) -> Any:
+    """
+    Read and decode one complete JSON value from an open (binary) document
+    file
+    """
+    f.seek(offset)
+    try:
+        return json_loads(f.read(length).decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise FileException("invalid record at offset {} in '{}': {}",
+                            offset, filename, e) from e
+
+
+class IndexedSrcDocument(SrcDocument):
+    """
+    A document read on demand from an indexed JSON/NDJSON document file
+    """
+
+    def __init__(self, filename: str, index: TYPE_INDEX,
+                 iter_options: Dict = None, metadata: TYPE_META = None):
+        """
+          :param filename: name of the document file
+          :param index: chunk index for the file
+          :param iter_options: set iteration options
+          :param metadata: document general metadata
+        """
+        super().__init__(iter_options=iter_options, metadata=metadata)
+        self._name = filename
+        self._index = index
+
+
+    def _records(self) -> Iterable[Tuple[int, int]]:
+        """
+        Return the positions of all top-level chunk records, in order
+        """
+        last = None
+        for pos in self._index.values():
+            if pos != last:
+                yield pos
+                last = pos
+
+
+    def iter_base(self) -> Iterator[Dict]:
+        """
+        Read the top-level chunks from the file
+        """
+        with openfile(self._name, "rb") as f:
+            for offset, length in self._records():
+                yield _read_record(f, offset, length, self._name)
+
+
+    def get_chunks(self, ids: Iterable[str]) -> List[Dict]:
+        """
+        Return a list of chunks, given their ids, by reading directly their
+        records in the document file
+        """
+        ids = [str(i) for i in ids]
+        try:
+            pos = {i: self._index[i] for i in ids}
+        except KeyError as e:
+            raise InvArgException("chunk id not found in document: {}",
+                                  e.args[0]) from e
+
+        found = {}
+        with openfile(self._name, "rb") as f:
+            # Read in file order, each record only once
+            for offset, length in sorted(set(pos.values())):
+                record = _read_record(f, offset, length, self._name)
+                for chunk in _walk_chunks([record]):
+                    cid = str(chunk.get("id"))
+                    if cid in pos:
+                        found[cid] = chunk
+        return [found[i] for i in ids]
+
+
+class IndexedSequenceSrcDocument(IndexedSrcDocument, SequenceSrcDocument):
+    pass
+
+
+class IndexedTreeSrcDocument(IndexedSrcDocument, TreeSrcDocument):
+    pass
+
+
+class IndexedTableSrcDocument(IndexedSrcDocument, TableSrcDocument):
+    pass
+
+
+def load_indexed_file(filename: str, iter_options: Dict = None,
+                      metadata: TYPE_META = None) -> IndexedSrcDocument:
+    """
+    Open a document stored in a JSON/NDJSON file that has a chunk index
+     :param filename: full pathname of the document to load
+     :param iter_options: iteration options for the document
+     :param metadata: metadata to add to the document
+     :return: an IndexedSrcDocument subclass
+    """
+    meta, index = load_chunk_index(index_name(filename))
+
+    # Read the header, and the format tag
+    try:
+        offset, length = meta["header"]
+        if meta["source"] != "ndjson":
+            fmt_offset, fmt_length = meta["docformat"]
+    except (KeyError, ValueError) as e:
+        raise FileException("no header or format position in index for '{}'",
+                            filename) from e
+    with openfile(filename, "rb") as f:
+        hdr = _read_record(f, offset, length, filename)
+        if meta["source"] == "ndjson":
+            fmt = hdr.get("format")
+            hdr = hdr.get("header", {})
+        else:
+            fmt = _read_record(f, fmt_offset, fmt_length, filename)
+    if fmt != FMT_SRCDOCUMENT:
+        raise InvalidDocument("Error: invalid format {} in {}", fmt, filename)
+
+    # Update header with additional metadata, if passed
+    if metadata is not None:
+        for name, d in metadata.items():
+            hdr.setdefault(name, {}).update(d)
+
+    # Select the proper object type to create
+    dtype = hdr.get("document", {}).get("type")
+    if dtype == "tree":
+        Obj = IndexedTreeSrcDocument
+    elif dtype == "table":
+        Obj = IndexedTableSrcDocument
+    elif dtype in ("sequence", None):
+        Obj = IndexedSequenceSrcDocument
+    else:
+        raise InvalidDocument("Unknown document type '{}' in {}", dtype,
+                              filename)
+
+    return Obj(filename, index, metadata=hdr, iter_options=iter_options)
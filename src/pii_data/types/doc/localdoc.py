@@ -9,13 +9,16 @@ information
 """
 
 from pathlib import Path
+import json
 
 from typing import Dict, Iterable, Union, List, Iterator
 
 from ...defs import FMT_SRCDOCUMENT, DOC_TYPES
-from ...dump import dump_text, dump_yaml, dump_json
-from ...helper.exception import InvArgException, InvalidDocument
-from ...helper.io import load_datafile, base_extension
+from ...dump import dump_text, dump_yaml, dump_json, dump_ndjson
+from ...helper.exception import InvArgException, InvalidDocument, \
+    FileException
+from ...helper.io import load_datafile, base_extension, openfile
+from ...helper.backends import json_loads
 from .document import SrcDocument, DocumentChunk, \
     TreeSrcDocument, SequenceSrcDocument, TableSrcDocument, TYPE_META
 
@@ -81,22 +84,23 @@ class BaseLocalSrcDocument(SrcDocument):
 
 
     def dump(self, outname: str, format: str = None, indent: int = None,
-             context_fields: List[str] = None):
+             context_fields: List[str] = None, index: bool = False):
         """
         Dump the document to an output file
           :param outname: name of the output file
           :param format: format to write the document in. Valid values are
-            "yml", "json", "txt". If not present, the format will try to be
-            deduced from the file extension
+            "yml", "json", "ndjson", "txt". If not present, the format will
+            try to be deduced from the file extension
           :param indent: for text output and tree documents, indent used to
             indicate hierarchy level
           :param context_fields: for YAML/JSON output, specific set of context
             fields that will be dumped, if present in the iter_struct() results.
             If not passed, all existing context fields will be added *except* a
             set of well-known structure fields.
+          :param index: for JSON/NDJSON output, write also a chunk index
         """
         dump_file(self, outname, format=format, indent=indent,
-                  context_fields=context_fields)
+                  context_fields=context_fields, index=index)
 
 
 # --------------------------------------------------------------------------
@@ -180,19 +184,22 @@ class LocalSrcDocument:
 
 def dump_file(doc: SrcDocument, outname: str,
               format: str = None, indent: int = None,
-              context_fields: List[str] = None, **kwargs):
+              context_fields: List[str] = None, index: bool = False,
+              **kwargs):
     """
     Dump a document to an output file
       :param outname: name of the output file
       :param format: format to write the document in. Valid values are
-        "yml", "txt". If not present, the format will try to be
-        deduced from the file extension
+        "yml", "json", "ndjson", "txt". If not present, the format will try
+        to be deduced from the file extension
       :param indent: for text output and tree documents, indent used to
          indicate hierarchy level; for json indent level
       :param context_fields: for YAML/JSON output, specific set of context
          fields that will be dumped, if present in the iter_struct() results.
          If not passed, all existing context fields will be added *except* a
          set of well-known structure fields.
+      :param index: for JSON/NDJSON output, write also a sidecar chunk index
+         file, to allow direct access to chunks
     """
     ext = base_extension(outname)
     if format is not None:
@@ -203,37 +210,75 @@ def dump_file(doc: SrcDocument, outname: str,
         format = "txt"
     elif ext == ".json":
         format = "json"
+    elif ext in (".ndjson", ".jsonl"):
+        format = "ndjson"
     else:
         raise InvArgException("unspecified format for: {}", outname)
 
+    if index and format not in ("json", "ndjson", "jsonl"):
+        raise InvArgException("chunk index unsupported for format: {}", format)
+
     if format in ("yaml", "yml"):
         dump_yaml(doc, outname, context_fields=context_fields)
     elif format == "json":
         dump_json(doc, outname, context_fields=context_fields,
-                  indent=indent, **kwargs)
+                  indent=indent, index=index, **kwargs)
+    elif format in ("ndjson", "jsonl"):
+        dump_ndjson(doc, outname, context_fields=context_fields,
+                    index=index, **kwargs)
     elif format in ("txt", "text"):
         dump_text(doc, outname, indent=indent)
     else:
         raise InvArgException("unsupported output format: {}", format)
 
 
+def load_ndjson(filename: str) -> Dict:
+    """
+    Load a document stored in an NDJSON file, and return it with the same
+    structure as a YAML/JSON document
+    """
+    with openfile(filename, encoding="utf-8") as f:
+        try:
+            data = json_loads(next(f, "{}"))
+            data["chunks"] = [json_loads(line) for line in f if line.strip()]
+        except json.JSONDecodeError as e:
+            raise FileException("read error in NDJSON file '{}': {}",
+                                filename, e) from e
+    return data
+
+
 def load_file(filename: str, iter_options: Dict = None,
               metadata: TYPE_META = None) -> BaseLocalSrcDocument:
     """
-    Load a document stored in a YAML file
+    Load a document stored in a YAML, JSON or NDJSON file
      :param filename: full pathname of the document to load
      :param iter_options: iteration options for the document
      :param metadata: metadata to add to the document
      :return: a LocalSrcDocument subclass
     """
-    data = load_datafile(filename)
+    if base_extension(filename) in (".ndjson", ".jsonl"):
+        data = load_ndjson(filename)
+    else:
+        data = load_datafile(filename)
+    return build_document(data, filename, iter_options, metadata)
 
+
+def build_document(data: Dict, source: str, iter_options: Dict = None,
+                   metadata: TYPE_META = None) -> BaseLocalSrcDocument:
+    """
+    Create a document from its serialized data structure
+     :param data: the document data (a dict with format, header & chunks)
+     :param source: name of the document source (for error messages)
+     :param iter_options: iteration options for the document
+     :param metadata: metadata to add to the document
+     :return: a LocalSrcDocument subclass
+    """
     # Check format
     if "format" not in data:
-        raise InvalidDocument("Error: missing format indicator in {}", filename)
+        raise InvalidDocument("Error: missing format indicator in {}", source)
     fmt = data.get("format")
     if fmt != FMT_SRCDOCUMENT:
-        raise InvalidDocument(f"Error: invalid format {fmt} in {filename}")
+        raise InvalidDocument(f"Error: invalid format {fmt} in {source}")
 
     # Fetch the document header & get document type
     hdr = data.get("header", {})
@@ -252,10 +297,10 @@ def load_file(filename: str, iter_options: Dict = None,
         Obj = TreeLocalSrcDocument
     elif dtype == "table":
         Obj = TableLocalSrcDocument
-    elif dtype == "sequence" or type is None:
+    elif dtype == "sequence" or dtype is None:
         Obj = SequenceLocalSrcDocument
     else:
-        raise InvalidDocument(f"Unknown document type '{dtype}' in {filename}")
+        raise InvalidDocument(f"Unknown document type '{dtype}' in {source}")
 
     # Create object
     return Obj(chunks=data.get("chunks"), metadata=hdr,
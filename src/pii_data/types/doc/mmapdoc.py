@@ -0,0 +1,137 @@
+"""
+A sequence SrcDocument over a memory-mapped UTF-8 text file
+
+The file is not read into memory: an index of chunk boundaries (as byte
+offsets) is computed on the memory-mapped file, and each chunk is decoded
+only when it is produced. Chunk byte offsets are exposed in the chunk
+context, so that positions can be mapped back to the file.
+"""
+
+import re
+import mmap
+from array import array
+
+from typing import Dict, Iterator, Tuple
+
+from ...helper.exception import InvArgException
+from .chunker import DocumentChunk
+from .document import SequenceSrcDocument, TYPE_META
+
+
+# Paragraph separator: one or more blank lines
+_PARAGRAPH = re.compile(rb"\r?\n(?:[ \t]*\r?\n)+")
+
+_NEWLINE = b"\r\n"
+
+
+def byte_offset(chunk: DocumentChunk, pos: int) -> int:
+    """
+    Map a character position in a chunk produced by MmapTextSrcDocument to
+    the corresponding byte offset in the file
+    """
+    start = chunk.context["byte_range"][0]
+    return start + len(chunk.data[:pos].encode("utf-8"))
+
+
+class MmapTextSrcDocument(SequenceSrcDocument):
+    """
+    A sequence document whose chunks are paragraphs and/or fixed-size pieces
+    of a memory-mapped UTF-8 text file. Each chunk has a "byte_range" context
+    field with the start & end byte offsets of the chunk in the file.
+    The file must not be modified while the document is in use.
+    """
+
+    def __init__(self, filename: str, paragraph: bool = True,
+                 max_bytes: int = None, iter_options: Dict = None,
+                 metadata: TYPE_META = None):
+        """
+          :param filename: name of the text file (it must be uncompressed)
+          :param paragraph: split chunks at blank lines
+          :param max_bytes: maximum chunk size, in bytes. Chunks are split at
+            the last newline before the limit, or at a character boundary
+            if there is none
+          :param iter_options: set iteration options
+          :param metadata: document general metadata
+        """
+        if not (paragraph or max_bytes):
+            raise InvArgException("text document: no chunking criteria")
+        super().__init__(iter_options=iter_options, metadata=metadata)
+        self._name = filename
+        self._par = paragraph
+        self._maxb = max_bytes
+        self._index = None
+        self.add_metadata(document={"type": "sequence"})
+
+
+    def _regions(self, mm: mmap.mmap) -> Iterator[Tuple[int, int]]:
+        """
+        Produce the base file regions (paragraphs, or the whole file)
+        """
+        start = 0
+        if self._par:
+            for m in _PARAGRAPH.finditer(mm):
+                yield start, m.start()
+                start = m.end()
+        yield start, len(mm)
+
+
+    def _split(self, mm: mmap.mmap, start: int,
+               end: int) -> Iterator[Tuple[int, int]]:
+        """
+        Split a region into pieces no bigger than the maximum chunk size
+        """
+        while self._maxb and end - start > self._maxb:
+            limit = start + self._maxb
+            cut = mm.rfind(b"\n", start, limit + 1)
+            if cut > start:
+                yield start, cut
+                start = cut + 1
+                continue
+            # No newline: cut at the start of a UTF-8 character
+            while limit > start and mm[limit] & 0xC0 == 0x80:
+                limit -= 1
+            yield start, limit
+            start = limit
+        yield start, end
+
+
+    def _build_index(self, mm: mmap.mmap) -> array:
+        """
+        Compute the chunk boundaries, as a flat array of byte offsets
+        (start, end) for each chunk
+        """
+        index = array("Q")
+        for start, end in self._regions(mm):
+            for s, e in self._split(mm, start, end):
+                # Remove leading & trailing newlines
+                while s < e and mm[s] in _NEWLINE:
+                    s += 1
+                while e > s and mm[e-1] in _NEWLINE:
+                    e -= 1
+                if e > s:
+                    index.extend((s, e))
+        return index
+
+
+    def iter_base(self) -> Iterator[Dict]:
+        """
+        Iterate over the file, decoding each chunk as it is produced
+        """
+        with open(self._name, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:      # empty file
+                return
+        try:
+            if self._index is None:
+                self._index = self._build_index(mm)
+            index = self._index
+            with memoryview(mm) as buf:
+                for n in range(0, len(index), 2):
+                    start, end = index[n], index[n+1]
+                    with buf[start:end] as piece:
+                        data = str(piece, "utf-8")
+                    yield {"id": str(n//2 + 1), "data": data,
+                           "context": {"byte_range": [start, end]}}
+        finally:
+            mm.close()
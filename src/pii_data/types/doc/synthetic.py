@@ -0,0 +1,366 @@
+"""
+Synthetic documents and matching PII collections, for load testing.
+
+The generator produces the document chunks lazily, and the same chunks are
+produced each time it is iterated, given the seed. Hence documents and
+collections of any size can be written as a stream, in constant memory:
+  * tree documents, with configurable depth and fan-out
+  * table documents, with N rows x M columns
+  * sequence documents, with a log-normal distribution of chunk sizes
+PII values are inserted into the document text, and the collection records
+them with their chunk ids and positions (as produced by iter_full()).
+"""
+
+from datetime import datetime, timezone
+from itertools import accumulate
+from math import exp, log
+import random
+
+from typing import Dict, Iterator, List, Tuple, Union
+
+from ...helper.exception import InvArgException
+from ...helper.io import openfile
+from ...helper.json_encoder import CustomJSONEncoder
+from ..piienum import PiiEnum
+from ..piientity import PiiEntity
+from ..piicollection import PiiDetector, PiiCollection
+from .localdoc import SequenceLocalSrcDocument, TreeLocalSrcDocument, \
+    TableLocalSrcDocument, BaseLocalSrcDocument, dump_file
+
+
+DOC_TYPES = {"sequence": SequenceLocalSrcDocument,
+             "tree": TreeLocalSrcDocument,
+             "table": TableLocalSrcDocument}
+
+# Default mix of PII types (relative weights)
+DEFAULT_PII_TYPES = {PiiEnum.PERSON: 4, PiiEnum.EMAIL_ADDRESS: 2,
+                     PiiEnum.PHONE_NUMBER: 2, PiiEnum.CREDIT_CARD: 1,
+                     PiiEnum.IP_ADDRESS: 1, PiiEnum.GOV_ID: 1}
+
+# Collection date, so that the output is fully deterministic
+COLLECTION_DATE = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# Detector recorded in the collections
+DETECTOR = ("PIISA", "synthetic", "1.0")
+
+WORDS = """the of and to in is was for that with as on by at from be this
+have are or an which not but it its their has had were been they all more
+one new can also would other such we his her there after these first into
+report account customer contract service meeting project payment invoice
+agreement request office support system delivery order company department
+data document section policy review process account period total amount
+value date number information management development""".split()
+
+FIRST_NAMES = """James Mary Robert Patricia John Jennifer Michael Linda David
+Elizabeth William Barbara Richard Susan Joseph Jessica Thomas Sarah Charles
+Karen Maria Carlos Ana Luis Sofia Wei Yuki Ahmed Fatima Olga""".split()
+
+LAST_NAMES = """Smith Johnson Williams Brown Jones Garcia Miller Davis
+Rodriguez Martinez Hernandez Lopez Gonzalez Wilson Anderson Thomas Taylor
+Moore Jackson Martin Lee Perez Thompson White Harris Clark Lewis Young
+Walker Hall""".split()
+
+DOMAINS = ["example.com", "example.org", "mail.example.net", "corp.example"]
+
+
+def _luhn(digits: str) -> str:
+    """
+    Append a Luhn check digit to a digit string
+    """
+    total = 0
+    for n, d in enumerate(reversed(digits)):
+        d = int(d) * (2 if n % 2 == 0 else 1)
+        total += d - 9 if d > 9 else d
+    return digits + str(-total % 10)
+
+
+def _digits(rnd: random.Random, num: int) -> str:
+    return "".join(str(rnd.randint(0, 9)) for _ in range(num))
+
+
+def _person(rnd: random.Random) -> str:
+    return f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+
+
+def _email(rnd: random.Random) -> str:
+    name = f"{rnd.choice(FIRST_NAMES)}.{rnd.choice(LAST_NAMES)}".lower()
+    return f"{name}{rnd.randint(1, 99)}@{rnd.choice(DOMAINS)}"
+
+
+def _phone(rnd: random.Random) -> str:
+    return f"+1 {rnd.randint(200, 999)} {_digits(rnd, 3)} {_digits(rnd, 4)}"
+
+
+def _credit_card(rnd: random.Random) -> str:
+    num = _luhn("4" + _digits(rnd, 14))
+    return " ".join(num[n:n+4] for n in range(0, 16, 4))
+
+
+def _ip_address(rnd: random.Random) -> str:
+    return ".".join(str(rnd.randint(1, 254)) for _ in range(4))
+
+
+def _gov_id(rnd: random.Random) -> str:
+    return f"{rnd.randint(100, 899)}-{_digits(rnd, 2)}-{_digits(rnd, 4)}"
+
+
+# Value generators for the supported PII types
+PII_GENERATORS = {PiiEnum.PERSON: _person, PiiEnum.EMAIL_ADDRESS: _email,
+                  PiiEnum.PHONE_NUMBER: _phone,
+                  PiiEnum.CREDIT_CARD: _credit_card,
+                  PiiEnum.IP_ADDRESS: _ip_address, PiiEnum.GOV_ID: _gov_id}
+
+
+def _poisson(rnd: random.Random, lam: float) -> int:
+    """
+    Draw a number from a Poisson distribution
+    """
+    limit, k, p = exp(-lam), 0, rnd.random()
+    while p > limit:
+        k += 1
+        p *= rnd.random()
+    return k
+
+
+TYPE_PII = List[Tuple[PiiEnum, str, int]]
+
+
+class SyntheticDocGenerator:
+    """
+    A deterministic generator of synthetic documents & PII collections
+    """
+
+    def __init__(self, doctype: str = "sequence", size: int = 1000,
+                 seed: int = 0, chunk_words: float = 60,
+                 chunk_sigma: float = 0.8, depth: int = 3, fanout: int = 3,
+                 columns: int = 6, density: float = 0.5,
+                 pii_types: Dict[Union[PiiEnum, str], float] = None,
+                 lang: str = "en", docid: str = "synthetic-doc"):
+        """
+          :param doctype: document type: "sequence", "tree" or "table"
+          :param size: number of chunks (sequence documents), top-level
+            sections (tree documents) or rows (table documents)
+          :param seed: random seed
+          :param chunk_words: mean number of words in a text chunk
+          :param chunk_sigma: shape of the (log-normal) distribution of chunk
+            sizes; 0 gives chunks of constant size
+          :param depth: depth of the tree below each top-level section
+          :param fanout: mean number of children of each non-leaf tree node
+          :param columns: number of table columns
+          :param density: mean number of PII entities per chunk (for tables,
+            probability of a cell containing a PII value)
+          :param pii_types: PII types to generate, with their relative
+            weights
+          :param lang: document language
+          :param docid: document id
+        """
+        if doctype not in DOC_TYPES:
+            raise InvArgException("invalid synthetic document type: {}",
+                                  doctype)
+        self.doctype = doctype
+        self.size = size
+        self.seed = seed
+        self.chunk_words = chunk_words
+        self.chunk_sigma = chunk_sigma
+        self.depth = depth
+        self.fanout = fanout
+        self.columns = columns
+        self.density = density
+        self.lang = lang
+        self.docid = docid
+        types = pii_types or DEFAULT_PII_TYPES
+        try:
+            self._types = [PiiEnum[t] if isinstance(t, str) else PiiEnum(t)
+                           for t in types]
+        except (KeyError, ValueError) as e:
+            raise InvArgException("invalid PII type: {}", e) from e
+        for ptype in self._types:
+            if ptype not in PII_GENERATORS:
+                raise InvArgException("unsupported synthetic PII type: {}",
+                                      ptype.name)
+        self._weights = list(accumulate(types.values()))
+
+
+    def __repr__(self) -> str:
+        return f"<SyntheticDocGenerator {self.doctype} #{self.size}>"
+
+
+    def _words(self, rnd: random.Random, mean: float) -> List[str]:
+        """
+        Produce a list of words, with a log-normal distributed length
+        """
+        if self.chunk_sigma:
+            mu = log(mean) - self.chunk_sigma**2 / 2
+            num = max(1, round(rnd.lognormvariate(mu, self.chunk_sigma)))
+        else:
+            num = max(1, round(mean))
+        words = [rnd.choice(WORDS) for _ in range(num)]
+        words[0] = words[0].capitalize()
+        return words
+
+
+    def _pii(self, rnd: random.Random) -> Tuple[PiiEnum, str]:
+        """
+        Produce a random PII type & value
+        """
+        ptype = rnd.choices(self._types, cum_weights=self._weights)[0]
+        return ptype, PII_GENERATORS[ptype](rnd)
+
+
+    def _text(self, rnd: random.Random, mean: float) -> Tuple[str, TYPE_PII]:
+        """
+        Produce a text chunk, with PII values inserted at random places
+          :return: a tuple (text, list of (PII type, value, position))
+        """
+        words = self._words(rnd, mean)
+        num = min(_poisson(rnd, self.density), len(words) + 1)
+        places = sorted(rnd.sample(range(len(words) + 1), num))
+
+        parts, pii, pos, prev = [], [], 0, 0
+        for place in places + [None]:
+            end = len(words) if place is None else place
+            if end > prev:
+                text = " ".join(words[prev:end])
+                parts.append(text)
+                pos += len(text) + 1
+                prev = end
+            if place is None:
+                break
+            ptype, value = self._pii(rnd)
+            pii.append((ptype, value, pos))
+            parts.append(value)
+            pos += len(value) + 1
+        return " ".join(parts) + ".", pii
+
+
+    def _sequence(self, rnd: random.Random) -> Iterator[Tuple[Dict, List]]:
+        for num in range(1, self.size + 1):
+            text, pii = self._text(rnd, self.chunk_words)
+            cid = str(num)
+            yield {"id": cid, "data": text}, [(cid, *p) for p in pii]
+
+
+    def _tree_node(self, rnd: random.Random, cid: str, level: int,
+                   pii: List) -> Dict:
+        if level == self.depth:
+            text, chunk_pii = self._text(rnd, self.chunk_words)
+            pii += [(cid, *p) for p in chunk_pii]
+            return {"id": cid, "data": text}
+        text, chunk_pii = self._text(rnd, 6)
+        pii += [(cid, *p) for p in chunk_pii]
+        num = rnd.randint(1, 2*self.fanout - 1)
+        return {"id": cid, "data": text,
+                "chunks": [self._tree_node(rnd, f"{cid}.{n}", level + 1, pii)
+                           for n in range(1, num + 1)]}
+
+
+    def _tree(self, rnd: random.Random) -> Iterator[Tuple[Dict, List]]:
+        for num in range(1, self.size + 1):
+            pii = []
+            yield self._tree_node(rnd, str(num), 0, pii), pii
+
+
+    def _table(self, rnd: random.Random) -> Iterator[Tuple[Dict, List]]:
+        for num in range(1, self.size + 1):
+            rowid = f"R{num}"
+            row, pii = [], []
+            for col in range(1, self.columns + 1):
+                if rnd.random() < self.density:
+                    ptype, value = self._pii(rnd)
+                    row.append(value)
+                    pii.append((f"{rowid}.{col}", ptype, row[-1], 0))
+                else:
+                    row.append(" ".join(rnd.choice(WORDS)
+                                        for _ in range(rnd.randint(1, 4))))
+            yield {"id": rowid, "data": row}, pii
+
+
+    def iter_chunks(self) -> Iterator[Tuple[Dict, List]]:
+        """
+        Iterate over the top-level document chunks
+          :return: an iterator of tuples (chunk, PII list), where the PII list
+            contains tuples (chunk id, PII type, value, position) for all
+            entities in the chunk (and, for trees, in all its subchunks)
+        """
+        rnd = random.Random(self.seed)
+        gen = {"sequence": self._sequence, "tree": self._tree,
+               "table": self._table}[self.doctype]
+        return gen(rnd)
+
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (chunk for chunk, _ in self.iter_chunks())
+
+
+    def document(self, in_memory: bool = False) -> BaseLocalSrcDocument:
+        """
+        Return a document whose chunks are produced by the generator. The
+        chunks are generated anew each time the document is iterated.
+          :param in_memory: generate all chunks now, and store them in the
+            document
+        """
+        meta = {"document": {"id": self.docid, "main_lang": self.lang}}
+        if self.doctype == "table":
+            meta["column"] = {"name": [f"column{n}" for n in
+                                       range(1, self.columns + 1)]}
+        chunks = list(self) if in_memory else self
+        return DOC_TYPES[self.doctype](chunks=chunks, metadata=meta)
+
+
+    def iter_pii(self) -> Iterator[PiiEntity]:
+        """
+        Iterate over the PII entities in the document, in document order
+        """
+        for _, pii in self.iter_chunks():
+            for chunkid, ptype, value, pos in pii:
+                yield PiiEntity.build(ptype, value, chunkid, pos)
+
+
+    def _new_collection(self) -> PiiCollection:
+        """
+        Create an empty PII collection for the document, with the synthetic
+        detector and a fixed date, so that the output is reproducible
+        """
+        piic = PiiCollection(lang=self.lang, docid=self.docid)
+        piic.add_detector(PiiDetector(*DETECTOR))
+        header = piic.get_header(detectors=False)
+        header["date"] = COLLECTION_DATE
+        piic._set_header(header)
+        return piic
+
+
+    def collection(self) -> PiiCollection:
+        """
+        Return the PII collection for the document, as an in-memory object
+        """
+        piic = self._new_collection()
+        det = PiiDetector(*DETECTOR)
+        for pii in self.iter_pii():
+            piic.add(pii, det)
+        return piic
+
+
+    def write_document(self, outname: str, format: str = None, **kwargs):
+        """
+        Write the document to a file, as a stream
+          :param outname: output filename
+          :param format: output format (see dump_file())
+          :param kwargs: additional arguments for dump_file()
+        """
+        dump_file(self.document(), outname, format=format, **kwargs)
+
+
+    def write_collection(self, outname: str):
+        """
+        Write the PII collection for the document to an NDJSON file, as a
+        stream
+        """
+        piic = self._new_collection()
+        header = piic.get_header()
+
+        encoder = CustomJSONEncoder(ensure_ascii=False)
+        with openfile(outname, "wt", encoding="utf-8") as out:
+            print(encoder.encode(header), file=out)
+            for pii in self.iter_pii():
+                pii.fields.update(detector=1, **piic.defaults)
+                print(encoder.encode(pii), file=out)
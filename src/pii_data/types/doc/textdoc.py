@@ -0,0 +1,94 @@
+"""
+A sequence SrcDocument streamed from a plain text file
+
+The file is read lazily line by line, and lines are grouped into chunks
+according to the document options. Compressed files (gzip, bzip2, xz) are
+also accepted.
+"""
+
+from typing import Dict, Iterator, List
+
+from ...helper.io import openfile
+from ...helper.exception import InvArgException
+from .document import SequenceSrcDocument, TYPE_META
+
+
+class TextFileSrcDocument(SequenceSrcDocument):
+    """
+    A sequence document whose chunks are groups of lines from a text file.
+    Each chunk has a "lines" context field with the (1-based) numbers of its
+    first and last lines in the file.
+    """
+
+    def __init__(self, filename: str, paragraph: bool = True,
+                 max_lines: int = None, max_chars: int = None,
+                 encoding: str = None, iter_options: Dict = None,
+                 metadata: TYPE_META = None):
+        """
+          :param filename: name of the text file
+          :param paragraph: end chunks at blank lines (which are not included
+            in any chunk)
+          :param max_lines: maximum number of lines in a chunk
+          :param max_chars: maximum number of characters in a chunk. Chunks
+            are split only at line boundaries, so a single line longer than
+            this limit will still produce a chunk by itself
+          :param encoding: file charset encoding
+          :param iter_options: set iteration options
+          :param metadata: document general metadata
+        """
+        if not (paragraph or max_lines or max_chars):
+            raise InvArgException("text document: no chunking criteria")
+        super().__init__(iter_options=iter_options, metadata=metadata)
+        self._name = filename
+        self._par = paragraph
+        self._maxl = max_lines
+        self._maxc = max_chars
+        self._encoding = encoding
+        self.add_metadata(document={"type": "sequence"})
+
+
+    def _chunk(self, num: int, lines: List[str], start: int) -> Dict:
+        return {"id": str(num), "data": "\n".join(lines),
+                "context": {"lines": [start, start + len(lines) - 1]}}
+
+
+    def iter_base(self) -> Iterator[Dict]:
+        """
+        Iterate over the file, producing chunks made of groups of lines
+        """
+        num = 0
+        buf, size, start = [], 0, None
+        with openfile(self._name, encoding=self._encoding) as f:
+            for n, line in enumerate(f, start=1):
+                line = line.rstrip("\r\n")
+
+                # Blank line: end of paragraph
+                if self._par and not line.strip():
+                    if buf:
+                        num += 1
+                        yield self._chunk(num, buf, start)
+                        buf, size = [], 0
+                    continue
+
+                # Would this line overflow the current chunk?
+                if buf and self._maxc and size + 1 + len(line) > self._maxc:
+                    num += 1
+                    yield self._chunk(num, buf, start)
+                    buf, size = [], 0
+
+                # Add the line to the chunk
+                if not buf:
+                    start = n
+                    size = len(line)
+                else:
+                    size += 1 + len(line)
+                buf.append(line)
+
+                # Check line count limit
+                if self._maxl and len(buf) >= self._maxl:
+                    num += 1
+                    yield self._chunk(num, buf, start)
+                    buf, size = [], 0
+
+        if buf:
+            yield self._chunk(num + 1, buf, start)
@@ -1,3 +1,15 @@
-from .collection import PiiDetector, PiiCollection    # noqa: F401
-from .loader import PiiCollectionLoader               # noqa: F401
-from .chunk import PiiChunkIterator                   # noqa: F401
+from ...helper.lazy import lazy_exports
+
+# Exported names, and the submodule defining each one. They are loaded
+# on first access
+_EXPORTS = {
+    "PiiDetector":         ".collection",
+    "PiiCollection":       ".collection",
+    "PiiCollectionLoader": ".loader",
+    "load_collections":    ".loader",
+    "PiiChunkIterator":    ".chunk"
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
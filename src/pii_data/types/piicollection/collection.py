@@ -5,12 +5,12 @@ A class to describe a list of detected PII entities
 from datetime import datetime, timezone
 import json
 
-from typing import TextIO, Dict, Iterator, TypeVar, Union, Iterable
+from typing import TextIO, Dict, Iterator, TypeVar, Union, Iterable, Tuple
 
 from ...defs import FMT_PIICOLLECTION
 from ...helper.json_encoder import CustomJSONEncoder
 from ...helper.exception import InvArgException
-from ..piientity import PiiEntity
+from ..piientity import PiiEntity, make_info, restore_entity
 
 
 class PiiDetector:
@@ -229,6 +229,28 @@ class PiiCollection:
         self.stage("decision")
 
 
+    def __getstate__(self) -> Tuple:
+        """
+        Compact state for pickling: entity info objects are stored once, in
+        an intern table, and entities as (info index, fields, pos) tuples
+        """
+        infos = {}
+        pii = [(infos.setdefault(p.info, len(infos)), p.fields, p.pos)
+               for p in self.pii]
+        detectors = {k: v.fields for k, v in self.detectors.items()}
+        return (self.defaults, self._header, detectors,
+                [i.astuple() for i in infos], pii)
+
+
+    def __setstate__(self, state: Tuple):
+        self.defaults, self._header, detectors, infos, pii = state
+        self.detectors = {k: PiiDetector(**v) for k, v in detectors.items()}
+        self._detector_map = {v._id: k for k, v in self.detectors.items()}
+        self._encoder = None
+        infos = [make_info(*i) for i in infos]
+        self.pii = [restore_entity(infos[i], f, p) for i, f, p in pii]
+
+
     def to_json(self) -> Dict:
         """
         Return a dictionary that is JSON-serializable (when using the
@@ -4,10 +4,11 @@ A class to load PII collection from files
 
 import json
 
-from typing import Dict, TextIO
+from typing import Dict, TextIO, Iterator
 
 from ...defs import FMT_PIICOLLECTION
 from ...helper.io import base_extension, openfile
+from ...helper.backends import json_load, json_loads
 from ...helper.exception import InvArgException, ProcException, FileException
 from ..piientity import PiiEntity
 from .collection import PiiDetector, PiiCollection
@@ -44,7 +45,7 @@ class PiiCollectionLoader(PiiCollection):
         """
         try:
             with openfile(filename, encoding='utf-8') as f:
-                data = json.load(f)
+                data = json_load(f)
         except json.JSONDecodeError as e:
             raise FileException("cannot load collection '{}': {}", filename,
                                 e) from e
@@ -61,13 +62,13 @@ class PiiCollectionLoader(PiiCollection):
         Load a PiiCollection from a file-like source contianing NDJSON data
         """
         # Read first line (collection header)
-        header = json.loads(next(src))
+        header = json_loads(next(src))
         check_format(header, 'ndjson source')
         self._set_header(header)
         self._load_detectors(header['detectors'])
 
         # Read all PII instances
-        self.pii = [PiiEntity.fromdict(json.loads(line)) for line in src]
+        self.pii = [PiiEntity.fromdict(json_loads(line)) for line in src]
 
 
     def load(self, filename: str):
@@ -83,3 +84,32 @@ class PiiCollectionLoader(PiiCollection):
         else:
             raise FileException("unsupported format for PiiCollection: {}",
                                 base_ext)
+
+
+def load_collections(filename: str) -> Iterator[PiiCollectionLoader]:
+    """
+    Load all the PiiCollection objects stored in sequence in a single NDJSON
+    file (each one as a header line followed by its PII entities)
+    """
+    piic = None
+    with openfile(filename, encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            try:
+                data = json_loads(line)
+            except json.JSONDecodeError as e:
+                raise FileException("cannot load collection '{}' line {}: {}",
+                                    filename, n, e) from e
+            if "format" in data:
+                if piic is not None:
+                    yield piic
+                check_format(data, filename)
+                piic = PiiCollectionLoader()
+                piic._set_header(data)
+                piic._load_detectors(data.get("detectors", {}))
+            elif piic is None:
+                raise FileException("missing collection header in '{}'",
+                                    filename)
+            else:
+                piic.pii.append(PiiEntity.fromdict(data))
+    if piic is not None:
+        yield piic
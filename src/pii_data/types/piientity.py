@@ -3,12 +3,13 @@ A class to define the contents of a detected PII entity
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
 
 from ..helper.exception import InvArgException
 from ..helper.misc import filter_dict
 from .piienum import PiiEnum
 
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, Tuple
 
 
 # --------------------------------------------------------------------------
@@ -31,6 +32,25 @@ class PiiEntityInfo:
              "subtype": self.subtype}
         return filter_dict(d)
 
+    def astuple(self) -> Tuple[int, str, str, str]:
+        """
+        Return as a compact tuple, with the PII type as an integer
+        """
+        return int(self.pii), self.lang, self.country, self.subtype
+
+    def __reduce__(self):
+        return make_info, self.astuple()
+
+
+@lru_cache(maxsize=4096)
+def make_info(pii: int, lang: str = None, country: str = None,
+              subtype: str = None) -> PiiEntityInfo:
+    """
+    Create a PiiEntityInfo object from its compact representation. Since the
+    objects are immutable, equal objects are shared
+    """
+    return PiiEntityInfo(PiiEnum(pii), lang, country, subtype)
+
 
 # --------------------------------------------------------------------------
 
@@ -116,6 +136,10 @@ class PiiEntity:
         return f"<PiiEntity {self.fields['type']}:{self.fields['value']}>"
 
 
+    def __reduce__(self):
+        return restore_entity, (self.info.astuple(), self.fields, self.pos)
+
+
     def __eq__(self, other: "PiiEntity") -> bool:
         """
         Decide on equality of two entities: same type, value, chunkid & pos
@@ -170,3 +194,16 @@ class PiiEntity:
         fields = "lang", "country", "subtype", *FIELDS_OPTIONAL
         extra = dict(t for t in map(lambda k: (k, src.get(k)), fields) if t[1])
         return cls.build(ptype, value, chunkid, pos, **filter_dict(extra))
+
+
+def restore_entity(info: Union[Tuple, PiiEntityInfo], fields: Dict,
+                   pos: int) -> PiiEntity:
+    """
+    Recreate a PiiEntity object from its compact representation (used for
+    unpickling)
+    """
+    obj = PiiEntity.__new__(PiiEntity)
+    obj.info = info if isinstance(info, PiiEntityInfo) else make_info(*info)
+    obj.fields = fields
+    obj.pos = pos
+    return obj
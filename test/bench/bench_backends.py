@@ -0,0 +1,174 @@
+"""
+Benchmark: YAML & JSON backends. Compare the output of each available
+backend (dumped YAML text, parsed structures) with the pure-Python
+reference, and measure their speed.
+
+  PYTHONPATH=src python test/bench/bench_backends.py [--num N]
+
+The exit status is 1 if any of the backends selected by default produces an
+output different from the pure-Python reference.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import random
+import sys
+import tempfile
+import time
+
+from typing import Dict
+
+from pii_data.helper import backends
+from pii_data.helper.io import load_datafile
+from pii_data.types.doc.localdoc import (SequenceLocalSrcDocument,
+                                         TreeLocalSrcDocument)
+from pii_data.types import PiiEnum, PiiEntity, PiiDetector, PiiCollection
+from pii_data.types.piicollection import PiiCollectionLoader
+
+
+WORDS = ["alpha", "beta", "ñandú", "日本語", "emoji 😀", "quote's", '"dq"',
+         "key: value", "# hash", "- dash", "yes", "no", "null", "123",
+         "1.5e3", "tab\there", "ends with space ", "  lead", "\\back",
+         "{brace}", "[list]", "&anchor", "*alias", "!tag", "%pct", "@at",
+         "`tick`", "a|b", ">gt", "é" * 30]
+
+
+def random_text(rnd: random.Random) -> str:
+    lines = []
+    for _ in range(rnd.choice((1, 1, 1, 2, 3))):
+        lines.append(" ".join(rnd.choice(WORDS)
+                              for _ in range(rnd.randint(0, 40))))
+    text = "\n".join(lines)
+    if rnd.random() < 0.1:
+        text += "\n"
+    return text
+
+
+def build_sequence(num: int, rnd: random.Random):
+    chunks = [{"id": str(n), "data": random_text(rnd)} for n in range(num)]
+    doc = SequenceLocalSrcDocument(chunks=chunks)
+    doc.set_id("seq-doc")
+    return doc
+
+
+def build_tree(num: int, rnd: random.Random):
+    def node(n, depth):
+        chunk = {"id": str(n), "data": random_text(rnd),
+                 "context": {"title": random_text(rnd)}}
+        if depth < 3:
+            chunk["chunks"] = [node(f"{n}.{i}", depth+1)
+                               for i in range(rnd.randint(0, 3))]
+        return chunk
+    doc = TreeLocalSrcDocument(chunks=[node(n, 0) for n in range(num // 10)])
+    doc.set_id("tree-doc")
+    return doc
+
+
+def build_collection(num: int, rnd: random.Random):
+    piic = PiiCollection(lang="en", docid="doc1")
+    det = PiiDetector("PIISA", "bench", "0.1")
+    types = list(PiiEnum)
+    for n in range(num):
+        piic.add(PiiEntity.build(rnd.choice(types), random_text(rnd)[:30],
+                                 str(n), rnd.randint(0, 500), lang="en"), det)
+    return piic
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(role: str, name: str, outputs: Dict) -> bool:
+    """
+    Compare the outputs of all backends for a role with the reference one.
+    A difference is an error only for the default backend.
+    """
+    ok = True
+    ref = outputs["python"]
+    default = backends.get_backend(role)
+    for backend, out in outputs.items():
+        if out != ref:
+            error = backend == default
+            print(f"  {'** ERROR' if error else '   note'}: {role} {name}"
+                  f" {backend} produces a different output")
+            ok = ok and not error
+    return ok
+
+
+def bench_yaml(docs, tmpdir: Path) -> bool:
+    ok = True
+    for name, doc in docs:
+        # Dump
+        outputs = {}
+        for backend in backends.available_backends()["yaml-dump"]:
+            backends.set_backend("yaml-dump", backend)
+            outname = tmpdir / f"{name}-{backend}.yaml"
+            _, elapsed = timed(doc.dump, outname)
+            outputs[backend] = outname.read_bytes()
+            print(f"  yaml-dump {name:10} {backend:8} {elapsed:8.3f} s")
+        backends.set_backend("yaml-dump")
+        ok = compare("yaml-dump", name, outputs) and ok
+
+        # Load
+        outputs = {}
+        for backend in backends.available_backends()["yaml-load"]:
+            backends.set_backend("yaml-load", backend)
+            outputs[backend], elapsed = timed(load_datafile,
+                                              tmpdir / f"{name}-python.yaml")
+            print(f"  yaml-load {name:10} {backend:8} {elapsed:8.3f} s")
+        backends.set_backend("yaml-load")
+        ok = compare("yaml-load", name, outputs) and ok
+    return ok
+
+
+def bench_json(docs, piic, tmpdir: Path) -> bool:
+    files = [(name, tmpdir / f"{name}.json") for name, _ in docs]
+    for (_, doc), (_, outname) in zip(docs, files):
+        doc.dump(outname)
+    collname = tmpdir / "collection.ndjson"
+    with open(collname, "w", encoding="utf-8") as f:
+        piic.dump(f)
+
+    ok = True
+    for name, outname in files + [("collection", collname)]:
+        outputs = {}
+        for backend in backends.available_backends()["json-load"]:
+            backends.set_backend("json-load", backend)
+            if name == "collection":
+                loader = PiiCollectionLoader()
+                _, elapsed = timed(loader.load, outname)
+                outputs[backend] = [p.asdict() for p in loader]
+            else:
+                outputs[backend], elapsed = timed(load_datafile, outname)
+            print(f"  json-load {name:10} {backend:8} {elapsed:8.3f} s")
+        backends.set_backend("json-load")
+        ok = compare("json-load", name, outputs) and ok
+    return ok
+
+
+def main():
+    args = ArgumentParser(description="YAML/JSON backends benchmark")
+    args.add_argument("--num", type=int, default=5000,
+                      help="number of chunks/entities")
+    args.add_argument("--seed", type=int, default=42)
+    args = args.parse_args()
+
+    print("available backends:", backends.available_backends())
+    rnd = random.Random(args.seed)
+    docs = [("sequence", build_sequence(args.num, rnd)),
+            ("tree", build_tree(args.num, rnd))]
+    piic = build_collection(args.num, rnd)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ok = bench_yaml(docs, Path(tmpdir))
+        ok = bench_json(docs, piic, Path(tmpdir)) and ok
+
+    print("default backends produce identical outputs" if ok else
+          "OUTPUT MISMATCH in default backends")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: round-trip throughput of DocumentChunk, PiiEntity and
+PiiCollection objects through multiprocessing queues
+
+  PYTHONPATH=src python test/bench/bench_pickle.py [--num N]
+"""
+
+from argparse import ArgumentParser
+import multiprocessing as mp
+import pickle
+import time
+
+from pii_data.types import PiiEnum, PiiEntity, PiiDetector, PiiCollection
+from pii_data.types.doc import DocumentChunk
+
+
+def build_chunks(num: int):
+    ctx = {"document": {"id": "doc1", "main_lang": "en"}, "lang": "en"}
+    return [DocumentChunk(n, f"chunk text number {n} " * 8, ctx)
+            for n in range(num)]
+
+
+def build_entities(num: int):
+    types = list(PiiEnum)
+    return [PiiEntity.build(types[n % len(types)], f"value {n}", str(n//4),
+                            n % 100, lang="en", country="us", docid="doc1")
+            for n in range(num)]
+
+
+def build_collections(num: int, size: int = 100):
+    det = PiiDetector("PIISA", "bench", "0.1")
+    out = []
+    for n in range(num):
+        piic = PiiCollection(lang="en", docid=f"doc{n}")
+        for pii in build_entities(size):
+            piic.add(pii, det)
+        out.append(piic)
+    return out
+
+
+def echo(qin: mp.Queue, qout: mp.Queue):
+    """Worker: send back all received objects"""
+    while True:
+        obj = qin.get()
+        if obj is None:
+            break
+        qout.put(obj)
+
+
+def roundtrip(objs) -> float:
+    """Send a list of objects to a worker process and get them back"""
+    qin, qout = mp.Queue(64), mp.Queue(64)
+    proc = mp.Process(target=echo, args=(qin, qout))
+    proc.start()
+    start = time.perf_counter()
+    pending = 0
+    for obj in objs:
+        qin.put(obj)
+        pending += 1
+        if pending >= 32:
+            qout.get()
+            pending -= 1
+    for _ in range(pending):
+        qout.get()
+    elapsed = time.perf_counter() - start
+    qin.put(None)
+    proc.join()
+    return elapsed
+
+
+def main():
+    args = ArgumentParser(description="pickle round-trip benchmark")
+    args.add_argument("--num", type=int, default=20000,
+                      help="number of objects to send (collections: /100)")
+    args = args.parse_args()
+
+    cases = [("DocumentChunk", build_chunks(args.num)),
+             ("PiiEntity", build_entities(args.num)),
+             ("PiiCollection", build_collections(max(args.num // 100, 1)))]
+    for name, objs in cases:
+        size = sum(len(pickle.dumps(o, pickle.HIGHEST_PROTOCOL))
+                   for o in objs) / len(objs)
+        elapsed = roundtrip(objs)
+        print(f"{name:15} {len(objs):8} objs  {size:10.1f} bytes/obj  "
+              f"{len(objs)/elapsed:12.1f} objs/s")
+
+
+if __name__ == "__main__":
+    main()
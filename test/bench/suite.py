@@ -0,0 +1,242 @@
+"""
+Benchmark suite for the main processing paths, over synthetic data at
+several scales. Results are written as JSON, and two result files can be
+compared to detect regressions.
+
+  PYTHONPATH=src python test/bench/suite.py run [--scale small medium]
+      [--repeat N] [--filter REGEX] [--output results.json]
+  PYTHONPATH=src python test/bench/suite.py compare BASE.json NEW.json
+      [--threshold 0.15] [--min-diff 0.001]
+
+(or `make bench` / `make bench-compare`).
+
+The exit status of `compare` is 1 if any benchmark present in both files is
+slower than the baseline by more than the threshold.
+
+The bench_*.py scripts in this directory are standalone benchmarks for
+specific features (pickling, parsing backends).
+"""
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from io import StringIO
+import datetime
+import platform
+import statistics
+import json
+import gc
+import re
+import sys
+import tempfile
+import time
+
+from typing import Callable, Dict, List, Tuple
+
+import pii_data
+from pii_data.types.doc.localdoc import load_file, dump_file
+from pii_data.types.piicollection import PiiCollectionLoader, PiiChunkIterator
+
+import synth
+
+
+# Registered benchmarks: name -> setup function. A setup function receives
+# the synthetic data and a temporary directory, and returns the function to
+# time plus the number of items it processes (document chunks, as produced
+# by iter_full(), or PII entities)
+BENCHMARKS: Dict[str, Callable] = {}
+
+TYPE_SETUP = Callable[[Dict, Path], Tuple[Callable, int]]
+
+
+def benchmark(name: str) -> Callable[[TYPE_SETUP], TYPE_SETUP]:
+    def register(setup: TYPE_SETUP) -> TYPE_SETUP:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def count(iterable) -> int:
+    return sum(1 for _ in iterable)
+
+
+# ---------------------------------------------------------------------------
+
+def _iter_full(doctype: str, context: bool):
+    def setup(data: Dict, tmpdir: Path):
+        doc = data[doctype]
+        num = count(doc.iter_full())
+        return lambda: count(doc.iter_full(context=context)), num
+    return setup
+
+
+def _dump(doctype: str, fmt: str):
+    def setup(data: Dict, tmpdir: Path):
+        doc = data[doctype]
+        name = tmpdir / f"dump-{doctype}.{fmt}"
+        return lambda: dump_file(doc, name), count(doc.iter_full())
+    return setup
+
+
+def _load(doctype: str, fmt: str):
+    def setup(data: Dict, tmpdir: Path):
+        doc = data[doctype]
+        name = tmpdir / f"load-{doctype}.{fmt}"
+        dump_file(doc, name)
+        return lambda: count(load_file(name).iter_struct()), \
+            count(doc.iter_full())
+    return setup
+
+
+def _collection_load(fmt: str):
+    def setup(data: Dict, tmpdir: Path):
+        piic = data["collection"]
+        name = tmpdir / f"collection.{fmt}"
+        with open(name, "w", encoding="utf-8") as f:
+            piic.dump(f, format=fmt)
+        return lambda: PiiCollectionLoader().load(name), len(piic)
+    return setup
+
+
+def _collection_dump(fmt: str):
+    def setup(data: Dict, tmpdir: Path):
+        piic = data["collection"]
+        return lambda: piic.dump(StringIO(), format=fmt), len(piic)
+    return setup
+
+
+for _doctype in ("sequence", "tree", "table"):
+    for _ctx in (False, True):
+        benchmark(f"iter_full/{_doctype}/{'context' if _ctx else 'plain'}")(
+            _iter_full(_doctype, _ctx))
+    for _fmt in ("yaml", "json", "ndjson", "txt"):
+        if _doctype != "table" or _fmt != "txt":
+            benchmark(f"dump_file/{_doctype}/{_fmt}")(_dump(_doctype, _fmt))
+    for _fmt in ("yaml", "json", "ndjson"):
+        benchmark(f"load_file/{_doctype}/{_fmt}")(_load(_doctype, _fmt))
+
+for _fmt in ("json", "ndjson"):
+    benchmark(f"PiiCollectionLoader.load/{_fmt}")(_collection_load(_fmt))
+    benchmark(f"PiiCollection.dump/{_fmt}")(_collection_dump(_fmt))
+
+
+@benchmark("PiiChunkIterator")
+def _chunk_iterator(data: Dict, tmpdir: Path):
+    piic = data["collection"]
+    return lambda: count(PiiChunkIterator(piic)), len(piic)
+
+
+# ---------------------------------------------------------------------------
+
+def measure(func: Callable, repeat: int) -> List[float]:
+    """
+    Time a function several times
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run(args: Namespace):
+    select = re.compile(args.filter) if args.filter else None
+    names = [n for n in BENCHMARKS if not select or select.search(n)]
+    results = {}
+    for scale in args.scale:
+        print(f"# building {scale} data", file=sys.stderr)
+        data = synth.build(scale, args.seed)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in names:
+                func, items = BENCHMARKS[name](data, Path(tmpdir))
+                times = measure(func, args.repeat)
+                best = min(times)
+                key = f"{name}[{scale}]"
+                results[key] = {"min_s": best,
+                                "median_s": statistics.median(times),
+                                "items": items,
+                                "items_per_s": items / best if best else None}
+                print(f"{key:45} {best:9.4f} s {items/best:12.0f} items/s",
+                      file=sys.stderr)
+
+    out = {"meta": {"date": datetime.datetime.now().isoformat(),
+                    "version": pii_data.VERSION,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "repeat": args.repeat, "seed": args.seed},
+           "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(out, f, indent=2)
+    else:
+        json.dump(out, sys.stdout, indent=2)
+        print()
+
+
+def compare(args: Namespace) -> int:
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for key in sorted(base.keys() | new.keys()):
+        if key not in new or key not in base:
+            print(f"{key:45} {'only in ' + ('base' if key in base else 'new')}")
+            continue
+        ratio = new[key]["min_s"] / base[key]["min_s"]
+        slower = new[key]["min_s"] - base[key]["min_s"]
+        if ratio > 1 + args.threshold and slower > args.min_diff:
+            flag = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "improved"
+        else:
+            flag = ""
+        print(f"{key:45} {base[key]['min_s']:9.4f} {new[key]['min_s']:9.4f}"
+              f" {100*(ratio - 1):+7.1f}%  {flag}")
+
+    print(f"{regressions} regressions (threshold {100*args.threshold:.0f}%)")
+    return 1 if regressions else 0
+
+
+def parse_args() -> Namespace:
+    args = ArgumentParser(description="pii-data benchmark suite")
+    sub = args.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="run the benchmarks")
+    r.add_argument("--scale", nargs="+", choices=list(synth.SCALES),
+                   default=["small", "medium"])
+    r.add_argument("--repeat", type=int, default=5,
+                   help="times to run each benchmark (the best one is used)")
+    r.add_argument("--filter", metavar="REGEX",
+                   help="run only benchmarks whose name matches")
+    r.add_argument("--seed", type=int, default=42)
+    r.add_argument("--output", help="output JSON file (default: stdout)")
+
+    c = sub.add_parser("compare", help="compare two result files")
+    c.add_argument("base", help="baseline results")
+    c.add_argument("new", help="new results")
+    c.add_argument("--threshold", type=float, default=0.15,
+                   help="relative slowdown considered a regression")
+    c.add_argument("--min-diff", type=float, default=0.001,
+                   help="minimum slowdown, in seconds, to be considered a"
+                   " regression (avoids flagging noise in short timings)")
+
+    sub.add_parser("list", help="list the benchmarks")
+    return args.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.cmd == "list":
+        print("\n".join(BENCHMARKS))
+    elif args.cmd == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
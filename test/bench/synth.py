@@ -0,0 +1,34 @@
+"""
+Synthetic data for the benchmark suite: documents of each type and PII
+collections, built deterministically from a seed at a given scale by
+SyntheticDocGenerator
+"""
+
+from typing import Dict
+
+from pii_data.types.doc.synthetic import SyntheticDocGenerator
+
+
+# Number of (leaf) chunks for each scale
+SCALES = {"small": 1000, "medium": 10000, "large": 100000}
+
+# Mean number of nodes in a tree section, with depth 3 and fan-out 3
+TREE_SECTION = 40
+
+
+def build(scale: str, seed: int = 42) -> Dict:
+    """
+    Build all the benchmark data for a scale. Documents are kept in memory,
+    so that benchmarks do not measure the generation of the chunks
+    """
+    num = SCALES[scale]
+    seq = SyntheticDocGenerator("sequence", num, seed, density=1.0,
+                                docid="sequence-doc")
+    tree = SyntheticDocGenerator("tree", max(num // TREE_SECTION, 1), seed,
+                                 depth=3, fanout=3, docid="tree-doc")
+    table = SyntheticDocGenerator("table", num, seed, columns=6,
+                                  docid="table-doc")
+    return {"sequence": seq.document(in_memory=True),
+            "tree": tree.document(in_memory=True),
+            "table": table.document(in_memory=True),
+            "collection": seq.collection()}
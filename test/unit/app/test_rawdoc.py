@@ -0,0 +1,59 @@
+"""
+Test the pii-data-raw script
+"""
+
+from pathlib import Path
+import io
+import shutil
+import sys
+
+import pytest
+
+from pii_data.types.doc import LocalSrcDocumentFile
+import pii_data.app.rawdoc as mod
+
+
+DATADIR = Path(__file__).parents[2] / "data" / "doc-example"
+
+
+def test100_single(tmp_path: Path, monkeypatch):
+    """Test converting one document"""
+    out = tmp_path / "tree.txt"
+    monkeypatch.setattr(sys, "argv", ["pii-data-raw",
+                                      str(DATADIR / "tree.yaml"), str(out)])
+    mod.main()
+
+    exp = tmp_path / "exp.txt"
+    LocalSrcDocumentFile(DATADIR / "tree.yaml").dump(exp, indent=0)
+    assert out.read_text() == exp.read_text()
+
+
+def test200_batch(tmp_path: Path, monkeypatch, capsys):
+    """Test converting documents given as a directory & a stdin list"""
+    indir = tmp_path / "in"
+    (indir / "a").mkdir(parents=True)
+    for name in ("tree.yaml", "tree-id.yaml"):
+        shutil.copy(DATADIR / name, indir / "a" / name)
+    shutil.copy(DATADIR / "seq-id.yaml", indir)
+
+    outdir = tmp_path / "out"
+    monkeypatch.setattr(sys, "stdin", io.StringIO(f"{indir}/seq-id.yaml\n\n"))
+    monkeypatch.setattr(sys, "argv", ["pii-data-raw", str(indir / "a"), "-",
+                                      "--outdir", str(outdir)])
+    with pytest.raises(SystemExit) as e:
+        mod.main()
+    assert e.value.code == 0
+
+    got = sorted(str(f.relative_to(outdir)) for f in outdir.rglob("*"))
+    assert got == ["a", "a/tree-id.txt", "a/tree.txt", "seq-id.txt"]
+    err = capsys.readouterr().err
+    assert "converted 3 documents" in err
+    assert "docs/s" in err and "MB/s" in err
+
+
+def test300_invalid(monkeypatch):
+    """Test invalid arguments"""
+    monkeypatch.setattr(sys, "argv", ["pii-data-raw", "a.yaml", "b.yaml",
+                                      "c.txt"])
+    with pytest.raises(SystemExit):
+        mod.main()
@@ -87,3 +87,65 @@ def test210_write_seq_ctx_filter():
         exp = yaml_load(f)
 
     assert got == exp
+
+
+def test220_write_ctx_ignored():
+    """Test that context fields are ignored in JSON output"""
+    from io import StringIO
+
+    from pii_data.types.doc.localdoc import SequenceLocalSrcDocument
+
+    doc = SequenceLocalSrcDocument(chunks=[
+        {"id": "1", "data": "text", "context": {"title": "A", "lang": "en"}}])
+    out1, out2 = StringIO(), StringIO()
+    mod.dump_json(doc, out1)
+    mod.dump_json(doc, out2, context_fields=["title"])
+    assert out1.getvalue() == out2.getvalue()
+    assert json.loads(out2.getvalue())["chunks"][0]["context"] == \
+        {"title": "A", "lang": "en"}
+
+
+def test300_stream_identical():
+    """Test the streaming writer produces the same text as the encoder"""
+    from pii_data.defs import FMT_SRCDOCUMENT
+
+    doc = LocalSrcDocumentFile(DATADIR / "tree-ctx.yaml")
+    for indent, ctx, sort in ((None, None, False), (2, None, False),
+                              (4, ["title"], False), ("\t", [], False),
+                              (None, None, True), (2, ["title"], True)):
+        enc = mod._encoder(ctx, indent, {"sort_keys": sort})
+        got = mod.encode_document(doc, context_fields=ctx, indent=indent,
+                                  sort_keys=sort)
+        chunks = [mod.serialize_chunk(c, enc.ctx, enc.ctx_pos)
+                  for c in doc.iter_struct()]
+        exp = enc.encode({"format": FMT_SRCDOCUMENT, "header": doc.metadata,
+                          "chunks": chunks})
+        assert got == exp
+
+
+def test310_stream_nested():
+    """Test that nested chunks are written as they are produced"""
+    from io import StringIO
+    from pii_data.types.doc.localdoc import TreeLocalSrcDocument
+
+    out = StringIO()
+    written = []
+
+    def subchunks(parent: str, depth: int):
+        for n in range(3):
+            cid = f"{parent}.{n}"
+            # all previous chunks have already been written
+            assert all(f'"{c}"' in out.getvalue() for c in written)
+            written.append(cid)
+            chunk = {"id": cid, "data": f"text {cid}"}
+            if depth < 3:
+                chunk["chunks"] = subchunks(cid, depth + 1)
+            yield chunk
+
+    doc = TreeLocalSrcDocument(chunks=[{"id": "1", "data": "root",
+                                        "chunks": subchunks("1", 1)}])
+    mod.dump_json(doc, out)
+
+    got = json.loads(out.getvalue())
+    assert len(written) == 3 + 9 + 27
+    assert got["chunks"][0]["chunks"][2]["chunks"][1]["id"] == "1.2.1"
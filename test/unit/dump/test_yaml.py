@@ -86,3 +86,105 @@ def test220_write_seq_ctx_filter():
         exp = yaml_load(f)
 
     assert got == exp
+
+
+TEXTS = ["a simple text", "two\nlines", "ends with newline\n", "keep\n\n",
+         "\n\nleading breaks", "  leading spaces", "trailing space ",
+         "space \nbreak", "tab\tinside", "ñandú 日本語 😀", "x" * 200,
+         "line sep here", " ", "- dash", "key: value", "123", ""]
+
+CONTEXTS = [{"title": "short"}, {"n": 3, "flag": True, "none": None},
+            {"title": "yes"}, {"title": "it's 2020-01-01"}, {"title": "a: b"},
+            {"list": ["x", {"y": 1}]}, {"title": "long " * 30},
+            {"a b": "key with spaces"}, {"title": "multi\nline"}]
+
+
+def test300_stream_identical():
+    """Test the streaming writer produces the same text as PyYAML"""
+    from yaml import dump, SafeDumper
+    from pii_data.defs import FMT_SRCDOCUMENT
+    from pii_data.dump.utils import ChunkIterWrapper
+    from pii_data.types.doc.localdoc import TreeLocalSrcDocument
+
+    ids = [1, "2", "x3", "yes", "a b", True]
+    chunks = []
+    for n, text in enumerate(TEXTS):
+        chunk = {"id": ids[n % len(ids)], "data": text}
+        if n % 2:
+            chunk["context"] = CONTEXTS[n % len(CONTEXTS)]
+        if n % 3 == 0:
+            chunk["chunks"] = [{"id": f"{n}.1", "data": TEXTS[-n-1],
+                                "context": CONTEXTS[-n % len(CONTEXTS)]}]
+        chunks.append(chunk)
+    chunks.append({"chunks": []})
+    chunks.append({"data": "last\n\n"})
+    doc = TreeLocalSrcDocument(chunks=chunks, metadata={"document":
+                                                        {"id": "d1"}})
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "doc.yaml"
+        mod.dump_yaml(doc, name)
+        got = name.read_text(encoding="utf-8")
+
+    data = {"format": FMT_SRCDOCUMENT, "header": doc.metadata,
+            "chunks": ChunkIterWrapper(doc.iter_struct())}
+    exp = dump(data, Dumper=mod.document_dumper(SafeDumper), sort_keys=False,
+               allow_unicode=True, default_flow_style=False)
+    assert got == exp
+    assert got.endswith("\n...\n")
+    assert yaml_load(got)["chunks"][2]["data"] == TEXTS[2]
+
+
+def test400_dumper_cache():
+    """Test the per-configuration dumper classes"""
+    from yaml import SafeDumper
+    from pii_data.dump.utils import ChunkIterWrapper
+
+    d1 = mod.document_dumper(SafeDumper)
+    assert d1 is mod.document_dumper(SafeDumper)
+    assert issubclass(d1, SafeDumper)
+    d2 = mod.document_dumper(SafeDumper, ["title"])
+    assert d2 is not d1
+    assert d2 is mod.document_dumper(SafeDumper, ["title"])
+    assert ChunkIterWrapper in d1.yaml_representers
+    assert ChunkIterWrapper not in SafeDumper.yaml_representers
+
+
+def test410_concurrent_dump(tmp_path: Path):
+    """Test concurrent dumps with different context fields"""
+    from concurrent.futures import ThreadPoolExecutor
+    from pii_data.helper import backends
+    from pii_data.types.doc.localdoc import TreeLocalSrcDocument, dump_file
+
+    def node(n: str, depth: int):
+        chunk = {"id": n, "data": f"text for chunk {n}\n",
+                 "context": {"title": f"title {n}", "lang": "en",
+                             "extra": [n, depth]}}
+        if depth < 3:
+            chunk["chunks"] = [node(f"{n}.{i}", depth + 1) for i in range(3)]
+        return chunk
+
+    doc = TreeLocalSrcDocument(chunks=[node(str(n), 0) for n in range(5)])
+    configs = [None, ["title"], [], ["extra", "lang"]]
+
+    for backend in backends.available_backends()["yaml-dump"]:
+        prev = backends.set_backend("yaml-dump", backend)
+        try:
+            # Reference outputs, written sequentially
+            exp = []
+            for n, ctx in enumerate(configs):
+                name = tmp_path / f"ref-{n}.yaml"
+                dump_file(doc, name, context_fields=ctx)
+                exp.append(name.read_text(encoding="utf-8"))
+            assert len(set(exp)) == len(configs)
+
+            def job(n: int):
+                name = tmp_path / f"out-{n}.yaml"
+                dump_file(doc, name, context_fields=configs[n % len(configs)])
+                return n, name.read_text(encoding="utf-8")
+
+            with ThreadPoolExecutor(8) as pool:
+                for n, got in pool.map(job, range(32)):
+                    assert got == exp[n % len(configs)]
+        finally:
+            backends.set_backend("yaml-dump", prev)
@@ -0,0 +1,86 @@
+"""
+Test the YAML/JSON backends module
+"""
+
+import json
+from pathlib import Path
+
+import yaml
+import pytest
+
+from pii_data.helper.exception import InvArgException
+from pii_data.helper.io import load_datafile, dump_yaml
+
+import pii_data.helper.backends as mod
+
+
+DATADIR = Path(__file__).parents[2] / "data"
+
+
+def test100_defaults():
+    """Test the default backends"""
+    avail = mod.available_backends()
+    assert set(avail) == {"yaml-load", "yaml-dump", "json-load"}
+    assert mod.get_backend("yaml-dump") == "python"
+    assert mod.yaml_dumper() is yaml.SafeDumper
+    if "libyaml" in avail["yaml-load"]:
+        assert mod.yaml_loader() is yaml.CSafeLoader
+    else:
+        assert mod.yaml_loader() is yaml.SafeLoader
+
+
+def test110_set_backend():
+    """Test selecting a backend"""
+    prev = mod.set_backend("yaml-load", "python")
+    try:
+        assert mod.yaml_loader() is yaml.SafeLoader
+        assert mod.get_backend("yaml-load") == "python"
+    finally:
+        mod.set_backend("yaml-load", prev)
+    assert mod.get_backend("yaml-load") == prev
+
+    with pytest.raises(InvArgException):
+        mod.set_backend("yaml-load", "unknown")
+    with pytest.raises(InvArgException):
+        mod.get_backend("xml-load")
+
+
+@pytest.mark.parametrize("name", ["doc-example/tree.yaml",
+                                  "doc-example/table.yaml",
+                                  "minidoc-example.yaml"])
+def test200_yaml_load(name):
+    """Test that all YAML loaders give the same result"""
+    results = []
+    for backend in mod.available_backends()["yaml-load"]:
+        prev = mod.set_backend("yaml-load", backend)
+        try:
+            results.append(load_datafile(DATADIR / name))
+        finally:
+            mod.set_backend("yaml-load", prev)
+    assert all(r == results[0] for r in results)
+
+
+def test210_yaml_dump(tmp_path: Path):
+    """Test dumping with the YAML dumper backends"""
+    data = {"a": ["ñandú", "x" * 100, {"b": 3}]}
+    for backend in mod.available_backends()["yaml-dump"]:
+        prev = mod.set_backend("yaml-dump", backend)
+        try:
+            dump_yaml(data, tmp_path / f"{backend}.yaml")
+        finally:
+            mod.set_backend("yaml-dump", prev)
+        assert load_datafile(tmp_path / f"{backend}.yaml") == data
+
+
+def test300_json_loads():
+    """Test JSON parsing"""
+    for backend in mod.available_backends()["json-load"]:
+        prev = mod.set_backend("json-load", backend)
+        try:
+            assert mod.json_loads('{"a": [1, "ñ"]}') == {"a": [1, "ñ"]}
+            # Values outside the range of some fast parsers
+            assert mod.json_loads('[18446744073709551617, NaN]')[0] == 2**64+1
+            with pytest.raises(json.JSONDecodeError):
+                mod.json_loads('{"a": ')
+        finally:
+            mod.set_backend("json-load", prev)
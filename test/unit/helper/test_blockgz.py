@@ -0,0 +1,125 @@
+"""
+Test the block-compressed gzip module
+"""
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from pii_data.helper.exception import InvArgException
+from pii_data.types import PiiEnum, PiiEntity, PiiCollection
+
+import pii_data.helper.blockgz as mod
+
+
+def records(num: int):
+    return [json.dumps({"id": n, "value": f"record {n} " * (n % 7)}) + "\n"
+            for n in range(num)]
+
+
+def test100_write(tmp_path: Path):
+    """Test writing a block-compressed file"""
+    name = tmp_path / "out.ndjson.gz"
+    data = records(500)
+    with mod.open_block_gzip(name, block_size=1000, workers=3) as f:
+        for r in data:
+            f.write(r)
+
+    # Readable as plain gzip
+    with gzip.open(name, "rt", encoding="utf-8") as f:
+        assert f.read() == "".join(data)
+
+    # Index
+    assert Path(mod.block_index_name(name)).is_file()
+    assert not Path(str(name) + ".idx").exists()     # no clash with others
+    r = mod.BlockGzipReader(name)
+    assert len(r) > 10
+    assert r.size == len("".join(data).encode("utf-8"))
+    assert r.blocks[0][:2] == (0, 0)
+
+
+def test110_write_binary_noindex(tmp_path: Path):
+    """Test writing a block-compressed file, binary with no index"""
+    name = tmp_path / "out.bin.gz"
+    data = bytes(range(256)) * 50
+    with mod.open_block_gzip(name, "wb", block_size=500, index=False) as f:
+        f.write(data)
+    assert gzip.decompress(name.read_bytes()) == data
+    assert not Path(mod.block_index_name(name)).exists()
+
+    with pytest.raises(InvArgException):
+        mod.open_block_gzip(name, "a")
+
+
+def test120_long_line(tmp_path: Path):
+    """Test that a very long line does not make blocks grow unbounded"""
+    name = tmp_path / "out.ndjson.gz"
+    data = "a" * 10000 + "\n" + "b" * 300 + "\n"
+    with mod.open_block_gzip(name, block_size=500) as f:
+        for n in range(0, len(data), 128):
+            f.write(data[n:n+128])
+    assert gzip.decompress(name.read_bytes()).decode() == data
+
+    r = mod.BlockGzipReader(name)
+    starts = [b[0] for b in r.blocks] + [r.size]
+    sizes = [e - s for s, e in zip(starts, starts[1:])]
+    assert max(sizes) <= mod.MAX_BLOCK_FACTOR * 500
+    assert r.read(0) == data.encode()
+    assert list(r.iter_lines()) == [l.encode() + b"\n"
+                                    for l in data.split("\n")[:-1]]
+
+
+def test200_read(tmp_path: Path):
+    """Test random access to a block-compressed file"""
+    name = tmp_path / "out.ndjson.gz"
+    data = records(300)
+    with mod.open_block_gzip(name, block_size=700) as f:
+        f.writelines(data)
+    exp = "".join(data).encode("utf-8")
+
+    r = mod.BlockGzipReader(name)
+    assert r.read(0) == exp
+    assert r.read(1234, 100) == exp[1234:1334]
+    assert r.read(5000) == exp[5000:]
+
+    # Blocks end at record boundaries
+    for upos, _, _ in r.blocks[1:]:
+        assert exp[upos-1:upos] == b"\n"
+
+
+@pytest.mark.parametrize("num", [1, 2, 3, 7])
+def test210_split(tmp_path: Path, num: int):
+    """Test splitting a block-compressed file"""
+    name = tmp_path / "out.ndjson.gz"
+    data = records(300)
+    with mod.open_block_gzip(name, block_size=700) as f:
+        f.writelines(data)
+
+    r = mod.BlockGzipReader(name)
+    splits = r.split(num)
+    assert len(splits) == num
+    assert splits[0][0] == 0
+    assert sum(s[1] for s in splits) == r.size
+
+    got = [line.decode("utf-8")
+           for offset, length in splits
+           for line in r.iter_lines(offset, length)]
+    assert got == data
+
+
+def test300_collection(tmp_path: Path):
+    """Test dumping a PiiCollection to a block-compressed file"""
+    piic = PiiCollection(lang="en", docid="doc1")
+    for n in range(100):
+        piic.add(PiiEntity.build(PiiEnum.PHONE_NUMBER, f"555-{n}", str(n), 3))
+
+    name = tmp_path / "piic.ndjson.gz"
+    with mod.open_block_gzip(name, block_size=2000) as f:
+        piic.dump(f, format="ndjson")
+
+    r = mod.BlockGzipReader(name)
+    lines = [json.loads(line) for line in r.iter_lines()]
+    assert len(lines) == 101
+    assert lines[1]["value"] == "555-0"
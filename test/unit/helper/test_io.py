@@ -2,6 +2,7 @@
 Test the io module
 """
 
+import os
 from os import unlink
 from pathlib import Path
 import tempfile
@@ -14,6 +15,7 @@ import json
 import pytest
 from unittest.mock import Mock
 
+from pii_data.helper.exception import FileException
 import pii_data.helper.io as mod
 
 
@@ -94,6 +96,74 @@ def test220_openfile_compressed(ext):
         unlink(f.name)
 
 
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test230_openfile_prefetch(ext):
+    """Test openfile, compressed with read-ahead"""
+    with mod.openfile(EXAMPLE, encoding="utf-8") as f:
+        data1 = f.read()
+
+    try:
+        with tempfile.NamedTemporaryFile(suffix=f".json.{ext}",
+                                         delete=False) as f:
+            f.close()
+            lib = gzip if ext == "gz" else bz2 if ext == "bz2" else lzma
+            with lib.open(f.name, "wb") as ff:
+                ff.write(data1.encode("utf-8"))
+
+            # Text
+            with mod.openfile(f.name, prefetch=2) as ft:
+                assert isinstance(ft, io.TextIOWrapper)
+                assert ft.read() == data1
+
+            # Text, line by line
+            with mod.openfile(f.name, prefetch=2) as ft:
+                assert "".join(ft) == data1
+
+            # Binary, with seeks
+            exp = data1.encode("utf-8")
+            with mod.openfile(f.name, "rb", prefetch=2) as fb:
+                assert fb.read(10) == exp[:10]
+                fb.seek(100)
+                assert fb.read(20) == exp[100:120]
+                fb.seek(5)
+                assert fb.read() == exp[5:]
+
+            # Through the module default
+            mod.set_prefetch(4)
+            try:
+                with mod.openfile(f.name, "rb") as fb:
+                    assert isinstance(fb, io.BufferedReader)
+                    assert fb.read() == exp
+            finally:
+                mod.set_prefetch(0)
+
+    finally:
+        unlink(f.name)
+
+
+def test240_prefetch_small_blocks():
+    """Test the read-ahead reader with many small blocks"""
+    from pii_data.helper.prefetch import PrefetchReader
+    exp = bytes(range(256)) * 100
+    src = io.BytesIO(exp)
+    with io.BufferedReader(PrefetchReader(src, block_size=7,
+                                          max_blocks=2)) as f:
+        assert f.read(1000) == exp[:1000]
+        f.seek(20000)
+        assert f.read() == exp[20000:]
+    assert src.closed
+
+
+def test250_prefetch_error():
+    """Test the read-ahead reader, error in the source"""
+    with tempfile.NamedTemporaryFile(suffix=".gz") as f:
+        f.write(b"not a gzip file")
+        f.flush()
+        with mod.openfile(f.name, "rb", prefetch=2) as fb:
+            with pytest.raises(gzip.BadGzipFile):
+                fb.read()
+
+
 def test300_openuri():
     """Test openuri, implicit file"""
 
@@ -191,3 +261,72 @@ def test400_yaml():
         #print(f.name)
 
     assert data1 == data2
+
+
+def test500_parse_cache(tmp_path, monkeypatch):
+    """Test load_datafile with a parse cache"""
+    data = {"a": [1, 2, {"b": "ñandú"}], "c": None}
+    name = tmp_path / "data.yaml"
+    mod.dump_yaml(data, name)
+
+    mod.set_parse_cache(tmp_path / "cache")
+    try:
+        assert mod.load_datafile(name) == data
+        assert len(list((tmp_path / "cache").iterdir())) == 1
+
+        # Second load: no YAML parsing
+        monkeypatch.setattr(mod, "_yaml_load", Mock(side_effect=Exception))
+        got = mod.load_datafile(name)
+        assert got == data
+        got["a"].append(3)
+        assert mod.load_datafile(name) == data
+
+        # A modified file is parsed again
+        monkeypatch.undo()
+        data["c"] = 3
+        mod.dump_yaml(data, name)
+        assert mod.load_datafile(name) == data
+    finally:
+        mod.set_parse_cache(None)
+
+
+def test510_parse_cache_evict(tmp_path):
+    """Test the size cap in the parse cache"""
+    from pii_data.helper.parsecache import ParseCache
+    cache = ParseCache(tmp_path / "cache", max_size=3000)
+    for n in range(10):
+        cache.put(f"key{n}", "x" * 1000)
+        assert cache.get(f"key{n}") == "x" * 1000
+    entries = list((tmp_path / "cache").iterdir())
+    assert 1 <= len(entries) <= 3
+    assert cache.get("key9") == "x" * 1000
+    assert cache.get("key0") is None
+    cache.clear()
+    assert cache.get("key9") is None
+
+
+def test520_parse_cache_none(tmp_path):
+    """Test caching a None result"""
+    from pii_data.helper.parsecache import ParseCache
+    name = tmp_path / "data.yaml"
+    name.write_text("")
+    cache = ParseCache(tmp_path / "cache")
+    loader = Mock(return_value=None)
+    assert cache.load(name, loader) is None
+    assert cache.load(name, loader) is None
+    assert loader.call_count == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test530_parse_cache_permissions(tmp_path):
+    """Test the permissions of the parse cache directory"""
+    from pii_data.helper.parsecache import ParseCache
+    ParseCache(tmp_path / "cache")
+    assert (tmp_path / "cache").stat().st_mode & 0o777 == 0o700
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    with pytest.raises(FileException):
+        ParseCache(shared)
+
@@ -0,0 +1,77 @@
+"""
+Test the lazy loading of package exports and modules
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from typing import List
+
+import pytest
+
+import pii_data.types as types_mod
+
+
+SRCDIR = Path(__file__).parents[3] / "src"
+
+# Modules that should not be loaded by just importing the packages
+HEAVY_MODULES = ["yaml", "urllib.request", "ssl", "gzip", "bz2", "lzma",
+                 "pii_data.helper.io", "pii_data.types.doc.localdoc",
+                 "pii_data.dump.yaml"]
+
+CODE = """
+import sys
+{stmt}
+print(" ".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def loaded_modules(stmt: str, heavy: List[str]) -> List[str]:
+    """
+    Execute an import statement in a fresh interpreter
+      :return: the modules in `heavy` loaded by it
+    """
+    env = {**os.environ, "PYTHONPATH": str(SRCDIR)}
+    code = CODE.format(stmt=stmt, heavy=heavy)
+    r = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                       capture_output=True, text=True)
+    return r.stdout.split()
+
+
+def test100_lazy_names():
+    """Test lazily exported names"""
+    from pii_data.types.piientity import PiiEntity
+    assert types_mod.PiiEntity is PiiEntity
+    assert "PiiCollection" in dir(types_mod)
+    assert "PiiEnum" in types_mod.__all__
+    with pytest.raises(AttributeError):
+        types_mod.NotAName
+
+
+def test110_star_import():
+    """Test a star import of a lazy package"""
+    ns = {}
+    exec("from pii_data.pipeline import *", ns)
+    assert "PipelineRunner" in ns and "dump_files" in ns
+
+
+@pytest.mark.parametrize("stmt", [
+    "import pii_data.types, pii_data.types.doc, pii_data.pipeline, "
+    "pii_data.dump, pii_data.helper",
+    "from pii_data.types import PiiEnum, PiiEntity, PiiCollection"
+])
+def test200_import_lazy(stmt: str):
+    """Test that importing the packages does not load heavy modules"""
+    assert loaded_modules(stmt, HEAVY_MODULES) == []
+
+
+def test210_io_lazy():
+    """Test that the io module loads compression modules on demand"""
+    assert loaded_modules("import pii_data.helper.io",
+                          ["urllib.request", "ssl", "gzip", "bz2",
+                           "lzma"]) == []
+    stmt = ("from pii_data.helper.io import openfile; "
+            "openfile('-', 'wt').flush()")
+    assert loaded_modules(stmt, ["gzip", "bz2", "lzma"]) == []
@@ -0,0 +1,141 @@
+"""
+Test the checkpoint index for compressed files
+"""
+
+import gzip
+import lzma
+import random
+from pathlib import Path
+
+import pytest
+
+from pii_data.helper.io import openfile
+from pii_data.helper.exception import InvArgException
+
+import pii_data.helper.zindex as mod
+
+
+def make_lines(num: int, seed: int = 1):
+    rnd = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "ñandú", "omega", "pi"]
+    return [f"{n} " + " ".join(rnd.choice(words)
+                                for _ in range(rnd.randint(1, 30))) + "\n"
+            for n in range(num)]
+
+
+@pytest.fixture
+def gzfile(tmp_path: Path):
+    lines = make_lines(20000)
+    name = tmp_path / "data.txt.gz"
+    name.write_bytes(gzip.compress("".join(lines).encode("utf-8"), 6))
+    return name, lines
+
+
+@pytest.fixture
+def xzfile(tmp_path: Path):
+    lines = make_lines(3000)
+    name = tmp_path / "data.txt.xz"
+    # A multi-stream xz file, for several checkpoints
+    with open(name, "wb") as f:
+        for n in range(0, len(lines), 1000):
+            f.write(lzma.compress("".join(lines[n:n+1000]).encode("utf-8")))
+    return name, lines
+
+
+def test100_build_gz(gzfile):
+    """Test building an index for a gzip file"""
+    name, lines = gzfile
+    idx = mod.build_seek_index(name, span=32768)
+    assert idx == str(name) + ".zidx"
+
+    index = mod.SeekIndex(idx)
+    exp = "".join(lines).encode("utf-8")
+    assert index.size == len(exp)
+    assert index.meta["lines"] == len(lines)
+    assert len(index.points) > 5
+    assert index.points[0][:3] == (0, 0, -1)
+    for p in index.points:
+        assert p[3] == exp[:p[0]].count(b"\n")
+
+
+def test110_seek_gz(gzfile):
+    """Test seeking in an indexed gzip file"""
+    name, lines = gzfile
+    mod.build_seek_index(name, span=32768)
+    exp = "".join(lines).encode("utf-8")
+
+    with openfile(name, "rb") as f:
+        assert isinstance(f, mod.SeekableReader)
+        for offset in (len(exp) - 100, 70000, 12, 500000, 300000):
+            assert f.seek(offset) == offset
+            assert f.read(50) == exp[offset:offset+50]
+            assert f.tell() == offset + 50
+        f.seek(0)
+        assert f.read() == exp
+
+
+def test120_seek_line_gz(gzfile):
+    """Test going to a line in an indexed gzip file"""
+    name, lines = gzfile
+    mod.build_seek_index(name, span=32768)
+
+    with openfile(name, "rb") as f:
+        for n in (15000, 0, 7, 19999, 8000):
+            f.seek_line(n)
+            assert f.readline().decode("utf-8") == lines[n]
+
+    with openfile(name, encoding="utf-8") as f:
+        assert list(f) == lines
+
+
+def test130_gz_members(tmp_path: Path):
+    """Test an indexed gzip file with many members"""
+    lines = make_lines(5000)
+    name = tmp_path / "data.txt.gz"
+    with open(name, "wb") as f:
+        for n in range(0, len(lines), 500):
+            f.write(gzip.compress("".join(lines[n:n+500]).encode("utf-8")))
+    mod.build_seek_index(name, span=10000)
+    exp = "".join(lines).encode("utf-8")
+
+    index = mod.SeekIndex(mod.zindex_name(name))
+    assert len(index.points) >= 10
+    with openfile(name, "rb") as f:
+        f.seek(len(exp) // 2)
+        assert f.read() == exp[len(exp)//2:]
+        f.seek_line(4321)
+        assert f.readline().decode("utf-8") == lines[4321]
+
+
+def test200_xz(xzfile):
+    """Test an indexed xz file"""
+    name, lines = xzfile
+    mod.build_seek_index(name)
+    exp = "".join(lines).encode("utf-8")
+
+    index = mod.SeekIndex(mod.zindex_name(name))
+    assert len(index.points) == 3
+    assert index.points[1][3] == 1000
+    with openfile(name, "rb") as f:
+        assert isinstance(f, mod.SeekableReader)
+        f.seek(len(exp) - 1000)
+        assert f.read() == exp[-1000:]
+        f.seek_line(2500)
+        assert f.readline().decode("utf-8") == lines[2500]
+
+
+def test300_stale(gzfile):
+    """Test an index that does not match the file"""
+    name, lines = gzfile
+    mod.build_seek_index(name)
+    with gzip.open(name, "wt", encoding="utf-8") as f:
+        f.writelines(lines[:100])
+    with openfile(name, "rb") as f:
+        assert not isinstance(f, mod.SeekableReader)
+        assert f.read().decode("utf-8") == "".join(lines[:100])
+
+
+def test310_invalid(tmp_path: Path):
+    """Test indexing an unsupported file"""
+    with pytest.raises(InvArgException):
+        mod.build_seek_index(tmp_path / "data.bz2")
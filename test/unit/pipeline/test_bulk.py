@@ -0,0 +1,106 @@
+"""
+Test the bulk conversion of document files
+"""
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from pii_data.helper.exception import InvArgException, ProcException
+from pii_data.types.doc import LocalSrcDocumentFile
+import pii_data.pipeline.bulk as mod
+
+
+DATADIR = Path(__file__).parents[2] / "data" / "doc-example"
+
+FILES = ["seq-id.yaml", "tree-ctx.yaml", "tree.yaml", "tree-id.yaml"]
+
+
+@pytest.fixture
+def intree(tmp_path: Path):
+    """An input directory tree with some documents"""
+    root = tmp_path / "in"
+    for n, name in enumerate(FILES):
+        sub = root / f"sub{n % 2}"
+        sub.mkdir(parents=True, exist_ok=True)
+        shutil.copy(DATADIR / name, sub / name)
+    return root
+
+
+def test100_output_name():
+    """Test the mapping of input to output names"""
+    assert mod.output_name("/a/b/c/doc.yaml", "/a/b", "/out", ".txt") == \
+        Path("/out/c/doc.txt")
+    assert mod.output_name("/a/doc.v1.yaml.gz", "/a", "out", ".json") == \
+        Path("out/doc.v1.json")
+    with pytest.raises(InvArgException):
+        mod.output_name("/a/doc.yaml", "/b", "/out", ".txt")
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test200_dump(intree: Path, tmp_path: Path, workers: int):
+    """Test converting a directory tree"""
+    outdir = tmp_path / "out"
+    stats = mod.dump_files([intree / "**" / "*.yaml"], outdir, format="txt",
+                           workers=workers, max_pending=1)
+    assert stats["documents"] == len(FILES)
+    assert stats["errors"] == 0
+    assert stats["bytes"] == sum((DATADIR / f).stat().st_size for f in FILES)
+
+    got = sorted(str(f.relative_to(outdir)) for f in outdir.rglob("*.txt"))
+    assert got == ["sub0/seq-id.txt", "sub0/tree.txt", "sub1/tree-ctx.txt",
+                   "sub1/tree-id.txt"]
+
+    exp = tmp_path / "exp.txt"
+    LocalSrcDocumentFile(DATADIR / "tree.yaml").dump(exp)
+    assert (outdir / "sub0" / "tree.txt").read_text() == exp.read_text()
+
+
+def test205_dump_dir(intree: Path, tmp_path: Path):
+    """Test converting all documents in a directory"""
+    (intree / "sub1" / "notes.md").write_text("not a document\n")
+    assert mod.expand_inputs([intree]) == \
+        [intree / "sub0" / f for f in ("seq-id.yaml", "tree.yaml")] + \
+        [intree / "sub1" / f for f in ("tree-ctx.yaml", "tree-id.yaml")]
+
+    outdir = tmp_path / "out"
+    stats = mod.dump_files([intree], outdir, format="ndjson", workers=0)
+    assert stats["documents"] == len(FILES)
+    assert (outdir / "sub1" / "tree-id.ndjson").is_file()
+    assert stats["peak_rss"] is None or stats["peak_rss"] > 1000000
+
+
+def test210_dump_root(intree: Path, tmp_path: Path):
+    """Test converting files, with an explicit input root"""
+    outdir = tmp_path / "out"
+    stats = mod.dump_files([intree / "sub1" / "tree-ctx.yaml"], outdir,
+                           format="json", input_root=intree, workers=0)
+    assert stats["documents"] == 1
+    assert (outdir / "sub1" / "tree-ctx.json").is_file()
+
+
+def test300_errors(intree: Path, tmp_path: Path):
+    """Test conversion errors"""
+    (intree / "sub0" / "bad.yaml").write_text("format: unknown\n")
+    outdir = tmp_path / "out"
+    stats = mod.dump_files([intree / "**" / "*.yaml"], outdir, workers=2)
+    assert stats["documents"] == len(FILES)
+    assert stats["errors"] == 1
+    assert stats["failed"][0][0].endswith("bad.yaml")
+
+    with pytest.raises(ProcException):
+        mod.dump_files([intree / "**" / "*.yaml"], outdir, workers=0,
+                       on_error="raise")
+
+
+def test310_invalid(intree: Path, tmp_path: Path):
+    """Test invalid bulk conversions"""
+    shutil.copy(DATADIR / "tree.json", intree / "sub0")
+    with pytest.raises(InvArgException):
+        mod.dump_files([intree / "sub0" / "tree.*"], tmp_path)
+    with pytest.raises(InvArgException):
+        mod.dump_files([intree / "missing.yaml"], tmp_path)
+    with pytest.raises(InvArgException):
+        mod.dump_files([intree / "sub0" / "tree.yaml"], tmp_path,
+                       format="pdf")
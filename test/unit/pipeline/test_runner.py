@@ -0,0 +1,218 @@
+"""
+Test the PipelineRunner class
+"""
+
+from pathlib import Path
+import tempfile
+import re
+
+import pytest
+
+from pii_data.helper.exception import ProcException, InvArgException
+from pii_data.types import PiiEnum, PiiEntity, PiiDetector, PiiCollection
+from pii_data.types.doc.localdoc import SequenceLocalSrcDocument
+from pii_data.types.doc.corpus import Corpus, CorpusWriter
+from pii_data.types.piicollection import load_collections
+import pii_data.pipeline.runner as mod
+
+
+def email_detector(fail: str = None):
+    """A detector factory, for testing purposes"""
+    det = PiiDetector("test", "email", "0.1")
+    rgx = re.compile(r"\w+@\w+\.com")
+
+    def detect(doc):
+        if doc.id == fail:
+            raise ValueError("failed document")
+        piic = PiiCollection(docid=doc.id)
+        for chunk in doc:
+            for m in rgx.finditer(chunk.data):
+                pii = PiiEntity.build(PiiEnum.EMAIL_ADDRESS, m.group(),
+                                      chunk.id, m.start())
+                piic.add(pii, det)
+        return piic
+
+    return detect
+
+
+def nodate(text: str) -> str:
+    """Remove collection dates from an output file"""
+    return re.sub(r'"date": "[^"]+"', '"date": ""', text)
+
+
+def build_docs(num: int):
+    for n in range(num):
+        chunks = [f"mail to user{n}@example.com", "no pii here",
+                  f"or to other{n}@example.com"]
+        yield SequenceLocalSrcDocument(chunks=chunks[:1 + n % 3],
+                                       metadata={"document": {"id": f"d{n}"}})
+
+
+# ----------------------------------------------------------------
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test100_run(workers):
+    """Test running a pipeline"""
+    runner = mod.PipelineRunner(email_detector, workers=workers,
+                                max_pending=3)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "out.ndjson"
+        stats = runner.run(build_docs(10), name)
+        got = list(load_collections(name))
+
+    assert stats["documents"] == 10
+    assert stats["entities"] == 13
+    assert stats["errors"] == 0
+    assert [p.pii[0].fields["docid"] for p in got] == \
+        [f"d{n}" for n in range(10)]
+    assert [len(p) for p in got] == [1, 1, 2] * 3 + [1]
+    assert got[2].pii[1].fields["value"] == "other2@example.com"
+
+
+def test110_run_name():
+    """Test running a pipeline, detector given by name"""
+    runner = mod.PipelineRunner(f"{__name__}.email_detector", workers=0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "out.ndjson"
+        stats = runner.run(build_docs(2), name)
+    assert stats["documents"] == 2
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test200_error(workers):
+    """Test detector errors"""
+    args = {"fail": "d3"}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "out.ndjson"
+
+        runner = mod.PipelineRunner(email_detector, args, workers=workers)
+        with pytest.raises(ProcException):
+            runner.run(build_docs(6), name)
+        assert runner.stats["documents"] == 3
+
+        runner = mod.PipelineRunner(email_detector, args, workers=workers,
+                                    on_error="skip")
+        stats = runner.run(build_docs(6), name)
+        assert stats["documents"] == 5
+        assert stats["errors"] == 1
+        assert len(list(load_collections(name))) == 5
+
+
+# ----------------------------------------------------------------
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test300_checkpoint_resume(workers):
+    """Test resuming an interrupted run from a checkpoint"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "out.ndjson"
+        ckpt = Path(tmpdir) / "ckpt.json"
+
+        # Run a clean pipeline, to get the reference output
+        runner = mod.PipelineRunner(email_detector, workers=workers)
+        runner.run(build_docs(10), name)
+        exp = nodate(name.read_text())
+
+        # A run that fails on a document
+        runner = mod.PipelineRunner(email_detector, {"fail": "d7"},
+                                    workers=workers, checkpoint=ckpt,
+                                    checkpoint_every=3)
+        with pytest.raises(ProcException):
+            runner.run(build_docs(10), name)
+        data = mod.Checkpoint(ckpt).load()
+        assert data["last_docid"] == "d5"
+        assert data["processed"] == 6
+
+        # Simulate a partially written record after the checkpoint
+        with open(name, "a") as f:
+            f.write('{"format": "piisa:pii-coll')
+
+        # Resume
+        runner = mod.PipelineRunner(email_detector, workers=workers,
+                                    checkpoint=ckpt, checkpoint_every=3)
+        stats = runner.run(build_docs(10), name, resume=True)
+        assert stats["documents"] == 10
+        assert nodate(name.read_text()) == exp
+        assert mod.Checkpoint(ckpt).load()["last_docid"] == "d9"
+
+
+def test302_resume_errors():
+    """Test that a failed resume leaves the output untouched"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "out.ndjson"
+        ckpt = Path(tmpdir) / "ckpt.json"
+        runner = mod.PipelineRunner(email_detector, {"fail": "d7"},
+                                    workers=0, checkpoint=ckpt,
+                                    checkpoint_every=3)
+        with pytest.raises(ProcException):
+            runner.run(build_docs(10), name)
+        with open(name, "a") as f:
+            f.write('{"format": "piisa:pii-coll')
+        content = name.read_bytes()
+
+        # A different document stream
+        runner = mod.PipelineRunner(email_detector, workers=0,
+                                    checkpoint=ckpt)
+        docs = list(build_docs(10))
+        with pytest.raises(ProcException):
+            runner.run(docs[1:], name, resume=True)
+        assert name.read_bytes() == content
+
+        # A checkpoint offset past the end of the output file
+        data = mod.Checkpoint(ckpt).load()
+        mod.Checkpoint(ckpt).save(**{**data, "output_offset": 10**6})
+        with pytest.raises(ProcException):
+            runner.run(docs, name, resume=True)
+        assert name.read_bytes() == content
+
+
+def test304_checkpoint_new_run():
+    """Test that a non-resumed run discards an existing checkpoint"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "out.ndjson"
+        ckpt = Path(tmpdir) / "ckpt.json"
+        mod.Checkpoint(ckpt).save(last_docid="other", processed=50,
+                                  output_offset=0, stats={})
+
+        runner = mod.PipelineRunner(email_detector, {"fail": "d2"},
+                                    workers=0, checkpoint=ckpt)
+        with pytest.raises(ProcException):
+            runner.run(build_docs(5), name)
+        assert not ckpt.exists()
+
+        # Resuming now starts from the beginning
+        runner = mod.PipelineRunner(email_detector, workers=0,
+                                    checkpoint=ckpt)
+        stats = runner.run(build_docs(5), name, resume=True)
+        assert stats["documents"] == 5
+        assert len(list(load_collections(name))) == 5
+
+
+def test310_checkpoint_compressed():
+    """Test checkpoints with compressed output"""
+    runner = mod.PipelineRunner(email_detector, workers=0,
+                                checkpoint="ckpt.json")
+    with pytest.raises(InvArgException):
+        runner.run(build_docs(1), "out.ndjson.gz")
+
+
+def test320_resume_corpus():
+    """Test resuming a run reading from a corpus"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        corpus = Path(tmpdir) / "corpus.ndjson"
+        with CorpusWriter(corpus) as w:
+            for doc in build_docs(5):
+                w.add(doc)
+        name = Path(tmpdir) / "out.ndjson"
+        ckpt = Path(tmpdir) / "ckpt.json"
+
+        runner = mod.PipelineRunner(email_detector, {"fail": "d3"}, workers=0,
+                                    checkpoint=ckpt, checkpoint_every=1)
+        with pytest.raises(ProcException):
+            runner.run(Corpus(corpus), name)
+
+        runner = mod.PipelineRunner(email_detector, workers=0,
+                                    checkpoint=ckpt)
+        runner.run(Corpus(corpus), name, resume=True)
+        got = list(load_collections(name))
+        assert [p.pii[0].fields["docid"] for p in got] == \
+            [f"d{n}" for n in range(5)]
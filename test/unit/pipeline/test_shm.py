@@ -0,0 +1,104 @@
+"""
+Test the transfer of chunks through shared memory
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from pii_data.helper.exception import InvArgException
+from pii_data.types.doc import DocumentChunk
+import pii_data.pipeline.shm as mod
+
+
+SRCDIR = Path(__file__).parents[3] / "src"
+
+def chunk_info(chunk: DocumentChunk):
+    """A worker function, for testing purposes"""
+    return chunk.id, chunk.data.upper(), chunk.context
+
+
+def build_chunks(num: int):
+    return [DocumentChunk(f"c{n}", f"chunk número {n} ✓" * (n % 4),
+                          {"document": {"id": "doc"}, "after": "x"*1000})
+            for n in range(num)]
+
+
+# ----------------------------------------------------------------
+
+def test100_pack_unpack():
+    """Test packing & unpacking a batch"""
+    chunks = build_chunks(10)
+    with mod.SharedChunkBatch(chunks, {"lang": "es"}) as batch:
+        ref = pickle.loads(pickle.dumps(batch.ref))
+        assert len(ref) == 10
+        got = mod.unpack_chunks(ref)
+    assert [c.id for c in got] == [c.id for c in chunks]
+    assert [c.data for c in got] == [c.data for c in chunks]
+    assert all(c.context == {"lang": "es"} for c in got)
+
+
+def test110_pack_error():
+    """Test packing non-text chunks"""
+    with pytest.raises(InvArgException):
+        mod.SharedChunkBatch([DocumentChunk(1, ["a", "b"])])
+
+
+def test120_attach_no_tracking():
+    """Test that attaching to a block in another process does not free it"""
+    code = ("import pii_data.pipeline.shm as m; "
+            "s = m._attach({name!r}); print(bytes(s.buf[:4])); s.close()")
+    env = {**os.environ, "PYTHONPATH": str(SRCDIR)}
+    with mod.SharedChunkBatch(build_chunks(3)) as batch:
+        r = subprocess.run([sys.executable, "-c",
+                            code.format(name=batch.ref.name)],
+                           env=env, check=True, capture_output=True,
+                           text=True)
+        assert "leaked" not in r.stderr
+        # The block is still there
+        got = mod.unpack_chunks(batch.ref)
+        assert [c.id for c in got] == ["c0", "c1", "c2"]
+
+
+def test200_dispatch():
+    """Test dispatching chunks to worker processes"""
+    chunks = build_chunks(25)
+    with ProcessPoolExecutor(2) as pool:
+        got = list(mod.dispatch_chunks(pool, chunk_info, chunks,
+                                       batch_size=4, max_pending=2,
+                                       context={"lang": "es"}))
+    exp = [(c.id, c.data.upper(), {"lang": "es"}) for c in chunks]
+    assert exp == got
+
+
+DISPATCH_CODE = """
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from pii_data.types.doc import DocumentChunk
+import pii_data.pipeline.shm as m
+
+def upper(chunk):
+    return chunk.data.upper()
+
+chunks = [DocumentChunk(f"c{n}", f"chunk {n}") for n in range(20)]
+ctx = multiprocessing.get_context("fork")
+with ProcessPoolExecutor(2, mp_context=ctx) as pool:
+    got = list(m.dispatch_chunks(pool, upper, chunks, batch_size=3))
+print(len(got))
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+def test210_dispatch_fork():
+    """Test that dispatching under fork does not upset the resource tracker"""
+    env = {**os.environ, "PYTHONPATH": str(SRCDIR)}
+    r = subprocess.run([sys.executable, "-c", DISPATCH_CODE], env=env,
+                       check=True, capture_output=True, text=True)
+    assert r.stdout.strip() == "20"
+    assert "Traceback" not in r.stderr
+    assert "leaked" not in r.stderr
@@ -68,3 +68,61 @@ def test220_generator_call_context():
     assert chunk.id == "1"
     assert chunk.data == "an example"
     assert chunk.context == {"before": "previous"}
+
+
+# ----------------------------------------------------------------
+
+def _window(elems, **kwargs):
+    """Feed a list of elements into a window generator"""
+    cg = mod.WindowContextChunkGenerator(**kwargs)
+    out = [c for c in map(cg, elems) if c]
+    return out + list(cg.flush())
+
+
+def test300_window():
+    """Test window generator, default window"""
+    elems = [{"data": d} for d in ("one", "two", "three")]
+    got = _window(elems)
+    assert [c.id for c in got] == ["1", "2", "3"]
+    assert got[0].context == {"after": "two"}
+    assert got[1].context == {"before": "one", "after": "three"}
+    assert got[2].context == {"before": "two"}
+
+
+def test310_window_size():
+    """Test window generator, multiple chunks"""
+    elems = [{"data": str(n)} for n in range(1, 7)]
+    got = _window(elems, before=3, after=2, separator=" ")
+    assert len(got) == 6
+    assert got[0].context == {"after": "2 3"}
+    assert got[3].context == {"before": "1 2 3", "after": "5 6"}
+    assert got[4].context == {"before": "2 3 4", "after": "6"}
+    assert got[5].context == {"before": "3 4 5"}
+
+
+def test320_window_asymmetric():
+    """Test window generator, only one side"""
+    elems = [{"data": str(n)} for n in range(1, 4)]
+    got = _window(elems, before=0, after=2)
+    assert [c.context for c in got] == [{"after": "2\n3"}, {"after": "3"}, {}]
+
+    got = _window(elems, before=2, after=0)
+    assert [c.context for c in got] == [{}, {"before": "1"},
+                                        {"before": "1\n2"}]
+
+
+def test330_window_maxchars():
+    """Test window generator, character limit"""
+    elems = [{"data": d} for d in ("abcdef", "ghij", "klm", "nopqrs", "tuv")]
+    got = _window(elems, before=3, after=3, max_chars=5, separator="|")
+    assert got[2].context == {"before": "f|ghij", "after": "nopqr"}
+    assert got[0].context == {"after": "ghij|k"}
+    assert got[4].context == {"before": "opqrs"}
+
+
+def test400_chunk_pickle():
+    """Test pickling a chunk"""
+    import pickle
+    obj = mod.DocumentChunk(1, "an example", {"after": "next"})
+    got = pickle.loads(pickle.dumps(obj))
+    assert got == obj
@@ -0,0 +1,98 @@
+"""
+Test the Corpus & CorpusWriter classes
+"""
+
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from pii_data.helper.exception import InvArgException, FileException
+from pii_data.types.doc.localdoc import LocalSrcDocumentFile, \
+    SequenceLocalSrcDocument
+import pii_data.types.doc.corpus as mod
+
+
+DATADIR = Path(__file__).parents[3] / "data" / "doc-example"
+
+
+def build_docs(num: int):
+    return [SequenceLocalSrcDocument(chunks=[f"text {n}", f"más texto {n}"],
+                                     metadata={"document": {"id": f"d{n}"}})
+            for n in range(num)]
+
+
+@pytest.fixture(params=["ndjson", "ndjson.gz"])
+def fix_corpus(request):
+    """
+    Create a temporary corpus file
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / f"corpus.{request.param}"
+        with mod.CorpusWriter(name, metadata={"name": "test"}) as w:
+            for doc in build_docs(5):
+                w.add(doc)
+        yield name
+
+
+# ----------------------------------------------------------------
+
+def test100_read(fix_corpus):
+    """Test reading a corpus"""
+    corpus = mod.Corpus(fix_corpus)
+    assert corpus.header["metadata"] == {"name": "test"}
+    got = list(corpus)
+    assert [d.id for d in got] == [f"d{n}" for n in range(5)]
+    assert list(got[3].iter_struct()) == list(build_docs(4)[3].iter_struct())
+    assert corpus.ids() == [f"d{n}" for n in range(5)]
+
+
+@pytest.mark.parametrize("index", [True, False])
+def test110_seek(fix_corpus, index):
+    """Test direct document access & skipping"""
+    corpus = mod.Corpus(fix_corpus, index=index)
+    assert corpus.get("d3").id == "d3"
+    assert [d.id for d in corpus.iter_docs(start="d2")] == ["d2", "d3", "d4"]
+    assert [d.id for d in corpus.iter_docs(start="d1", skip=2)] == ["d3", "d4"]
+    assert [d.id for d in corpus.iter_docs(skip=4)] == ["d4"]
+    with pytest.raises(InvArgException):
+        corpus.get("d7")
+
+
+def test120_append(fix_corpus):
+    """Test appending documents to a corpus"""
+    doc = LocalSrcDocumentFile(DATADIR / "tree-id.yaml")
+    doc.set_id("tree")
+    with mod.CorpusWriter(fix_corpus, append=True) as w:
+        w.add(doc)
+
+    corpus = mod.Corpus(fix_corpus)
+    assert corpus.ids()[-2:] == ["d4", "tree"]
+    got = corpus.get("tree")
+    assert list(got.iter_full()) == list(doc.iter_full())
+    assert len(list(corpus)) == 6
+
+
+@pytest.mark.parametrize("append", [True, False])
+def test125_write_no_index(fix_corpus, append):
+    """Test that writing without an index removes a stale index file"""
+    idxname = Path(str(fix_corpus) + ".idx")
+    assert idxname.is_file()
+    with mod.CorpusWriter(fix_corpus, append=append, index=False) as w:
+        w.add(build_docs(7)[6])
+    assert not idxname.exists()
+
+    corpus = mod.Corpus(fix_corpus)
+    assert corpus.get("d6").id == "d6"
+    exp = [f"d{n}" for n in range(5)] if append else []
+    assert [d.id for d in corpus] == exp + ["d6"]
+
+
+def test130_invalid():
+    """Test reading an invalid corpus"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "corpus.ndjson"
+        with open(name, "w") as f:
+            f.write('{"format": "other"}\n')
+        with pytest.raises(FileException):
+            mod.Corpus(name)
@@ -0,0 +1,106 @@
+"""
+Test the CsvSrcDocument class
+"""
+
+from pathlib import Path
+import tempfile
+import gzip
+
+import pytest
+
+import pii_data.types.doc.csvdoc as mod
+from pii_data.helper.exception import FileException
+
+
+DATADIR = Path(__file__).parents[3] / "data"
+
+COLNAMES = ["Date", "Name", "Credit Card", "Currency", "Amount", "Description"]
+
+
+# ----------------------------------------------------------------
+
+def test100_constructor():
+    """Test object creation"""
+    obj = mod.CsvSrcDocument(DATADIR / "table-example.csv")
+    assert obj.metadata["column"]["name"] == COLNAMES
+    assert obj.metadata["document"]["type"] == "table"
+
+
+def test110_constructor_names():
+    """Test object creation, explicit column names"""
+    names = ["a", "b", "c", "d", "e", "f"]
+    obj = mod.CsvSrcDocument(DATADIR / "table-example.csv",
+                             metadata={"column": {"name": names}})
+    assert obj.metadata["column"]["name"] == names
+
+
+def test200_iter_struct():
+    """Test struct iteration"""
+    obj = mod.CsvSrcDocument(DATADIR / "table-example.csv")
+    got = list(obj.iter_struct())
+    assert len(got) == 3
+    assert got[0]["id"] == 1
+    assert got[1]["data"][:2] == ["2022-09-10", "Erik Jonsk"]
+    assert got[2]["data"][5].startswith("Robot Vacuum Mary, Nobuk")
+
+
+def test210_iter_full():
+    """Test full iteration"""
+    obj = mod.CsvSrcDocument(DATADIR / "table-example.csv",
+                             iter_options={"columns": ["Name"]})
+    got = list(obj)
+    assert [c.id for c in got] == ["1.2", "2.2", "3.2"]
+    assert got[1].data == "Erik Jonsk"
+    assert got[1].context == {"column": {"number": 2, "name": "Name"},
+                              "row": 2}
+
+
+def test220_no_header():
+    """Test a file with no header, TSV & compressed"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "example.tsv.gz"
+        with gzip.open(name, "wt", encoding="utf-8") as f:
+            f.write("a\tb\tc\n\"multi\nline\"\t12\t\n")
+        obj = mod.CsvSrcDocument(name, header=False)
+        assert "name" not in obj.metadata["column"]
+        got = list(obj.iter_struct())
+    assert got == [{"id": 1, "data": ["a", "b", "c"]},
+                   {"id": 2, "data": ["multi\nline", "12", ""]}]
+
+
+def test230_error():
+    """Test a malformed file"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "example.csv"
+        with open(name, "w", encoding="utf-8") as f:
+            f.write("a,b\nc,\"d\"x\"\n")
+        obj = mod.CsvSrcDocument(name, strict=True)
+        with pytest.raises(FileException):
+            list(obj.iter_struct())
+
+
+def test240_ragged_rows():
+    """Test rows with more cells than header columns"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "example.csv"
+        with open(name, "w", encoding="utf-8") as f:
+            f.write("a,b\n1,2,3\n4\n")
+        obj = mod.CsvSrcDocument(name)
+        got = [(c.id, c.context["column"]) for c in obj]
+        assert got == [("1.1", {"number": 1, "name": "a"}),
+                       ("1.2", {"number": 2, "name": "b"}),
+                       ("1.3", {"number": 3}),
+                       ("2.1", {"number": 1, "name": "a"})]
+        cols = [c.context["column"] for c in obj.iter_columns()]
+        assert cols == [{"number": 1, "name": "a"},
+                        {"number": 2, "name": "b"}, {"number": 3}]
+
+
+def test250_empty_header():
+    """Test a file with no rows, so no column names"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "example.csv"
+        name.touch()
+        obj = mod.CsvSrcDocument(name)
+        assert "column" not in obj.metadata
+        assert list(obj) == []
@@ -170,3 +170,25 @@ def test230_iter_metadata():
                                    "lang": "ch",
                                    "before": "another example text"})]
     assert exp == got
+
+
+def test240_iter_ctx_window(fix_uuid):
+    """Test iteration, with a context window"""
+
+    obj = ExampleSrcDoc()
+    got = obj.iter_full(context={"before": 2, "after": 2, "max_chars": 30})
+
+    doc = {"document": {"id": "00000-11111"}}
+    exp = [
+        mod.DocumentChunk(id="1", data="an example text",
+                          context={**doc,
+                                   "after": "another example text\na third ch"}),
+        mod.DocumentChunk(id="2", data="another example text",
+                          context={**doc,
+                                   "before": "an example text",
+                                   "after": "a third chunk"}),
+        mod.DocumentChunk(id="3", data="a third chunk",
+                          context={**doc,
+                                   "before": "ample text\nanother example text"})]
+
+    assert exp == list(got)
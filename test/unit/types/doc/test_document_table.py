@@ -10,6 +10,7 @@ from itertools import cycle
 from unittest.mock import Mock
 import pytest
 
+from pii_data.helper.exception import InvArgException
 import pii_data.types.doc.document as mod
 
 
@@ -145,3 +146,126 @@ def test320_iter_full_ctx_name(fix_uuid):
             ["before", "column", "document", "row"] if n == len(exp)-1 else \
             ["after", "before", "column", "document", "row"]
         assert sorted(g.context.keys()) == cols
+
+
+def test400_iter_columns():
+    """Test iteration, column selection by number & name"""
+
+    obj = ExampleTableSrcDoc(iter_options={"columns": [6, 2]})
+    got = list(obj)
+    assert [c.id for c in got] == ["1.2", "1.6", "2.2", "2.6", "3.2", "3.6"]
+    assert got[1].data == ROWS[0][5]
+    assert got[1].context == {"column": {"number": 6}, "row": 1}
+
+    obj = ExampleTableSrcDoc(iter_options={"columns": ["Name", 3]})
+    obj.add_metadata(column={"name": COLNAMES})
+    got = list(obj)
+    assert [c.id for c in got] == ["1.2", "1.3", "2.2", "2.3", "3.2", "3.3"]
+    assert got[0].context["column"] == {"number": 2, "name": "Name"}
+
+
+def test410_iter_columns_error():
+    """Test iteration, invalid column selection"""
+
+    obj = ExampleTableSrcDoc(iter_options={"columns": ["Name"]})
+    with pytest.raises(mod.InvArgException):
+        list(obj)
+
+    obj = ExampleTableSrcDoc(iter_options={"columns": [0]})
+    with pytest.raises(mod.InvArgException):
+        list(obj)
+
+
+def test420_iter_skip():
+    """Test iteration, skip cells with a predicate"""
+
+    obj = ExampleTableSrcDoc(iter_options={"skip_cells": "numeric"})
+    got = list(obj)
+    assert len(got) == 15
+    assert "1.5" not in [c.id for c in got]
+    assert "1.3" in [c.id for c in got]
+
+    opt = {"skip_cells": ["numeric", lambda c: len(c) == 3],
+           "columns": [3, 4, 5]}
+    obj = ExampleTableSrcDoc(iter_options=opt)
+    got = list(obj)
+    assert [c.id for c in got] == ["1.3", "2.3", "3.3"]
+
+
+def test430_cell_predicates():
+    """Test the predefined cell predicates"""
+    assert mod.cell_numeric(12)
+    assert mod.cell_numeric(" -12.50 ")
+    assert mod.cell_numeric("1,200.5")
+    assert not mod.cell_numeric("4273 9666 4581 5642")
+    assert not mod.cell_numeric("2021-03-01")
+    assert mod.cell_empty(None)
+    assert mod.cell_empty("  ")
+    assert not mod.cell_empty("a")
+
+
+def test500_iter_column_order():
+    """Test iteration, column-major order"""
+
+    obj = ExampleTableSrcDoc(iter_options={"order": "column"})
+    got = list(obj)
+    exp = [f"{r}.{c}" for c in range(1, 7) for r in range(1, 4)]
+    assert [c.id for c in got] == exp
+    assert got[1].data == ROWS[1][0]
+    assert got[1].context == {"column": {"number": 1}, "row": 2}
+
+    obj = ExampleTableSrcDoc(iter_options={"order": "column",
+                                           "columns": [2, 5]})
+    got = list(obj)
+    assert [c.id for c in got] == ["1.2", "2.2", "3.2", "1.5", "2.5", "3.5"]
+
+
+def test510_iter_columns():
+    """Test column chunks"""
+
+    obj = ExampleTableSrcDoc()
+    obj.add_metadata(column={"name": COLNAMES})
+    got = list(obj.iter_columns())
+    assert [c.id for c in got] == [f"*.{c}" for c in range(1, 7)]
+
+    chunk = got[1]
+    assert chunk.data == "John Smith\nErik Jonsk\nJohn Smith"
+    assert chunk.context == {"column": {"number": 2, "name": "Name"},
+                             "rows": [1, 2, 3], "offsets": [0, 11, 22],
+                             "separator": "\n"}
+
+
+def test520_iter_columns_position():
+    """Test mapping positions in column chunks back to cells"""
+
+    opt = {"columns": ["Amount", "Name"], "skip_cells": lambda c: c == "11.99"}
+    obj = ExampleTableSrcDoc(iter_options=opt)
+    obj.add_metadata(column={"name": COLNAMES})
+    got = list(obj.iter_columns(separator=" | "))
+    assert [c.id for c in got] == ["*.2", "*.5"]
+    assert got[1].data == "12.39 | 339.99"
+    assert got[1].context["rows"] == [1, 3]
+
+    pos = got[0].data.index("Erik")
+    assert mod.column_chunk_position(got[0], pos) == ("2.2", 0)
+    pos = got[0].data.rindex("Smith")
+    assert mod.column_chunk_position(got[0], pos) == ("3.2", 5)
+    pos = got[1].data.index("99")
+    assert mod.column_chunk_position(got[1], pos) == ("3.5", 4)
+
+
+def test530_iter_columns_position_error():
+    """Test mapping invalid positions in column chunks"""
+    obj = ExampleTableSrcDoc()
+    chunk = list(obj.iter_columns(separator=" | "))[4]
+    assert chunk.data == "12.39 | 11.99 | 339.99"
+
+    # Cell boundaries
+    assert mod.column_chunk_position(chunk, 4) == ("1.5", 4)
+    assert mod.column_chunk_position(chunk, 8) == ("2.5", 0)
+    assert mod.column_chunk_position(chunk, 21) == ("3.5", 5)
+
+    # Separators & outside the chunk
+    for pos in (5, 6, 7, 13, 15, 22, 100, -1):
+        with pytest.raises(InvArgException):
+            mod.column_chunk_position(chunk, pos)
@@ -0,0 +1,103 @@
+"""
+Test dumping documents with a chunk index, and reading them back through
+the index
+"""
+
+from pathlib import Path
+import json
+import tempfile
+
+import pytest
+
+from pii_data.defs import FMT_SRCDOCUMENT
+from pii_data.helper.exception import InvArgException, FileException, \
+    InvalidDocument
+from pii_data.helper.chunkindex import load_chunk_index, index_name
+from pii_data.types.doc.localdoc import LocalSrcDocumentFile, dump_file
+import pii_data.types.doc.indexdoc as mod
+
+
+DATADIR = Path(__file__).parents[3] / "data" / "doc-example"
+
+
+@pytest.fixture(params=["json", "ndjson", "ndjson.gz"])
+def fix_dumped(request):
+    """
+    Dump a tree document with a chunk index, in several formats
+    """
+    doc = LocalSrcDocumentFile(DATADIR / "tree-id.yaml")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / f"doc.{request.param}"
+        dump_file(doc, name, index=True)
+        yield doc, name
+
+
+# ----------------------------------------------------------------
+
+def test100_index(fix_dumped):
+    """Test the written chunk index"""
+    doc, name = fix_dumped
+    meta, index = load_chunk_index(index_name(name))
+    assert meta["source"] in ("json", "ndjson")
+    assert list(index)[:3] == ["1", "2", "3"]
+    assert index["1"] == index["2"]
+    assert index["1"] != index["3"]
+
+
+def test110_index_error():
+    """Test index on an unsupported format"""
+    doc = LocalSrcDocumentFile(DATADIR / "tree-id.yaml")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(InvArgException):
+            dump_file(doc, Path(tmpdir) / "doc.yaml", index=True)
+        with pytest.raises(FileException):
+            mod.load_indexed_file(Path(tmpdir) / "doc.json")
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test120_json_format(indent):
+    """Test reading the format tag of an indexed JSON document"""
+    doc = LocalSrcDocumentFile(DATADIR / "tree-id.yaml")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "doc.json"
+        dump_file(doc, name, index=True, indent=indent)
+        meta, _ = load_chunk_index(index_name(name))
+        offset, length = meta["docformat"]
+        with open(name, "rb") as f:
+            f.seek(offset)
+            assert json.loads(f.read(length)) == FMT_SRCDOCUMENT
+        assert mod.load_indexed_file(name).id == doc.id
+
+        # A different format tag, of the same length
+        data = name.read_bytes()
+        name.write_bytes(data.replace(b"src-document", b"src-docXment", 1))
+        with pytest.raises(InvalidDocument):
+            mod.load_indexed_file(name)
+
+
+def test200_load(fix_dumped):
+    """Test loading an indexed document"""
+    doc, name = fix_dumped
+    obj = mod.load_indexed_file(name)
+    assert isinstance(obj, mod.IndexedTreeSrcDocument)
+    assert obj.id == doc.id
+    assert list(obj.iter_struct()) == list(doc.iter_struct())
+    assert list(obj.iter_full()) == list(doc.iter_full())
+
+
+def test210_get_chunk(fix_dumped):
+    """Test direct chunk access"""
+    doc, name = fix_dumped
+    obj = mod.load_indexed_file(name)
+
+    got = obj.get_chunk("3")
+    assert got["data"] == "Overall architecture"
+    assert len(got["chunks"]) == 7
+
+    got = obj.get_chunks([7, "2"])
+    assert got[0]["data"].startswith("2. Detection: block in charge")
+    assert got[1] == {"id": 2, "data": "Some rough initial ideas"}
+    assert got == doc.get_chunks(["7", "2"])
+
+    with pytest.raises(InvArgException):
+        obj.get_chunk("1000")
@@ -14,7 +14,7 @@ import pytest
 from typing import Dict
 
 from pii_data.helper.io import load_yaml
-from pii_data.helper.exception import InvalidDocument
+from pii_data.helper.exception import InvalidDocument, InvArgException
 import pii_data.types.doc.document as doc
 import pii_data.types.doc.localdoc as mod
 
@@ -320,3 +320,41 @@ def test620_metadata_lang():
         }
     })
     assert exp == got
+
+
+def test600_ndjson():
+    """Test dumping to NDJSON & reading back"""
+    doc = mod.LocalSrcDocumentFile(DATADIR / "table.yaml")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "table.ndjson"
+        doc.dump(name)
+        with open(name, encoding="utf-8") as f:
+            lines = f.readlines()
+        got = mod.LocalSrcDocumentFile(name)
+
+    assert len(lines) == 4
+    assert isinstance(got, mod.TableLocalSrcDocument)
+    assert got.metadata == doc.metadata
+    assert list(got.iter_struct()) == list(doc.iter_struct())
+
+
+def test605_ndjson_blank_lines():
+    """Test reading an NDJSON document with blank lines"""
+    doc = mod.LocalSrcDocumentFile(DATADIR / "table.yaml")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "table.ndjson"
+        doc.dump(name)
+        lines = name.read_text(encoding="utf-8").split("\n")
+        lines.insert(2, "  ")
+        name.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+        got = mod.LocalSrcDocumentFile(name)
+
+    assert list(got.iter_struct()) == list(doc.iter_struct())
+
+
+def test610_get_chunk():
+    """Test chunk access by id"""
+    doc = mod.LocalSrcDocumentFile(DATADIR / "table.yaml")
+    assert doc.get_chunk("R2")["data"][1] == "Erik Jonsk"
+    with pytest.raises(InvArgException):
+        doc.get_chunk("R4")
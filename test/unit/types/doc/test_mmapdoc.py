@@ -0,0 +1,78 @@
+"""
+Test the MmapTextSrcDocument class
+"""
+
+from pathlib import Path
+import tempfile
+
+import pytest
+
+import pii_data.types.doc.mmapdoc as mod
+from pii_data.helper.exception import InvArgException
+
+
+DATAFILE = Path(__file__).parents[3] / "data" / "text-example.txt"
+
+
+def iter_file(data: bytes, **kwargs):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "example.txt"
+        with open(name, "wb") as f:
+            f.write(data)
+        obj = mod.MmapTextSrcDocument(name, **kwargs)
+        return list(obj.iter_full())
+
+
+# ----------------------------------------------------------------
+
+def test100_constructor():
+    """Test object creation"""
+    obj = mod.MmapTextSrcDocument(DATAFILE)
+    assert obj.metadata["document"]["type"] == "sequence"
+
+    with pytest.raises(InvArgException):
+        mod.MmapTextSrcDocument(DATAFILE, paragraph=False)
+
+
+def test200_iter_paragraph():
+    """Test iteration, by paragraphs"""
+    obj = mod.MmapTextSrcDocument(DATAFILE)
+    got = list(obj.iter_struct())
+    with open(DATAFILE, "rb") as f:
+        raw = f.read()
+
+    assert [c["id"] for c in got] == ["1", "2", "3"]
+    assert got[0]["data"] == "This is a first paragraph\nthat spans two lines."
+    assert got[1]["data"] == "A second paragraph, in a single line."
+    for c in got:
+        start, end = c["context"]["byte_range"]
+        assert raw[start:end].decode("utf-8") == c["data"]
+
+
+def test210_iter_size():
+    """Test iteration, maximum chunk size & multibyte chars"""
+    data = "ñandú piñón\ncañón\n\nmañana€€€€€€€€\n".encode("utf-8")
+    got = iter_file(data, max_bytes=10)
+    assert [c.data for c in got] == ["ñandú pi", "ñón", "cañón", "mañana€",
+                                     "€€€", "€€€", "€"]
+    for c in got:
+        start, end = c.context["byte_range"]
+        assert data[start:end].decode("utf-8") == c.data
+        assert end - start <= 10
+
+
+def test220_iter_empty():
+    """Test iteration, empty file"""
+    assert iter_file(b"") == []
+    assert iter_file(b"\n\n\n") == []
+
+
+def test230_byte_offset():
+    """Test mapping chunk positions to file offsets"""
+    data = "first paragraph\n\nnext: «ñoño» José\r\n".encode("utf-8")
+    got = iter_file(data)
+    assert len(got) == 2
+    chunk = got[1]
+    pos = chunk.data.index("José")
+    offset = mod.byte_offset(chunk, pos)
+    assert data[offset:offset+5].decode("utf-8") == "José"
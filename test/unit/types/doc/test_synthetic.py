@@ -0,0 +1,137 @@
+"""
+Test the synthetic document & PII collection generator
+"""
+
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+from pii_data.helper.exception import InvArgException
+from pii_data.types import PiiEnum
+from pii_data.types.doc import SyntheticDocGenerator
+from pii_data.types.doc.localdoc import load_file
+from pii_data.types.piicollection import PiiCollectionLoader, PiiChunkIterator
+import pii_data.app.synthdoc as app
+
+
+def texts(doc) -> dict:
+    """Return the text of all document chunks, indexed by chunk id"""
+    return {c.id: c.data for c in doc.iter_full()}
+
+
+def test100_sequence():
+    """Test a sequence document"""
+    gen = SyntheticDocGenerator("sequence", size=50, seed=1)
+    doc = gen.document()
+    chunks = list(doc.iter_full())
+    assert len(chunks) == 50
+    assert [c.id for c in chunks] == [str(n) for n in range(1, 51)]
+    assert doc.metadata["document"]["id"] == "synthetic-doc"
+
+
+@pytest.mark.parametrize("doctype", ["sequence", "tree", "table"])
+def test110_positions(doctype: str):
+    """Test that PII entities match the document text"""
+    gen = SyntheticDocGenerator(doctype, size=20, seed=3, density=1)
+    data = texts(gen.document())
+    pii = list(gen.iter_pii())
+    assert pii
+    for p in pii:
+        value = p.fields["value"]
+        assert data[p.fields["chunkid"]][p.pos:p.pos+len(value)] == value
+
+
+def test120_deterministic():
+    """Test that the same seed produces the same data"""
+    gen1 = SyntheticDocGenerator("tree", size=5, seed=7)
+    gen2 = SyntheticDocGenerator("tree", size=5, seed=7)
+    assert list(gen1) == list(gen2)
+    assert list(gen1) == list(gen1)
+    gen3 = SyntheticDocGenerator("tree", size=5, seed=8)
+    assert list(gen1) != list(gen3)
+
+
+def test130_table():
+    """Test a table document"""
+    gen = SyntheticDocGenerator("table", size=4, columns=3, density=0.5)
+    doc = gen.document()
+    assert doc.metadata["column"]["name"] == ["column1", "column2", "column3"]
+    ids = [c.id for c in doc.iter_full()]
+    assert ids == [f"R{r}.{c}" for r in range(1, 5) for c in range(1, 4)]
+
+
+def test140_pii_types():
+    """Test selecting PII types"""
+    gen = SyntheticDocGenerator(size=50, density=2,
+                                pii_types={"EMAIL_ADDRESS": 1})
+    assert {p.info.pii for p in gen.iter_pii()} == {PiiEnum.EMAIL_ADDRESS}
+
+    with pytest.raises(InvArgException):
+        SyntheticDocGenerator(pii_types={"NOT_A_TYPE": 1})
+    with pytest.raises(InvArgException):
+        SyntheticDocGenerator(pii_types={PiiEnum.AGE: 1})
+    with pytest.raises(InvArgException):
+        SyntheticDocGenerator("graph")
+
+
+def test150_in_memory():
+    """Test in-memory documents & collections"""
+    gen = SyntheticDocGenerator("tree", size=4, seed=5, density=1)
+    doc = gen.document(in_memory=True)
+    assert isinstance(doc._chk, list)
+    assert texts(doc) == texts(gen.document())
+    piic = gen.collection()
+    assert list(piic) == list(gen.iter_pii())
+    assert piic.get_header()["detectors"][1]["name"] == "synthetic"
+    assert piic.get_header()["date"].isoformat().startswith("2000-01-01")
+    assert gen.collection().get_header() == piic.get_header()
+
+
+@pytest.mark.parametrize("fmt", ["yaml", "json", "ndjson"])
+def test200_write(tmp_path: Path, fmt: str):
+    """Test writing a document and its collection"""
+    gen = SyntheticDocGenerator("tree", size=3, seed=2, density=1)
+    docname = tmp_path / f"doc.{fmt}"
+    piicname = tmp_path / "pii.ndjson"
+    gen.write_document(docname)
+    gen.write_collection(piicname)
+
+    doc = load_file(docname)
+    assert texts(doc) == texts(gen.document())
+
+    piic = PiiCollectionLoader()
+    piic.load(piicname)
+    assert len(piic) == len(list(gen.iter_pii()))
+    assert piic.get_header()["lang"] == "en"
+
+    # Iterating the document together with its collection
+    it = PiiChunkIterator(piic)
+    for chunk in doc.iter_full():
+        for p in it(chunk.id):
+            assert chunk.data[p.pos:p.pos+len(p)] == p.fields["value"]
+
+    # The collection is reproducible
+    other = tmp_path / "pii2.ndjson"
+    gen.write_collection(other)
+    assert piicname.read_text() == other.read_text()
+    header = json.loads(piicname.read_text().split("\n", 1)[0])
+    assert header["date"].startswith("2000-01-01")
+
+
+def test300_app(tmp_path: Path, monkeypatch):
+    """Test the command-line script"""
+    docname = tmp_path / "doc.ndjson"
+    piicname = tmp_path / "pii.ndjson"
+    monkeypatch.setattr(sys, "argv", [
+        "pii-data-synth", str(docname), "--type", "table", "--size", "10",
+        "--collection", str(piicname), "--pii-types", "person:2", "GOV_ID"])
+    app.main()
+
+    gen = SyntheticDocGenerator("table", size=10,
+                                pii_types={"PERSON": 2, "GOV_ID": 1})
+    assert texts(load_file(docname)) == texts(gen.document())
+    piic = PiiCollectionLoader()
+    piic.load(piicname)
+    assert {p.info.pii for p in piic} <= {PiiEnum.PERSON, PiiEnum.GOV_ID}
@@ -0,0 +1,80 @@
+"""
+Test the TextFileSrcDocument class
+"""
+
+from pathlib import Path
+import tempfile
+import bz2
+
+import pytest
+
+import pii_data.types.doc.textdoc as mod
+from pii_data.helper.exception import InvArgException
+
+
+DATAFILE = Path(__file__).parents[3] / "data" / "text-example.txt"
+
+
+# ----------------------------------------------------------------
+
+def test100_constructor():
+    """Test object creation"""
+    obj = mod.TextFileSrcDocument(DATAFILE)
+    assert obj.metadata["document"]["type"] == "sequence"
+
+    with pytest.raises(InvArgException):
+        mod.TextFileSrcDocument(DATAFILE, paragraph=False)
+
+
+def test200_iter_paragraph():
+    """Test iteration, by paragraphs"""
+    obj = mod.TextFileSrcDocument(DATAFILE)
+    got = list(obj.iter_struct())
+    exp = [
+        {"id": "1",
+         "data": "This is a first paragraph\nthat spans two lines.",
+         "context": {"lines": [1, 2]}},
+        {"id": "2",
+         "data": "A second paragraph, in a single line.",
+         "context": {"lines": [4, 4]}},
+        {"id": "3",
+         "data": "Third paragraph, after\nseveral blank\nlines, with three lines.",
+         "context": {"lines": [7, 9]}}
+    ]
+    assert exp == got
+
+
+def test210_iter_lines():
+    """Test iteration, by fixed line count"""
+    obj = mod.TextFileSrcDocument(DATAFILE, paragraph=False, max_lines=4)
+    got = list(obj.iter_struct())
+    assert [c["context"]["lines"] for c in got] == [[1, 4], [5, 8], [9, 9]]
+    assert got[1]["data"] == "\n\nThird paragraph, after\nseveral blank"
+
+    obj = mod.TextFileSrcDocument(DATAFILE, max_lines=2)
+    got = list(obj.iter_struct())
+    assert [c["context"]["lines"] for c in got] == [[1, 2], [4, 4], [7, 8],
+                                                    [9, 9]]
+
+
+def test220_iter_chars():
+    """Test iteration, by chunk size"""
+    obj = mod.TextFileSrcDocument(DATAFILE, max_chars=40)
+    got = list(obj.iter_struct())
+    assert [c["context"]["lines"] for c in got] == [[1, 1], [2, 2], [4, 4],
+                                                    [7, 8], [9, 9]]
+    assert all(len(c["data"]) <= 40 for c in got)
+
+
+def test230_iter_full_compressed():
+    """Test full iteration, compressed file"""
+    with open(DATAFILE, "rb") as f:
+        data = f.read()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        name = Path(tmpdir) / "example.txt.bz2"
+        with bz2.open(name, "wb") as f:
+            f.write(data)
+        obj = mod.TextFileSrcDocument(name)
+        got = list(obj.iter_full())
+    assert [c.id for c in got] == ["1", "2", "3"]
+    assert got[2].context == {"lines": [7, 9]}
@@ -231,3 +231,22 @@ def test320_piicollection_add_detector(fix_timestamp):
     assert d[1].asdict() == exp[0]
     assert d[2].asdict() == exp[1]
     assert d[3].asdict() == exp[2]
+
+
+def test400_piicollection_pickle(fix_timestamp):
+    """Test pickling a collection"""
+    import pickle
+    obj = mod.PiiCollection(lang="es", docid="doc1")
+    det = mod.PiiDetector("PIISA", "regex", "0.1")
+    for n in range(10):
+        pii = PiiEntity.build(PiiEnum.PHONE_NUMBER if n % 2 else PiiEnum.GOV_ID,
+                              f"34{n}", "1", n*10, lang="es")
+        obj.add(pii, det)
+
+    got = pickle.loads(pickle.dumps(obj))
+    assert got.get_header() == obj.get_header()
+    assert got.defaults == obj.defaults
+    assert list(got) == list(obj)
+    assert [p.asdict() for p in got] == [p.asdict() for p in obj]
+    assert got.pii[0].info is got.pii[2].info
+    assert got.add_detector(det) == 1
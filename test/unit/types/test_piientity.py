@@ -266,3 +266,14 @@ def test330_from_dict_err():
            'lang': 'en'}
     with pytest.raises(InvArgException):
         mod.PiiEntity.fromdict(pii)
+
+
+def test400_pickle():
+    """Test pickling an entity"""
+    import pickle
+    obj = mod.PiiEntity.build(PiiEnum.GOV_ID, "3451-K", "34", 12, lang="es",
+                              country="es", subtype="DNI", docid="doc1")
+    got = pickle.loads(pickle.dumps(obj))
+    assert got == obj
+    assert got.asdict() == obj.asdict()
+    assert got.info is mod.make_info(int(PiiEnum.GOV_ID), "es", "es", "DNI")